@@ -0,0 +1,129 @@
+"""
+Materialized progress aggregates for the Python learning tracker.
+
+Completed-day count, per-week completions, per-week minutes and total
+minutes are computed once per data snapshot and then carried forward
+incrementally by data_handler's setters, so the sidebar and dashboard can
+read them in O(1) instead of rescanning every day on each call.
+"""
+import bisect
+
+import progress_model
+
+# Sections whose changes affect the aggregates
+AGGREGATED_SECTIONS = ("progress", "time_spent")
+
+
+class ProgressAggregates:
+    """Immutable summary of a learner's progress; updates return a new object.
+
+    week_bounds is the curriculum's (first_day, last_day) per week, so any
+    program length and week layout is supported.
+    """
+
+    __slots__ = ("week_bounds", "days_count", "completed_count",
+                 "weekly_completed", "weekly_minutes", "total_minutes")
+
+    def __init__(self, week_bounds, completed_count, weekly_completed, weekly_minutes, total_minutes):
+        self.week_bounds = week_bounds
+        self.days_count = week_bounds[-1][1] if week_bounds else 0
+        self.completed_count = completed_count
+        self.weekly_completed = tuple(weekly_completed)
+        self.weekly_minutes = tuple(weekly_minutes)
+        self.total_minutes = total_minutes
+
+    @classmethod
+    def from_data(cls, data, week_bounds):
+        """Compute the aggregates from scratch by scanning the data."""
+        days_count = week_bounds[-1][1] if week_bounds else 0
+        columns = progress_model.ProgressColumns.from_data(data, days_count)
+
+        # Every completed entry counts towards the total, as before
+        completed_count = sum(1 for day in data["progress"].values() if day.get("completed", False))
+
+        weekly_completed = [columns.days_completed_between(first, last) for first, last in week_bounds]
+        weekly_minutes = [sum(columns.minutes[first - 1:last]) for first, last in week_bounds]
+        total_minutes = sum(columns.minutes)
+
+        return cls(week_bounds, completed_count, weekly_completed, weekly_minutes, total_minutes)
+
+    def _week_index(self, day_number):
+        """Return the week index of a day, or None if it is outside the curriculum."""
+        if not 1 <= day_number <= self.days_count:
+            return None
+        return bisect.bisect_right(self.week_bounds, (day_number, float("inf"))) - 1
+
+    def with_completion(self, day_number, was_completed, completed):
+        """Return the aggregates after a day's completion status changes."""
+        delta = int(completed) - int(was_completed)
+        if delta == 0:
+            return self
+
+        weekly_completed = list(self.weekly_completed)
+        week_idx = self._week_index(day_number)
+        if week_idx is not None:
+            weekly_completed[week_idx] += delta
+
+        return ProgressAggregates(self.week_bounds, self.completed_count + delta, weekly_completed,
+                                  self.weekly_minutes, self.total_minutes)
+
+    def with_minutes(self, day_number, old_minutes, new_minutes):
+        """Return the aggregates after a day's time spent changes."""
+        week_idx = self._week_index(day_number)
+        if week_idx is None or old_minutes == new_minutes:
+            return self
+
+        delta = new_minutes - old_minutes
+        weekly_minutes = list(self.weekly_minutes)
+        weekly_minutes[week_idx] += delta
+
+        return ProgressAggregates(self.week_bounds, self.completed_count, self.weekly_completed,
+                                  weekly_minutes, self.total_minutes + delta)
+
+    def verify(self, data):
+        """Recompute everything from scratch and compare with these aggregates.
+
+        Returns:
+            A list of mismatch descriptions; empty if the aggregates are consistent
+        """
+        expected = ProgressAggregates.from_data(data, self.week_bounds)
+        mismatches = []
+        for field in ("completed_count", "weekly_completed", "weekly_minutes", "total_minutes"):
+            actual_value = getattr(self, field)
+            expected_value = getattr(expected, field)
+            if actual_value != expected_value:
+                mismatches.append(f"{field}: maintained {actual_value}, recomputed {expected_value}")
+        return mismatches
+
+
+def get_aggregates(snapshot, week_bounds):
+    """Return the aggregates for a data snapshot, computing them once per snapshot."""
+    aggregates = snapshot.derived.get("aggregates")
+    if aggregates is None or aggregates.week_bounds != week_bounds:
+        aggregates = ProgressAggregates.from_data(snapshot, week_bounds)
+        snapshot.derived["aggregates"] = aggregates
+    return aggregates
+
+
+def carry_forward(before, after, records, update=None):
+    """Derive the aggregates of after from those of before without rescanning.
+
+    This is only valid when after is exactly one write on top of before,
+    which the snapshot versions tell us; otherwise after's aggregates are
+    left to be recomputed on first use.
+
+    Args:
+        before: The snapshot the write was based on
+        after: The snapshot produced by the write
+        records: The mutation records of the write
+        update: Function (aggregates, before) -> new aggregates, for writes
+            that touch aggregated sections
+    """
+    aggregates = before.derived.get("aggregates")
+    if aggregates is None or after.version != before.version + 1 or "aggregates" in after.derived:
+        return
+
+    if update is not None:
+        after.derived["aggregates"] = update(aggregates, before)
+    elif not any(record["path"][0] in AGGREGATED_SECTIONS for record in records):
+        after.derived["aggregates"] = aggregates
@@ -1,31 +1,31 @@
 """
-Python Learning Tracker - A Streamlit app to track progress through a 21-day Python learning curriculum.
+Python Learning Tracker - A Streamlit app to track progress through a Python learning curriculum.
 """
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import calendar
 import base64
 from io import StringIO
 import os
-import json
-import time
 import gc
-from functools import lru_cache
+import uuid
 
 # Import custom modules
+import autosave
 import curriculum as curr
 import data_handler as dh
-import visualizations as viz
 import utils
-import email_notifications
+from lazy_imports import lazy_import
+
+# Heavy modules are imported on first use, by the pages that need them
+pd = lazy_import("pandas")
+viz = lazy_import("visualizations")  # Plotly
+email_notifications = lazy_import("email_notifications")
+notification_scheduler = lazy_import("notification_scheduler")
+notifications = lazy_import("notifications")
 
 # Performance optimization settings
 # Enable garbage collection to free memory
 gc.enable()
-# Set session state for performance tracking
-if 'last_notification_check' not in st.session_state:
-    st.session_state.last_notification_check = time.time() - 3600  # Set to 1 hour ago initially
 
 # Page configuration
 st.set_page_config(
@@ -181,77 +181,66 @@ def local_css():
     </style>
     """, unsafe_allow_html=True)
 
-# Ensure data file exists
-DATA_FILE = "python_learning_progress.json"
-if not os.path.exists(DATA_FILE):
-    with open(DATA_FILE, 'w') as f:
-        json.dump({
-            "progress": {},
-            "notes": {},
-            "uploads": {},
-            "time_spent": {},
-            "resources_used": {},
-            "email_settings": {
-                "enabled": False,
-                "email": "",
-                "reminder_time": "09:00",
-                "missed_day_notification": True,
-                "daily_reminder": True
-            }
-        }, f, indent=4)
+# Reminders are sent by a background scheduler, so they do not depend on page traffic:
+# "thread" runs it inside this process, "external" leaves it to `python notification_scheduler.py`
+# (which only picks up changed settings at its nightly resync)
+NOTIFICATION_SCHEDULER = os.environ.get("TRACKER_NOTIFICATION_SCHEDULER", "thread")
 
-# Email notification checker
-@lru_cache(maxsize=1)
-def should_check_notifications():
-    """Determine if we should check notifications based on time elapsed."""
-    # Only check notifications every hour to reduce app resource usage
-    current_time = time.time()
-    if current_time - st.session_state.last_notification_check >= 3600:  # 1 hour
-        st.session_state.last_notification_check = current_time
-        return True
-    return False
+# The cohort overview shows every learner's progress; only enable it on deployments
+# that instructors alone can reach
+INSTRUCTOR_VIEW = os.environ.get("TRACKER_INSTRUCTOR_VIEW", "0") == "1"
 
-def check_and_send_notifications():
-    """Check if email notifications need to be sent and send them if needed."""
-    # Performance optimization - only check periodically
-    if not should_check_notifications():
-        return
-        
+def get_notification_scheduler():
+    """Return the reminder scheduler running in this process, starting it on first use."""
+    if NOTIFICATION_SCHEDULER != "thread":
+        return None
+    return notification_scheduler.start_scheduler()
+
+# Single-learner installs keep using the one shared data file; everywhere else each
+# session's data is its own, so this must be turned on explicitly
+SINGLE_LEARNER = os.environ.get("TRACKER_SINGLE_LEARNER", "0") == "1"
+
+def login_configured():
+    """Return True if Streamlit authentication is set up ([auth] in secrets.toml)."""
     try:
-        # Load data with email settings
-        data = dh.load_data()
-        email_settings = data.get("email_settings", {})
-        
-        # Check if email notifications are enabled
-        if not email_settings.get("enabled", False):
-            return
-        
-        # Get email address
-        email_address = email_settings.get("email", "")
-        if not email_address:
-            return
-        
-        # Get current day info
-        current_day = utils.get_current_day()
-        day_info = utils.get_day_info(current_day)
-        if not day_info:
-            return
-        
-        # Get all progress data
-        progress_data = dh.get_all_progress_data()
-        
-        # Check for missed days
-        if email_settings.get("missed_day_notification", True):
-            email_notifications.check_for_missed_days(email_address, progress_data, day_info)
-        
-        # Check for daily reminders
-        if email_settings.get("daily_reminder", True):
-            reminder_time = email_settings.get("reminder_time", "09:00")
-            email_notifications.check_and_send_daily_reminder(email_address, reminder_time, day_info)
-    except Exception as e:
-        # Silently handle exceptions in notification checks to prevent app crashes
-        print(f"Error checking notifications: {e}")
-        # Don't raise the exception to avoid crashing the app
+        return "auth" in st.secrets
+    except Exception:
+        return False
+
+def get_learner_id():
+    """Return whose data this session works on.
+    
+    With authentication configured this is the signed-in account; otherwise
+    an ID created for this browser session. Learners are never picked by a
+    URL parameter, so nobody can open another learner's data by editing it.
+    
+    Returns:
+        The learner ID, or None if the visitor still has to log in
+    """
+    if SINGLE_LEARNER:
+        return dh.DEFAULT_USER
+    if login_configured():
+        if not st.user.is_logged_in:
+            return None
+        return "user:" + (st.user.get("sub") or st.user.get("email"))
+    if "learner_id" not in st.session_state:
+        st.session_state.learner_id = "session:" + uuid.uuid4().hex
+    return st.session_state.learner_id
+
+def select_learner():
+    """Select the learner for this session, asking the visitor to log in first if required."""
+    learner_id = get_learner_id()
+    if learner_id is None:
+        st.title("Python Learning Tracker")
+        st.button("Log in", on_click=st.login)
+        st.stop()
+    dh.set_current_user(learner_id)
+
+def get_note_drafts():
+    """Return this session's unsaved notes, keyed by day number."""
+    return autosave.DraftBuffer(st.session_state, dh.save_note, committed=dh.after_commit)
+
+select_learner()
 
 # Initialize data
 try:
@@ -265,32 +254,36 @@ def main():
     # Apply custom CSS
     local_css()
     
-    # Check for email notifications
-    check_and_send_notifications()
+    # Progress and its derived figures, computed once for this rerun
+    progress = dh.get_progress_snapshot()
+    
+    # Make sure reminders are being scheduled
+    get_notification_scheduler()
     
     # Sidebar
     with st.sidebar:
         st.title("🐍 Python Learning")
-        st.subheader("21-Day Challenge")
+        st.subheader(curr.get_curriculum().title)
         
         # Current progress stats
-        completion_percentage = dh.get_completion_percentage()
-        current_day = utils.get_current_day()
-        current_streak = utils.calculate_learning_streak()
-        total_study_time = utils.get_total_study_time()
+        completion_percentage = progress.completion_percentage
+        current_day = utils.get_current_day(progress)
+        current_streak = utils.calculate_learning_streak(progress)
+        longest_streak = utils.get_longest_streak(progress)
+        total_study_time = utils.get_total_study_time(progress)
         
         # Display current stats
         st.metric("Overall Progress", f"{completion_percentage:.1f}%")
         st.metric("Current Day", f"Day {current_day}")
-        st.metric("Learning Streak", f"{current_streak} days")
+        st.metric("Learning Streak", f"{current_streak} days", help=f"Longest streak: {longest_streak} days")
         st.metric("Total Study Time", utils.format_time_display(total_study_time))
         
         # Navigation options
         st.subheader("Navigation")
-        page = st.radio(
-            "Go to:",
-            ["Dashboard", "Day Tracker", "Weekly View", "Notes & Reflections", "Email Settings"]
-        )
+        pages = ["Dashboard", "Day Tracker", "Weekly View", "Notes & Reflections", "Email Settings"]
+        if INSTRUCTOR_VIEW:
+            pages.append("Cohort Overview")
+        page = st.radio("Go to:", pages)
         
         # Additional resources
         st.subheader("Additional Resources")
@@ -307,20 +300,33 @@ def main():
     
     # Main content area
     st.title("Python Learning Tracker")
-    
-    # Display different pages based on selection
-    if page == "Dashboard":
-        show_dashboard()
-    elif page == "Day Tracker":
-        show_day_tracker()
-    elif page == "Weekly View":
-        show_weekly_view()
-    elif page == "Notes & Reflections":
-        show_notes_page()
-    elif page == "Email Settings":
-        show_email_settings()
+    if not SINGLE_LEARNER and not login_configured():
+        st.info("Progress is kept for this browser session only; configure login to keep it across visits.")
+    
+    # Display different pages based on selection; a rerun's changes are written in one go
+    with dh.transaction():
+        # Unsaved notes are saved when leaving a page, otherwise once they have been idle
+        drafts = get_note_drafts()
+        if st.session_state.get("current_page") != page:
+            st.session_state.current_page = page
+            drafts.flush()
+        else:
+            drafts.flush_idle()
+        
+        if page == "Dashboard":
+            show_dashboard(progress)
+        elif page == "Day Tracker":
+            show_day_tracker(progress)
+        elif page == "Weekly View":
+            show_weekly_view(progress)
+        elif page == "Notes & Reflections":
+            show_notes_page()
+        elif page == "Email Settings":
+            show_email_settings()
+        elif page == "Cohort Overview" and INSTRUCTOR_VIEW:
+            show_cohort_overview()
 
-def show_dashboard():
+def show_dashboard(progress):
     """Display the main dashboard with progress visualizations."""
     st.header("Learning Dashboard")
     
@@ -340,12 +346,11 @@ def show_dashboard():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        completion_percentage = dh.get_completion_percentage()
-        st.plotly_chart(viz.create_completion_gauge(completion_percentage), use_container_width=True)
+        st.plotly_chart(viz.create_completion_gauge(progress), use_container_width=True)
     
     with col2:
-        weekly_progress = dh.get_weekly_progress()
-        total_by_week = [7, 7, 7]  # 7 days each week
+        weekly_progress = progress.weekly_completed
+        total_by_week = [week.days_count for week in curr.get_curriculum_data()]
         weekly_completion = [
             f"Week {i+1}: {completed}/{total}" 
             for i, (completed, total) in enumerate(zip(weekly_progress, total_by_week))
@@ -355,8 +360,8 @@ def show_dashboard():
             st.markdown(f"- {week_stat}")
     
     with col3:
-        current_day = utils.get_current_day()
-        if current_day <= 21:
+        current_day = utils.get_current_day(progress)
+        if current_day <= curr.get_days_count():
             day_info = utils.get_day_info(current_day)
             if day_info:
                 st.subheader("Current Topic")
@@ -369,31 +374,28 @@ def show_dashboard():
                 st.markdown("*Topic information not available*")
         else:
             st.subheader("Congratulations!")
-            st.markdown("You've completed the 21-day Python curriculum! 🎉")
+            st.markdown(f"You've completed the {curr.get_days_count()}-day Python curriculum! 🎉")
     
     # Progress heatmap
     st.subheader("Progress Tracker")
-    progress_data = dh.get_all_progress_data()
-    st.plotly_chart(viz.create_progress_heatmap(progress_data), use_container_width=True)
+    st.plotly_chart(viz.create_progress_heatmap(progress), use_container_width=True)
     
     # Weekly stats
     col1, col2 = st.columns(2)
     
     with col1:
-        weekly_progress = dh.get_weekly_progress()
-        st.plotly_chart(viz.create_weekly_progress_chart(weekly_progress), use_container_width=True)
+        st.plotly_chart(viz.create_weekly_progress_chart(progress), use_container_width=True)
     
     with col2:
-        weekly_time = dh.get_time_spent_by_week()
-        st.plotly_chart(viz.create_weekly_time_chart(weekly_time), use_container_width=True)
+        st.plotly_chart(viz.create_weekly_time_chart(progress), use_container_width=True)
     
     # Time spent breakdown
     st.subheader("Time Investment")
-    st.plotly_chart(viz.create_time_spent_chart(progress_data), use_container_width=True)
+    st.plotly_chart(viz.create_time_spent_chart(progress), use_container_width=True)
     
     # Calendar view
     st.subheader("Activity Calendar")
-    st.plotly_chart(viz.create_streak_calendar(progress_data), use_container_width=True)
+    st.plotly_chart(viz.create_streak_calendar(progress), use_container_width=True)
     
     # Upcoming days
     st.subheader("Coming Up Next")
@@ -413,23 +415,22 @@ def show_dashboard():
                     
                     resources = day['resources']
                     for resource in resources:
-                        if isinstance(resource, dict) and 'url' in resource:
-                            st.markdown(f"""<div class="resource-link"><a href="{resource['url']}" target="_blank">{resource['name']} 🔗</a></div>""", unsafe_allow_html=True)
+                        if resource.url:
+                            st.markdown(f"""<div class="resource-link"><a href="{resource.url}" target="_blank">{resource.name} 🔗</a></div>""", unsafe_allow_html=True)
                         else:
-                            resource_name = resource['name'] if isinstance(resource, dict) else resource
-                            st.markdown(f"- {resource_name}")
+                            st.markdown(f"- {resource.name}")
             except (KeyError, TypeError):
                 # Skip days with missing data
                 continue
     else:
         st.info("No upcoming days available")
 
-def show_day_tracker():
+def show_day_tracker(progress):
     """Display the day tracker to mark completion and log time."""
     st.header("Day Tracker")
     
     # Day selection
-    day_number = st.number_input("Select Day:", min_value=1, max_value=21, value=utils.get_current_day())
+    day_number = st.number_input("Select Day:", min_value=1, max_value=curr.get_days_count(), value=utils.get_current_day(progress))
     
     # Get day info
     day_info = utils.get_day_info(day_number)
@@ -444,11 +445,17 @@ def show_day_tracker():
     **Week {day_info['week']}: {day_info['week_title']}**  
     **Scheduled Date:** {day_info['formatted_date']}
     """)
-    
+
+    # Offer to move an overdue day (and everything after it) to today
+    if not progress.is_completed(day_number) and day_info['scheduled_date'] < datetime.now().date():
+        st.warning("This day is overdue.")
+        if st.button("Reschedule from this day", key=f"reschedule_{day_number}"):
+            dh.reschedule_from(day_number)
+            st.rerun()
+
     # Display completion status
     try:
-        progress_data = dh.get_all_progress_data()
-        day_data = progress_data[day_number-1] if day_number <= len(progress_data) else {"completed": False, "time_spent_minutes": 0}
+        day_data = progress.day(day_number) or {"completed": False, "time_spent_minutes": 0}
         is_completed = day_data.get('completed', False)
         
         # Columns for layout
@@ -459,11 +466,11 @@ def show_day_tracker():
             st.markdown(f"{day_info['practice']}")
             
             st.markdown("### Resources")
-            resources = day_info.get('resources', [])
+            resources = day_info.get('resources', ())
             resources_used = dh.get_resources_used(day_number)
             
             for resource in resources:
-                resource_name = resource['name'] if isinstance(resource, dict) else resource
+                resource_name = resource.name
                 resource_key = resource_name  # Use the name as the key for checkbox
                 
                 # Check if this resource was used
@@ -478,15 +485,11 @@ def show_day_tracker():
                     else:
                         if is_checked:
                             # Remove the resource from used resources
-                            data = dh.load_data()
-                            if str(day_number) in data["resources_used"]:
-                                if resource_name in data["resources_used"][str(day_number)]:
-                                    data["resources_used"][str(day_number)].remove(resource_name)
-                                    dh.save_data(data)
+                            dh.unmark_resource_used(day_number, resource_name)
                 
                 with col2:
-                    if isinstance(resource, dict) and 'url' in resource:
-                        st.markdown(f"""<div class="resource-link"><a href="{resource['url']}" target="_blank">{resource_name} 🔗</a></div>""", unsafe_allow_html=True)
+                    if resource.url:
+                        st.markdown(f"""<div class="resource-link"><a href="{resource.url}" target="_blank">{resource_name} 🔗</a></div>""", unsafe_allow_html=True)
                     else:
                         st.text(resource_name)
         
@@ -527,12 +530,7 @@ def show_day_tracker():
     
     # Notes section
     st.markdown("### Notes & Reflections")
-    current_note = dh.get_note(day_number)
-    note = st.text_area("Your notes for this day:", value=current_note, height=200, key=f"note_{day_number}")
-    
-    if note != current_note:
-        dh.save_note(day_number, note)
-        st.success("Notes saved successfully!")
+    show_note_editor(day_number)
     
     # Exercise Upload
     st.markdown("### Upload Exercise Solution")
@@ -546,19 +544,10 @@ def show_day_tracker():
         st.code(code, language="python")
         
         # Save the uploaded file information
-        data = dh.load_data()
-        if "uploads" not in data:
-            data["uploads"] = {}
-        
-        data["uploads"][str(day_number)] = {
-            "filename": uploaded_file.name,
-            "upload_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        dh.save_data(data)
+        dh.save_upload(day_number, uploaded_file.name)
         st.success(f"Solution for Day {day_number} uploaded successfully!")
 
-def show_weekly_view():
+def show_weekly_view(progress):
     """Display a view of each week's curriculum."""
     st.header("Weekly Curriculum View")
     
@@ -566,30 +555,21 @@ def show_weekly_view():
     curriculum_data = curr.get_curriculum_data()
     
     # Create tabs for each week
-    week_tabs = st.tabs([f"Week {week['week']}: {week['title']}" for week in curriculum_data])
+    week_tabs = st.tabs([f"Week {week.week}: {week.title}" for week in curriculum_data])
     
     # Fill each week's tab
     for i, week_tab in enumerate(week_tabs):
         with week_tab:
             week_data = curriculum_data[i]
-            st.subheader(f"Week {week_data['week']}: {week_data['title']}")
+            st.subheader(f"Week {week_data.week}: {week_data.title}")
             
             # Display each day in the week as an expander
-            for day in week_data['days']:
-                day_num = day['day']
+            for day in week_data.days:
+                day_num = day.day
                 # Get completion status
-                try:
-                    progress_data = dh.get_all_progress_data()
-                    if day_num <= len(progress_data):
-                        day_progress = progress_data[day_num-1]
-                        is_completed = day_progress.get('completed', False)
-                        completion_date = day_progress.get('completion_date', None) if is_completed else None
-                    else:
-                        is_completed = False
-                        completion_date = None
-                except Exception:
-                    is_completed = False
-                    completion_date = None
+                day_progress = progress.day(day_num)
+                is_completed = bool(day_progress and day_progress['completed'])
+                completion_date = day_progress['completion_date'] if is_completed else None
                 
                 # Create an expander for each day
                 status_icon = "✅" if is_completed else "❌"
@@ -598,19 +578,17 @@ def show_weekly_view():
                 day_info = utils.get_day_info(day_num)
                 scheduled_date = day_info.get('formatted_date', 'N/A') if day_info else 'N/A'
                 
-                with st.expander(f"Day {day_num}: {day['topic']} {status_icon}"):
+                with st.expander(f"Day {day_num}: {day.topic} {status_icon}"):
                     st.markdown(f"**Scheduled Date:** {scheduled_date}")
-                    st.markdown(f"**Practice Exercise:** {day['practice']}")
+                    st.markdown(f"**Practice Exercise:** {day.practice}")
                     
                     # Resources with links
                     st.markdown("**Resources:**")
-                    resources = day.get('resources', [])
-                    for resource in resources:
-                        if isinstance(resource, dict) and 'url' in resource:
-                            st.markdown(f"""<div class="resource-link"><a href="{resource['url']}" target="_blank">{resource['name']} 🔗</a></div>""", unsafe_allow_html=True)
+                    for resource in day.resources:
+                        if resource.url:
+                            st.markdown(f"""<div class="resource-link"><a href="{resource.url}" target="_blank">{resource.name} 🔗</a></div>""", unsafe_allow_html=True)
                         else:
-                            resource_name = resource['name'] if isinstance(resource, dict) else resource
-                            st.markdown(f"- {resource_name}")
+                            st.markdown(f"- {resource.name}")
                     
                     # Show completion status
                     if is_completed:
@@ -620,18 +598,9 @@ def show_weekly_view():
                 
             # Create a table for the overview
             week_df = []
-            for day in week_data['days']:
-                day_num = day['day']
-                # Get completion status again
-                try:
-                    progress_data = dh.get_all_progress_data()
-                    if day_num <= len(progress_data):
-                        day_progress = progress_data[day_num-1]
-                        is_completed = day_progress.get('completed', False)
-                    else:
-                        is_completed = False
-                except Exception:
-                    is_completed = False
+            for day in week_data.days:
+                day_num = day.day
+                is_completed = progress.is_completed(day_num)
                 
                 # Get day info for the scheduled date
                 day_info = utils.get_day_info(day_num)
@@ -639,7 +608,7 @@ def show_weekly_view():
                 
                 week_df.append({
                     "Day": day_num,
-                    "Topic": day['topic'],
+                    "Topic": day.topic,
                     "Scheduled": scheduled_date,
                     "Status": "✅ Completed" if is_completed else "❌ Incomplete"
                 })
@@ -648,9 +617,36 @@ def show_weekly_view():
             st.table(pd.DataFrame(week_df))
             
             # Display progress for this week
-            week_progress = dh.get_weekly_progress()[i]
-            st.progress(week_progress / 7)
-            st.caption(f"Week {i+1} Progress: {week_progress}/7 days completed")
+            week_progress = progress.weekly_completed[i]
+            st.progress(week_progress / week_data.days_count)
+            st.caption(f"Week {week_data.week} Progress: {week_progress}/{week_data.days_count} days completed")
+
+def save_note_edit(day_number):
+    """Save a day's note as soon as the learner submits an edit to it."""
+    select_learner()
+    drafts = get_note_drafts()
+    drafts.edit(day_number, st.session_state[f"note_{day_number}"], dh.get_note(day_number))
+    drafts.flush([day_number])
+
+@st.fragment
+def show_note_editor(day_number):
+    """Edit a day's note; it is saved whenever an edit is submitted, or when leaving the day.
+    
+    Runs as a fragment so saving a note reruns only the editor, and only when the text changed.
+    """
+    select_learner()
+    drafts = get_note_drafts()
+    drafts.flush([day for day in drafts if day != day_number])
+    
+    saved_note = dh.get_note(day_number)
+    note = st.text_area("Your notes for this day:", value=drafts.get(day_number, saved_note), height=200,
+                        key=f"note_{day_number}", on_change=save_note_edit, args=(day_number,))
+    
+    # A draft is left only if saving it failed; it is retried when leaving the day
+    if day_number in drafts:
+        st.caption("Unsaved changes; they are saved again when you leave this day.")
+    elif note:
+        st.caption("Notes saved.")
 
 def show_notes_page():
     """Display all notes in one place."""
@@ -693,6 +689,20 @@ def show_notes_page():
         href = f'<a href="data:text/plain;base64,{b64}" download="python_learning_notes.txt">Download Notes</a>'
         st.markdown(href, unsafe_allow_html=True)
 
+def show_cohort_overview():
+    """Display every learner's progress as one learners x days heatmap (instructor view, see INSTRUCTOR_VIEW)."""
+    st.header("Cohort Overview")
+    
+    metric = st.radio("Color by:", ["Completion", "Minutes spent"], horizontal=True)
+    cohort = dh.get_cohort_matrix("completed" if metric == "Completion" else "minutes")
+    
+    if len(cohort) == 0:
+        st.info("No learner data found yet.")
+        return
+    
+    st.caption(f"{len(cohort)} learners × {cohort.days_count} days")
+    st.plotly_chart(viz.create_cohort_heatmap(cohort), use_container_width=True)
+
 def show_email_settings():
     """Display email notification settings."""
     st.header("Email Reminder Settings")
@@ -709,9 +719,9 @@ def show_email_settings():
     if 'daily_reminder' not in st.session_state:
         st.session_state.daily_reminder = True
     
-    # Load saved settings
-    data = dh.load_data()
-    email_settings = data.get("email_settings", {})
+    # Load saved settings, with the channel's defaults for anything not saved yet
+    email_channel = notifications.get_channel("email")
+    email_settings = email_channel.get_settings()
     
     if email_settings:
         st.session_state.email_enabled = email_settings.get("enabled", False)
@@ -767,19 +777,19 @@ def show_email_settings():
             st.session_state.daily_reminder = daily_reminder
             
             # Save settings to data file
-            data = dh.load_data()
-            if "email_settings" not in data:
-                data["email_settings"] = {}
-                
-            data["email_settings"] = {
+            settings = {
                 "enabled": email_enabled,
                 "email": email,
                 "reminder_time": reminder_time.strftime("%H:%M"),
                 "missed_day_notification": missed_day_notification,
                 "daily_reminder": daily_reminder
             }
-            
-            dh.save_data(data)
+            dh.save_settings(email_channel.settings_section, settings)
+            scheduler = get_notification_scheduler()
+            if scheduler is not None:
+                # The rerun's transaction is not committed yet, so pass the new settings along
+                scheduler.reschedule(dh.get_current_user(), [email_channel.name],
+                                     settings={email_channel.name: email_channel.with_defaults(settings)})
             st.success("Email settings saved successfully!")
     
     # Test email button outside the form
@@ -806,9 +816,9 @@ def show_email_settings():
                 </html>
                 """
                 if email_notifications.send_email(st.session_state.email, test_subject, test_message):
-                    st.success("Test email sent successfully! Check your inbox (and spam folder).")
+                    st.success("Test email queued for delivery! Check your inbox (and spam folder) in a moment.")
                 else:
-                    st.error("Failed to send test email. Please check your email address.")
+                    st.error("Failed to queue test email. Please check your email address.")
             else:
                 st.error("Could not get current day information for test email.")
     
@@ -15,8 +15,7 @@ def show_email_settings():
         st.session_state.daily_reminder = True
     
     # Load saved settings
-    data = dh.load_data()
-    email_settings = data.get("email_settings", {})
+    email_settings = dh.get_settings("email_settings")
     
     if email_settings:
         st.session_state.email_enabled = email_settings.get("enabled", False)
@@ -64,15 +63,13 @@ def show_email_settings():
             reminder_time_str = f"{reminder_hour:02d}:{reminder_minute:02d}"
             
             # Save settings to data file
-            data = dh.load_data()
-            data["email_settings"] = {
+            dh.save_settings("email_settings", {
                 "enabled": email_enabled,
                 "email": email,
                 "reminder_time": reminder_time_str,
                 "missed_day_notification": missed_day,
                 "daily_reminder": daily_reminder
-            }
-            dh.save_data(data)
+            })
             
             # Update session state
             st.session_state.email_enabled = email_enabled
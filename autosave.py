@@ -0,0 +1,111 @@
+"""
+Debounced autosave for long text fields in the Python learning tracker.
+
+Edits to a text field are held as a draft in the session state instead of
+being written on every rerun. A draft is saved once it has been idle for
+AUTOSAVE_IDLE_SECONDS, or straight away when the learner navigates to
+another page or day, so typing a long reflection costs one write instead
+of one per change.
+"""
+import time
+
+# Seconds a draft must go unedited before it is saved
+AUTOSAVE_IDLE_SECONDS = 3
+
+# Session state key the drafts are kept under
+DRAFTS_KEY = "_autosave_drafts"
+
+
+class DraftBuffer:
+    """Unsaved text edits of one session, kept in its session state.
+
+    Each draft maps a field key to (text, time of last edit).
+    """
+
+    def __init__(self, state, save, idle_seconds=AUTOSAVE_IDLE_SECONDS, clock=time.monotonic,
+                 committed=None):
+        """
+        Args:
+            state: The session state (any mutable mapping)
+            save: Function (key, text) that persists a draft
+            idle_seconds: Seconds without edits after which a draft is saved
+            clock: Function returning the current time in seconds
+            committed: Function taking a callback to call once what save wrote
+                is committed (e.g. data_handler.after_commit); a draft is only
+                dropped then. By default saves count as committed at once.
+        """
+        if DRAFTS_KEY not in state:
+            state[DRAFTS_KEY] = {}
+        self._drafts = state[DRAFTS_KEY]
+        self._save = save
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._committed = committed or (lambda callback: callback())
+
+    def __len__(self):
+        return len(self._drafts)
+
+    def __contains__(self, key):
+        return key in self._drafts
+
+    def __iter__(self):
+        return iter(list(self._drafts))
+
+    def get(self, key, saved):
+        """Return the draft of a field, or its saved text if it has no draft."""
+        draft = self._drafts.get(key)
+        return saved if draft is None else draft[0]
+
+    def edit(self, key, text, saved):
+        """Record the field's current text.
+
+        Args:
+            key: The field
+            text: The text it now holds
+            saved: The text last saved for it
+
+        Returns:
+            True if the field has unsaved changes
+        """
+        draft = self._drafts.get(key)
+        if draft is not None and draft[0] == text:
+            return True
+        if text == saved:
+            self._drafts.pop(key, None)
+            return False
+        self._drafts[key] = (text, self._clock())
+        return True
+
+    def flush_idle(self):
+        """Save the drafts that have not been edited for idle_seconds.
+
+        Returns:
+            The keys that were saved
+        """
+        now = self._clock()
+        idle = [key for key, (_, edited) in self._drafts.items() if now - edited >= self.idle_seconds]
+        return self.flush(idle)
+
+    def flush(self, keys=None):
+        """Save the given drafts (all of them by default) now.
+
+        Returns:
+            The keys that were saved
+        """
+        keys = list(self._drafts) if keys is None else keys
+        saved = []
+        for key in keys:
+            draft = self._drafts.get(key)
+            if draft is None:
+                continue
+            # The draft stays until the save is committed, so a failed or
+            # discarded save is retried by the next flush
+            self._save(key, draft[0])
+            self._committed(lambda key=key, draft=draft: self._forget(key, draft))
+            saved.append(key)
+        return saved
+
+    def _forget(self, key, draft):
+        # Unless it was edited again since it was saved
+        if self._drafts.get(key) is draft:
+            del self._drafts[key]
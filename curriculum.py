@@ -1,229 +1,294 @@
 """
 Module to handle the Python learning curriculum data.
+
+Curricula are defined in JSON or TOML files (see curricula/) and can be any
+length. A curriculum is compiled once into immutable records with a day index
+and a week index, and the same objects are shared read-only by every session.
+Parsed curricula are cached as marshalled plain tuples (never pickles, so
+reading the cache cannot run code) keyed by a hash of the source file, in a
+private per-user directory, so later startups skip parsing.
 """
+import hashlib
+import json
+import marshal
+import os
+import tempfile
+import threading
+import tomllib
 
-def get_curriculum_data():
-    """Returns a structured representation of the 21-day Python learning curriculum."""
-    
-    curriculum = [
-        {
-            "week": 1,
-            "title": "Python Basics",
-            "days": [
-                {
-                    "day": 1,
-                    "topic": "Variables & Data Types",
-                    "resources": [
-                        {"name": "W3Schools", "url": "https://www.w3schools.com/python/python_variables.asp"}, 
-                        {"name": "Mosh's Video", "url": "https://www.youtube.com/watch?v=_uQrJ0TkZlc"}
-                    ],
-                    "practice": "Write a script to store and print your name, age, and favorite number."
-                },
-                {
-                    "day": 2,
-                    "topic": "Operators & Expressions",
-                    "resources": [
-                        {"name": "Programiz", "url": "https://www.programiz.com/python-programming/operators"}, 
-                        {"name": "Corey Schafer's Video", "url": "https://www.youtube.com/watch?v=YAbOiGr83cI"}
-                    ],
-                    "practice": "Write a calculator that adds, subtracts, multiplies, and divides two numbers."
-                },
-                {
-                    "day": 3,
-                    "topic": "If Statements & Conditions",
-                    "resources": [
-                        {"name": "Real Python", "url": "https://realpython.com/python-conditional-statements/"}, 
-                        {"name": "freeCodeCamp Video", "url": "https://www.youtube.com/watch?v=DZwmZ8Usvnk"}
-                    ],
-                    "practice": "Create a program that checks if a number is positive, negative, or zero."
-                },
-                {
-                    "day": 4,
-                    "topic": "Loops (for, while)",
-                    "resources": [
-                        {"name": "W3Schools Loops", "url": "https://www.w3schools.com/python/python_for_loops.asp"}, 
-                        {"name": "CS Dojo Video", "url": "https://www.youtube.com/watch?v=HXNhEYqFo0o"}
-                    ],
-                    "practice": "Print numbers from 1-10 using a loop. Print even numbers only."
-                },
-                {
-                    "day": 5,
-                    "topic": "Functions",
-                    "resources": [
-                        {"name": "Python Functions (Programiz)", "url": "https://www.programiz.com/python-programming/function"}, 
-                        {"name": "Mosh's Video", "url": "https://www.youtube.com/watch?v=BVfCWuca9nw"}
-                    ],
-                    "practice": "Write a function that takes a number and returns its square."
-                },
-                {
-                    "day": 6,
-                    "topic": "Lists & Strings",
-                    "resources": [
-                        {"name": "W3Schools Lists", "url": "https://www.w3schools.com/python/python_lists.asp"}, 
-                        {"name": "Corey Schafer's Video", "url": "https://www.youtube.com/watch?v=W8KRzm-HUcc"}
-                    ],
-                    "practice": "Reverse a string and find the largest number in a list."
-                },
-                {
-                    "day": 7,
-                    "topic": "Mini Project (Basics)",
-                    "resources": [
-                        {"name": "Use Replit to code", "url": "https://replit.com/languages/python3"}
-                    ],
-                    "practice": "Build a basic calculator or a number guessing game."
-                }
-            ]
-        },
-        {
-            "week": 2,
-            "title": "Intermediate Python",
-            "days": [
-                {
-                    "day": 8,
-                    "topic": "Dictionaries & Sets",
-                    "resources": [
-                        {"name": "W3Schools Dictionaries", "url": "https://www.w3schools.com/python/python_dictionaries.asp"}, 
-                        {"name": "Corey Schafer Video", "url": "https://www.youtube.com/watch?v=daefaLgNkw0"}
-                    ],
-                    "practice": "Count word frequency in a sentence using a dictionary."
-                },
-                {
-                    "day": 9,
-                    "topic": "File Handling",
-                    "resources": [
-                        {"name": "Programiz", "url": "https://www.programiz.com/python-programming/file-operation"}, 
-                        {"name": "Mosh's Video", "url": "https://www.youtube.com/watch?v=Uh2ebFW8OYM"}
-                    ],
-                    "practice": "Read a file and count how many lines it has."
-                },
-                {
-                    "day": 10,
-                    "topic": "Error Handling (try-except)",
-                    "resources": [
-                        {"name": "Real Python", "url": "https://realpython.com/python-exceptions/"}, 
-                        {"name": "freeCodeCamp Video", "url": "https://www.youtube.com/watch?v=NIWwJbo-9_8"}
-                    ],
-                    "practice": "Create a program that handles division by zero errors."
-                },
-                {
-                    "day": 11,
-                    "topic": "Modules (math, random)",
-                    "resources": [
-                        {"name": "Python Modules Guide", "url": "https://docs.python.org/3/tutorial/modules.html"}, 
-                        {"name": "Mosh's Video", "url": "https://www.youtube.com/watch?v=GxCXiCVsRSM"}
-                    ],
-                    "practice": "Generate a random password using random module."
-                },
-                {
-                    "day": 12,
-                    "topic": "OOP Basics (Classes & Objects)",
-                    "resources": [
-                        {"name": "Real Python", "url": "https://realpython.com/python3-object-oriented-programming/"}, 
-                        {"name": "Mosh's Video", "url": "https://www.youtube.com/watch?v=pnhO8UaCgxg"}
-                    ],
-                    "practice": "Create a Car class with attributes like brand and speed."
-                },
-                {
-                    "day": 13,
-                    "topic": "APIs & JSON",
-                    "resources": [
-                        {"name": "Requests Library (Real Python)", "url": "https://realpython.com/python-requests/"}, 
-                        {"name": "Corey Schafer Video", "url": "https://www.youtube.com/watch?v=tb8gHvYlCFs"}
-                    ],
-                    "practice": "Fetch weather data from an API and display it."
-                },
-                {
-                    "day": 14,
-                    "topic": "Mini Project",
-                    "resources": [
-                        {"name": "Use Replit or Jupyter Notebook", "url": "https://jupyter.org/"}
-                    ],
-                    "practice": "Build a To-Do List App or Weather App using API."
-                }
-            ]
-        },
-        {
-            "week": 3,
-            "title": "Advanced & Final Project",
-            "days": [
-                {
-                    "day": 15,
-                    "topic": "Recap & Debugging",
-                    "resources": [
-                        {"name": "Use Pythontutor to visualize code execution", "url": "https://pythontutor.com/"}
-                    ],
-                    "practice": "Debug old programs and improve efficiency."
-                },
-                {
-                    "day": 16,
-                    "topic": "Data Structures (Stacks, Queues)",
-                    "resources": [
-                        {"name": "Real Python", "url": "https://realpython.com/python-data-structures/"}
-                    ],
-                    "practice": "Implement a simple stack and queue in Python."
-                },
-                {
-                    "day": 17,
-                    "topic": "Algorithms (Sorting & Searching)",
-                    "resources": [
-                        {"name": "Khan Academy", "url": "https://www.khanacademy.org/computing/computer-science/algorithms"}
-                    ],
-                    "practice": "Implement Bubble Sort and Binary Search."
-                },
-                {
-                    "day": 18,
-                    "topic": "Python Libraries (pandas, matplotlib)",
-                    "resources": [
-                        {"name": "Pandas Docs", "url": "https://pandas.pydata.org/docs/"}, 
-                        {"name": "Matplotlib Tutorial", "url": "https://matplotlib.org/stable/tutorials/index.html"}
-                    ],
-                    "practice": "Read a CSV file using Pandas and create a basic graph."
-                },
-                {
-                    "day": 19,
-                    "topic": "Final Project Brainstorming",
-                    "resources": [
-                        {"name": "Use Google Colab", "url": "https://colab.research.google.com/"}
-                    ],
-                    "practice": "Plan a final project (Choose from ideas below)."
-                },
-                {
-                    "day": 20,
-                    "topic": "Final Project (Day 1)",
-                    "resources": [
-                        {"name": "Use Replit or Jupyter Notebook", "url": "https://replit.com/languages/python3"}
-                    ],
-                    "practice": "Build a project like: Password Manager, Budget Tracker, or Simple Game."
-                },
-                {
-                    "day": 21,
-                    "topic": "Final Project (Day 2)",
-                    "resources": [
-                        {"name": "Use Replit or Jupyter Notebook", "url": "https://replit.com/languages/python3"}
-                    ],
-                    "practice": "Complete your final project and showcase it."
-                }
-            ]
-        }
-    ]
-    
+# Curriculum definition to load (.json or .toml)
+CURRICULUM_FILE = os.environ.get(
+    "TRACKER_CURRICULUM_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "curricula", "python_21_days.json")
+)
+
+# Directory holding parsed curricula, keyed by a hash of their source file; it is created
+# private to the current user and ignored if anyone else could write to it
+CURRICULUM_CACHE_DIR = os.environ.get(
+    "TRACKER_CURRICULUM_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "python-learning-tracker", "curricula")
+)
+
+# Bump when the cached layout changes so stale caches are ignored
+CACHE_FORMAT_VERSION = 2
+
+
+def _restore_record(cls, values):
+    record = object.__new__(cls)
+    for name, value in zip(cls.__slots__, values):
+        object.__setattr__(record, name, value)
+    return record
+
+
+class _Record:
+    """Base class for immutable curriculum records."""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return (_restore_record, (type(self), tuple(getattr(self, name) for name in self.__slots__)))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Resource(_Record):
+    """A learning resource; url is None for resources without a link."""
+
+    __slots__ = ("name", "url")
+
+
+class Day(_Record):
+    """One curriculum day."""
+
+    __slots__ = ("day", "week", "topic", "resources", "resource_names", "practice")
+
+
+class Week(_Record):
+    """One curriculum week and its days."""
+
+    __slots__ = ("week", "title", "days", "first_day", "last_day")
+
+    @property
+    def days_count(self):
+        return self.last_day - self.first_day + 1
+
+
+class Curriculum(_Record):
+    """The compiled curriculum with O(1) lookups by day and week number.
+
+    week_bounds holds (first_day, last_day) for each week in order, so code
+    that groups days by week does not need to assume a week length.
+    """
+
+    __slots__ = ("title", "weeks", "days", "week_bounds", "_days_by_number", "_weeks_by_number")
+
+    def day(self, day_number):
+        """Return the Day record for a day number, or None if there is no such day."""
+        return self._days_by_number.get(day_number)
+
+    def week(self, week_number):
+        """Return the Week record for a week number, or None if there is no such week."""
+        return self._weeks_by_number.get(week_number)
+
+
+def _compile(definition):
+    """Compile a curriculum definition (nested lists and dicts) into immutable records.
+
+    Raises:
+        ValueError: If the days are not numbered 1, 2, 3, ... in order
+    """
+    weeks = []
+    next_day = 1
+    for week_data in definition["weeks"]:
+        days = []
+        for day_data in week_data["days"]:
+            if day_data["day"] != next_day:
+                raise ValueError(f"Expected day {next_day} in week {week_data['week']}, found day {day_data['day']}")
+            next_day += 1
+
+            resources = tuple(
+                Resource(name=resource["name"], url=resource.get("url"))
+                if isinstance(resource, dict) else Resource(name=resource, url=None)
+                for resource in day_data.get("resources", [])
+            )
+            days.append(Day(
+                day=day_data["day"],
+                week=week_data["week"],
+                topic=day_data["topic"],
+                resources=resources,
+                resource_names=tuple(resource.name for resource in resources),
+                practice=day_data["practice"]
+            ))
+        if not days:
+            raise ValueError(f"Week {week_data['week']} has no days")
+        weeks.append(Week(
+            week=week_data["week"],
+            title=week_data["title"],
+            days=tuple(days),
+            first_day=days[0].day,
+            last_day=days[-1].day
+        ))
+
+    all_days = tuple(day for week in weeks for day in week.days)
+    return Curriculum(
+        title=definition.get("title", f"{len(all_days)}-Day Challenge"),
+        weeks=tuple(weeks),
+        days=all_days,
+        week_bounds=tuple((week.first_day, week.last_day) for week in weeks),
+        _days_by_number={day.day: day for day in all_days},
+        _weeks_by_number={week.week: week for week in weeks}
+    )
+
+
+def _parse(path, raw):
+    """Parse a curriculum definition from the raw bytes of a JSON or TOML file."""
+    if path.endswith(".toml"):
+        return tomllib.loads(raw.decode("utf-8"))
+    return json.loads(raw)
+
+
+def _to_plain(curriculum):
+    """Return a compiled curriculum as nested tuples of strings and numbers."""
+    return (curriculum.title, tuple(
+        (week.week, week.title, tuple(
+            (day.day, day.topic, day.practice, tuple((resource.name, resource.url) for resource in day.resources))
+            for day in week.days
+        ))
+        for week in curriculum.weeks
+    ))
+
+
+def _from_plain(plain):
+    """Rebuild the curriculum definition saved by _to_plain."""
+    title, weeks = plain
+    return {"title": title, "weeks": [
+        {"week": week, "title": week_title, "days": [
+            {"day": day, "topic": topic, "practice": practice,
+             "resources": [{"name": name, "url": url} for name, url in resources]}
+            for day, topic, practice, resources in days
+        ]}
+        for week, week_title, days in weeks
+    ]}
+
+
+def _is_private(directory):
+    """Return True if directory belongs to the current user and nobody else can write to it."""
+    st = os.stat(directory)
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & 0o022
+
+
+def _read_cache(cache_path):
+    try:
+        if not _is_private(os.path.dirname(cache_path)):
+            print(f"Ignoring curriculum cache {cache_path}: its directory is writable by others")
+            return None
+        with open(cache_path, "rb") as f:
+            return _compile(_from_plain(marshal.load(f)))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading curriculum cache {cache_path}: {e}")
+        return None
+
+
+def _write_cache(cache_path, curriculum):
+    directory = os.path.dirname(cache_path)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not _is_private(directory):
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump(_to_plain(curriculum), f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Error writing curriculum cache {cache_path}: {e}")
+
+
+def load_curriculum(path, cache_dir=CURRICULUM_CACHE_DIR):
+    """Load and compile a curriculum file, using the compiled cache when the file is unchanged.
+
+    Args:
+        path: A .json or .toml curriculum definition
+        cache_dir: Directory for compiled curricula, or None to disable caching
+
+    Returns:
+        The compiled Curriculum
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    cache_path = None
+    if cache_dir:
+        digest = hashlib.sha256(raw + f":{CACHE_FORMAT_VERSION}".encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, f"{digest}.marshal")
+        curriculum = _read_cache(cache_path)
+        if curriculum is not None:
+            return curriculum
+
+    curriculum = _compile(_parse(path, raw))
+    if cache_path:
+        _write_cache(cache_path, curriculum)
     return curriculum
 
+
+_curriculum = None
+_curriculum_lock = threading.Lock()
+
+
+def get_curriculum():
+    """Returns the compiled curriculum, shared by all sessions."""
+    global _curriculum
+
+    if _curriculum is None:
+        with _curriculum_lock:
+            if _curriculum is None:
+                _curriculum = load_curriculum(CURRICULUM_FILE)
+    return _curriculum
+
+def get_curriculum_data():
+    """Returns the curriculum weeks as a tuple of immutable Week records."""
+    return get_curriculum().weeks
+
+def get_day(day_number):
+    """Returns the Day record for a day number, or None if there is no such day."""
+    return get_curriculum().day(day_number)
+
+def get_week(week_number):
+    """Returns the Week record for a week number, or None if there is no such week."""
+    return get_curriculum().week(week_number)
+
+def get_week_bounds():
+    """Returns (first_day, last_day) for each week of the curriculum, in order."""
+    return get_curriculum().week_bounds
+
+ADDITIONAL_TOOLS = (
+    "Online Coding Editors: Replit, Jupyter Notebook, Google Colab",
+    "Practice & Challenges: HackerRank, LeetCode",
+    "Debugging & Visualization: Python Tutor"
+)
+
 def get_additional_tools():
-    """Returns the list of additional tools recommended for the learning journey."""
-    
-    tools = [
-        "Online Coding Editors: Replit, Jupyter Notebook, Google Colab",
-        "Practice & Challenges: HackerRank, LeetCode",
-        "Debugging & Visualization: Python Tutor"
-    ]
-    
-    return tools
+    """Returns the additional tools recommended for the learning journey."""
+    return ADDITIONAL_TOOLS
 
 def get_days_count():
     """Returns the total number of days in the curriculum."""
-    return 21
+    return len(get_curriculum().days)
 
 def get_week_count():
     """Returns the total number of weeks in the curriculum."""
-    return 3
+    return len(get_curriculum().weeks)
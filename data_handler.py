@@ -1,209 +1,633 @@
 """
 Module to handle the data operations for the Python learning tracker.
 """
-import json
+import contextlib
+import contextvars
+import hashlib
 import os
-import time
 from datetime import datetime
-from functools import lru_cache
-import pandas as pd
+import numpy as np
+
+import aggregates
+import curriculum as curr
+import file_watch
+import progress_model
+import schedule
+import storage
+import streaks
 
 # Default data file path
 DATA_FILE = "python_learning_progress.json"
 
-# Cache settings
-DATA_CACHE_TTL = 60  # Cache data for 60 seconds
-_data_cache = None
-_last_load_time = 0
+# Storage backend: "json" (snapshot plus journal) or "sqlite"
+STORAGE_BACKEND = os.environ.get("TRACKER_STORAGE_BACKEND", "json")
+SQLITE_FILE = os.environ.get("TRACKER_SQLITE_FILE", "python_learning_progress.db")
 
-def initialize_data():
-    """Initialize the data structure if it doesn't exist."""
-    if os.path.exists(DATA_FILE):
-        return load_data()
+# Learners other than the default one get their own partition under DATA_DIR
+DEFAULT_USER = "default"
+DATA_DIR = os.environ.get("TRACKER_DATA_DIR", "learner_data")
+SQLITE_SHARDS = 16  # Number of SQLite database files learners are spread across
+
+# Push file change notifications to stores (inotify) instead of checking files on each read
+WATCH_FILES = os.environ.get("TRACKER_WATCH_FILES", "0") == "1"
+
+# Write-behind: dirty state is flushed at most this many seconds after a change
+SAVE_THROTTLE = 2
+
+# Notes at least this long are saved as deltas instead of full text
+NOTE_DELTA_THRESHOLD = 2048
+
+# Raised by save_data when expected_version no longer matches the stored data
+ConflictError = storage.ConflictError
+
+# Learner whose data the functions below operate on, set per Streamlit session
+_current_user = contextvars.ContextVar("current_user", default=DEFAULT_USER)
+
+def _default_data():
+    """Return the default data structure for a new learner.
     
-    # Create a default data structure
-    data = {
+    Notification settings are only stored once saved; until then each
+    channel supplies its own defaults (notifications.Channel.default_settings).
+    """
+    return {
         "progress": {},
         "notes": {},
         "uploads": {},
         "time_spent": {},
         "resources_used": {},
-        "sms_settings": {
-            "enabled": False,
-            "phone_number": "",
-            "reminder_time": "09:00",
-            "missed_day_notification": True,
-            "daily_reminder": True
-        }
+        "schedule": schedule.default_settings()
     }
+
+def set_current_user(user_id):
+    """Select the learner whose data subsequent calls read and write.
     
-    save_data(data)
-    return data
+    Raises:
+        ValueError: If user_id is empty; pass DEFAULT_USER to use the shared store
+    """
+    if not user_id:
+        raise ValueError("A learner ID is required")
+    _current_user.set(user_id)
 
-def load_data():
-    """Load the data from the JSON file with caching for performance."""
-    global _data_cache, _last_load_time
+def get_current_user():
+    """Return the learner selected for the current session."""
+    return _current_user.get()
+
+@contextlib.contextmanager
+def as_learner(user_id):
+    """Operate on another learner's data inside the block, then switch back.
     
-    current_time = time.time()
+    Usage:
+        with dh.as_learner("alice"):
+            progress = dh.get_progress_snapshot()
+    """
+    if not user_id:
+        raise ValueError("A learner ID is required")
+    token = _current_user.set(user_id)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+def _store_path(user_id):
+    """Return the file holding a learner's data, sharded by a hash of their ID."""
+    if user_id == DEFAULT_USER:
+        return SQLITE_FILE if STORAGE_BACKEND == "sqlite" else DATA_FILE
+    
+    digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+    if STORAGE_BACKEND == "sqlite":
+        shard = int(digest[:8], 16) % SQLITE_SHARDS
+        return os.path.join(DATA_DIR, f"shard_{shard:02d}.db")
+    return os.path.join(DATA_DIR, digest[:2], digest[2:4], f"{digest}.json")
+
+def _open_store(key):
+    backend, path, user_id = key
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    if backend == "sqlite":
+        import sqlite_store
+        return sqlite_store.SqliteStore(path, _default_data, user_id=user_id)
+    watcher = file_watch.get_watcher() if WATCH_FILES else None
+    return storage.JournalStore(path, _default_data, flush_delay=SAVE_THROTTLE, watcher=watcher)
+
+# Bounded LRU of open per-learner stores
+_stores = storage.StoreCache(_open_store)
+
+def _get_store():
+    """Return the store holding the current learner's data."""
+    user_id = get_current_user()
+    return _stores.get((STORAGE_BACKEND, _store_path(user_id), user_id))
+
+class Transaction:
+    """A batch of mutations applied to one working copy and committed in a single write."""
+    
+    def __init__(self, store, expected_version=None):
+        self.store = store
+        self.expected_version = expected_version
+        self.data = store.load()
+        self.base_version = self.data.version
+        self.records = []
+        self.replaced = False
+        self.on_commit = []
+    
+    def apply(self, records):
+        """Apply mutation records to the working copy."""
+        self.records.extend(records)
+        self.data = storage.apply_records(self.data, records, self.data.version + 1)
+        return self.data
+    
+    def replace(self, data):
+        """Replace the whole working copy; earlier records are superseded."""
+        self.records = []
+        self.replaced = True
+        self.data = storage.make_snapshot(data, self.data.version + 1)
+        return self.data
+    
+    def commit(self):
+        """Write the working copy's changes to the store in one operation."""
+        if self.replaced:
+            result = self.store.replace(self.data, expected_version=self.expected_version)
+        elif self.records:
+            # Splices were made against the working copy; any that no longer fit
+            # the stored text become sets of the text in the working copy
+            result = self.store.apply(self.records, expected_version=self.expected_version, intended=self.data)
+        else:
+            result = self.data
+        
+        # With no interleaved writes the committed snapshot equals the working copy
+        if result is not self.data and result.version == self.base_version + 1:
+            for key, value in self.data.derived.items():
+                result.derived.setdefault(key, value)
+        for callback in self.on_commit:
+            callback()
+        return result
+
+# Transaction the current session's mutations join, if any
+_current_transaction = contextvars.ContextVar("current_transaction", default=None)
+
+@contextlib.contextmanager
+def transaction(expected_version=None):
+    """Group mutations so they are committed together in a single write.
     
-    # If we have a valid cache, use it
-    if _data_cache is not None and (current_time - _last_load_time) < DATA_CACHE_TTL:
-        return _data_cache
+    Every data_handler setter called inside the block joins the transaction,
+    and reads inside it see its uncommitted changes. Nested transactions join
+    the outermost one. The batch is discarded if the block raises an error,
+    but committed on control-flow exits such as Streamlit's st.rerun().
     
+    Args:
+        expected_version: If given, commit raises ConflictError unless the
+            stored data is still at this version
+    
+    Usage:
+        with dh.transaction():
+            dh.mark_resource_used(day, "W3Schools")
+            dh.update_time_spent(day, 1, 30)
+    """
+    outer = _current_transaction.get()
+    if outer is not None:
+        yield outer
+        return
+    
+    tx = Transaction(_get_store(), expected_version)
+    token = _current_transaction.set(tx)
+    commit = False
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-            _data_cache = data
-            _last_load_time = current_time
-            return data
-    except (FileNotFoundError, json.JSONDecodeError):
-        # If file doesn't exist or is corrupted, initialize a new one
-        new_data = initialize_data()
-        _data_cache = new_data
-        _last_load_time = current_time
-        return new_data
-
-# Save throttling
-_last_save_time = 0 
-SAVE_THROTTLE = 2  # Minimum seconds between saves
-
-def save_data(data):
-    """Save the data to the JSON file with throttling."""
-    global _data_cache, _last_load_time, _last_save_time
-    
-    current_time = time.time()
-    
-    # Update cache immediately
-    _data_cache = data
-    _last_load_time = current_time
-    
-    # Throttle saves to prevent excessive disk I/O
-    if current_time - _last_save_time < SAVE_THROTTLE:
+        yield tx
+        commit = True
+    except Exception:
+        raise
+    except BaseException:
+        commit = True
+        raise
+    finally:
+        _current_transaction.reset(token)
+        if commit:
+            tx.commit()
+
+def _active_transaction():
+    """Return the transaction for the current learner's store, if one is open."""
+    tx = _current_transaction.get()
+    if tx is not None and tx.store is _get_store():
+        return tx
+    return None
+
+def after_commit(callback):
+    """Call callback once the current learner's changes so far are committed.
+    
+    Inside a transaction that is when it commits, and never if it is
+    discarded; otherwise changes are already committed and it is called now.
+    """
+    tx = _active_transaction()
+    if tx is not None:
+        tx.on_commit.append(callback)
+    else:
+        callback()
+
+def _apply(*records, update_aggregates=None, update_streaks=None):
+    """Apply mutation records to the store (or the open transaction) and return the updated data.
+    
+    update_aggregates(aggregates, before) returns the new aggregates for
+    writes that change completion or time spent, and update_streaks(history,
+    before) the new streak history for writes that change completion.
+    """
+    tx = _active_transaction()
+    if tx is not None:
+        before = tx.data
+        after = tx.apply(records)
+    else:
+        store = _get_store()
+        before = store.load()
+        after = store.apply(records)
+    
+    aggregates.carry_forward(before, after, records, update_aggregates)
+    streaks.carry_forward(before, after, records, update_streaks)
+    return after
+
+def _get(section, key, default):
+    """Read one entry of a section, seeing any uncommitted transaction changes."""
+    tx = _active_transaction()
+    if tx is not None:
+        return tx.data.get(section, {}).get(str(key), default)
+    return _get_store().get(section, key, default)
+
+def initialize_data():
+    """Initialize the data structure if it doesn't exist."""
+    store = _get_store()
+    if store.exists():
+        data = load_data()
+        if "schedule" not in data:
+            data = _apply(storage.make_record(storage.OP_SET, ["schedule"], _inferred_schedule(data)))
         return data
     
-    try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-        _last_save_time = current_time
-    except Exception as e:
-        print(f"Error saving data: {e}")
-        
+    # Carry the default learner's JSON progress over when switching to SQLite
+    if (
+        STORAGE_BACKEND == "sqlite"
+        and get_current_user() == DEFAULT_USER
+        and storage.JournalStore(DATA_FILE, _default_data).exists()
+    ):
+        data = storage.JournalStore(DATA_FILE, _default_data).load()
+    else:
+        data = _default_data()
+    data = dict(data, learner_id=get_current_user())
+    save_data(data)
     return data
 
+def _inferred_schedule(data):
+    """Schedule settings for data saved before schedules were stored: start at the first completion, else tomorrow."""
+    completion_dates = [
+        entry["date_completed"] for entry in data["progress"].values()
+        if entry.get("completed", False) and entry.get("date_completed")
+    ]
+    if completion_dates:
+        return schedule.default_settings(datetime.strptime(min(completion_dates), "%Y-%m-%d").date())
+    return schedule.default_settings()
+
+def load_data():
+    """Load the data, re-reading from disk only when another process has changed it.
+    
+    The result is a read-only snapshot shared between sessions; its `version`
+    attribute can be passed to save_data as expected_version.
+    """
+    tx = _active_transaction()
+    if tx is not None:
+        return tx.data
+    return _get_store().load()
+
+def save_data(data, expected_version=None):
+    """Replace the whole data structure; it is written by the write-behind flusher.
+    
+    Args:
+        data: The full data dict (e.g. a mutable copy made with dict() or copy.deepcopy)
+        expected_version: If given, the version of the snapshot the data was based on
+        
+    Raises:
+        ConflictError: If another session has changed the data since that version
+    """
+    tx = _active_transaction()
+    if tx is not None:
+        return tx.replace(data)
+    return _get_store().replace(data, expected_version=expected_version)
+
+def flush():
+    """Write the current learner's pending changes to disk now."""
+    _get_store().flush()
+
+def sync():
+    """Write the current learner's pending changes to disk and fsync them for durability."""
+    _get_store().sync()
+
 def mark_day_complete(day_number, completed=True):
     """Mark a specific day as completed or incomplete."""
-    data = load_data()
+    today = datetime.now()
+    
+    def was_completed(before):
+        return before["progress"].get(str(day_number), {}).get("completed", False)
+    
+    def update_aggregates(agg, before):
+        return agg.with_completion(day_number, was_completed(before), completed)
+    
+    def update_streaks(history, before):
+        if not 1 <= day_number <= curr.get_days_count():
+            return history
+        if was_completed(before) or not completed:
+            return None  # A completion date may disappear; rebuild on first use
+        return history.with_day(progress_model.to_epoch_day(today.date()))
     
     if completed:
-        data["progress"][str(day_number)] = {
+        return _apply(storage.make_record(storage.OP_SET, ["progress", day_number], {
             "completed": True,
-            "date_completed": datetime.now().strftime("%Y-%m-%d")
-        }
-    else:
-        # If marking as incomplete, remove the entry if it exists
-        if str(day_number) in data["progress"]:
-            del data["progress"][str(day_number)]
+            "date_completed": today.strftime("%Y-%m-%d")
+        }), update_aggregates=update_aggregates, update_streaks=update_streaks)
     
-    save_data(data)
-    return data
+    # If marking as incomplete, remove the entry if it exists
+    return _apply(storage.make_record(storage.OP_DELETE, ["progress", day_number]),
+                  update_aggregates=update_aggregates, update_streaks=update_streaks)
 
 def update_time_spent(day_number, hours, minutes):
     """Update the time spent on a specific day."""
-    data = load_data()
-    
     total_minutes = hours * 60 + minutes
-    data["time_spent"][str(day_number)] = total_minutes
     
-    save_data(data)
-    return data
+    def update_aggregates(agg, before):
+        old_minutes = before["time_spent"].get(str(day_number), 0)
+        return agg.with_minutes(day_number, old_minutes, total_minutes)
+    
+    return _apply(storage.make_record(storage.OP_SET, ["time_spent", day_number], total_minutes),
+                  update_aggregates=update_aggregates)
 
 def save_note(day_number, note_text):
-    """Save a note for a specific day."""
-    data = load_data()
-    
-    data["notes"][str(day_number)] = note_text
+    """Save a note for a specific day.
+
+    Notes of NOTE_DELTA_THRESHOLD characters or more are saved as a splice of
+    the changed span rather than the whole text.
+    """
+    current = _get("notes", day_number, "")
+    if note_text == current:
+        return load_data()
+    full_text = storage.make_record(storage.OP_SET, ["notes", day_number], note_text)
+    if len(current) < NOTE_DELTA_THRESHOLD:
+        return _apply(full_text)
     
-    save_data(data)
+    data = _apply(storage.make_record(storage.OP_SPLICE, ["notes", day_number], storage.text_delta(current, note_text)))
+    # The splice is skipped if another session changed the note since it was read
+    if data["notes"].get(str(day_number)) != note_text:
+        data = _apply(full_text)
     return data
 
 def get_note(day_number):
     """Get the note for a specific day."""
-    data = load_data()
-    return data["notes"].get(str(day_number), "")
+    return _get("notes", day_number, "")
 
 def mark_resource_used(day_number, resource):
     """Mark a resource as used for a specific day."""
+    return _apply(storage.make_record(storage.OP_ADD, ["resources_used", day_number], resource))
+
+def unmark_resource_used(day_number, resource):
+    """Remove a resource from the used resources for a specific day."""
+    return _apply(storage.make_record(storage.OP_REMOVE, ["resources_used", day_number], resource))
+
+def get_resources_used(day_number):
+    """Get the resources used for a specific day."""
+    return _get("resources_used", day_number, [])
+
+def save_upload(day_number, filename):
+    """Record the metadata of an uploaded solution for a specific day."""
+    return _apply(storage.make_record(storage.OP_SET, ["uploads", day_number], {
+        "filename": filename,
+        "upload_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }))
+
+def save_settings(section, settings):
+    """Save a notification settings section (e.g. "email_settings")."""
+    return _apply(storage.make_record(storage.OP_SET, [section], settings))
+
+def get_settings(section):
+    """Get a notification settings section as stored, or an empty dict if it is not set."""
+    return load_data().get(section) or {}
+
+def get_schedule_settings():
+    """Get the current learner's schedule settings (start date, rest days and pauses)."""
     data = load_data()
+    return data.get("schedule") or _inferred_schedule(data)
+
+def get_schedule():
+    """Get the current learner's Schedule with the date of every curriculum day."""
+    return schedule_of(load_data())
+
+def schedule_of(data):
+    """Return the Schedule stored in a learner's data."""
+    settings = data.get("schedule") or _inferred_schedule(data)
+    return schedule.get_schedule(settings, curr.get_days_count())
+
+def save_schedule_settings(settings):
+    """Save the current learner's schedule settings.
     
-    if str(day_number) not in data["resources_used"]:
-        data["resources_used"][str(day_number)] = []
+    Raises:
+        ValueError: If the settings are invalid (e.g. every weekday is a rest day)
+    """
+    schedule.validate_settings(settings)
+    return _apply(storage.make_record(storage.OP_SET, ["schedule"], settings))
+
+def reschedule_from(day_number, new_date=None):
+    """Move a missed day and all following days so it is scheduled on new_date (default today).
     
-    if resource not in data["resources_used"][str(day_number)]:
-        data["resources_used"][str(day_number)].append(resource)
+    Returns:
+        The updated Schedule
+    """
+    new_date = new_date or datetime.now().date()
+    current = get_schedule_settings()
+    settings, new_schedule = schedule.reschedule(current, curr.get_days_count(), day_number, new_date)
+    if settings is not current:
+        _apply(storage.make_record(storage.OP_SET, ["schedule"], settings))
+    return new_schedule
+
+def get_progress_columns():
+    """Return the current learner's progress as a compact columnar model (bitset and arrays)."""
+    return progress_model.get_columns(load_data(), curr.get_days_count())
+
+def get_progress_snapshot():
+    """Return a read-only ProgressSnapshot of the current learner's progress.
     
-    save_data(data)
-    return data
+    It is built once per data version and day, so every caller in a rerun
+    shares the same object until the data changes.
+    """
+    return progress_snapshot_of(load_data())
 
-def get_resources_used(day_number):
-    """Get the resources used for a specific day."""
-    data = load_data()
-    return data["resources_used"].get(str(day_number), [])
+def progress_snapshot_of(data):
+    """Return the ProgressSnapshot of a learner's data, built once per snapshot and day."""
+    today = datetime.now().date()
+    progress = data.derived.get("progress_snapshot")
+    if progress is None or progress.today != today:
+        columns = progress_model.get_columns(data, curr.get_days_count())
+        progress = progress_model.ProgressSnapshot(
+            data.version, today, columns,
+            aggregates.get_aggregates(data, curr.get_week_bounds()),
+            streaks.get_streaks(data, columns)
+        )
+        data.derived["progress_snapshot"] = progress
+    return progress
 
 def get_all_progress_data():
     """Get all progress data in a format suitable for visualizations."""
-    data = load_data()
-    progress = []
+    return list(get_progress_snapshot().days)
+
+def _aggregates():
+    """Return the maintained aggregates for the current learner's data."""
+    return aggregates.get_aggregates(load_data(), curr.get_week_bounds())
+
+def _learner_files():
+    """Yield the JSON data file of every learner: the default learner's, then the partitions under DATA_DIR."""
+    if os.path.exists(DATA_FILE):
+        yield DATA_FILE
+    for directory, _, filenames in os.walk(DATA_DIR):
+        for filename in sorted(filenames):
+            if filename.endswith(".json"):
+                yield os.path.join(directory, filename)
+
+def _sqlite_files():
+    """Return every SQLite database holding learners: the default file, then the shards under DATA_DIR."""
+    paths = [SQLITE_FILE] if os.path.exists(SQLITE_FILE) else []
+    if os.path.isdir(DATA_DIR):
+        paths += sorted(
+            os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR)
+            if name.startswith("shard_") and name.endswith(".db")
+        )
+    return paths
+
+def read_learner_data(learner_id):
+    """Read a learner's data without going through the per-learner store cache.
+    
+    For background work over many learners (e.g. notifications): a store
+    this process already has open is read as is, unflushed changes
+    included, without promoting it in the LRU; any other learner's data is
+    read straight from disk without opening, caching or repairing a store.
+    """
+    key = (STORAGE_BACKEND, _store_path(learner_id), learner_id)
+    store = _stores.peek(key)
+    if store is not None:
+        return store.load()
+    if STORAGE_BACKEND == "sqlite":
+        import sqlite_store
+        return sqlite_store.SqliteStore(key[1], _default_data, user_id=learner_id).load()
+    return storage.read_data(key[1], _default_data)
+
+def get_learner_ids():
+    """Return the ID of every learner with stored data, for use with set_current_user."""
+    if STORAGE_BACKEND == "sqlite":
+        import sqlite_store
+        return [user_id for path in _sqlite_files() for user_id in sqlite_store.read_user_ids(path)]
+    
+    learner_ids = []
+    for path in _learner_files():
+        if path == DATA_FILE:
+            learner_ids.append(DEFAULT_USER)
+            continue
+        # Partitions are named by a hash of the ID, so it is read from the data itself
+        learner_id = storage.read_data(path, _default_data).get("learner_id")
+        if learner_id:
+            learner_ids.append(learner_id)
+    return learner_ids
+
+def get_all_settings(sections):
+    """Read settings sections for every learner with stored data.
     
-    for day_num in range(1, 22):  # For all 21 days
-        day_str = str(day_num)
-        is_completed = day_str in data["progress"] and data["progress"][day_str]["completed"]
-        completion_date = data["progress"].get(day_str, {}).get("date_completed", None)
-        time_spent = data["time_spent"].get(day_str, 0)  # In minutes
+    Learners' files are read outside the LRU and without recovery, like the
+    cohort scan, so going through every learner does not disturb active
+    sessions' stores.
+    Stores this process already has open are read with their unflushed
+    changes.
+    
+    Args:
+        sections: Settings sections to read (e.g. ["email_settings"])
         
-        progress.append({
-            "day": day_num,
-            "completed": is_completed,
-            "completion_date": completion_date,
-            "time_spent_minutes": time_spent
-        })
+    Returns:
+        {learner ID: {section: stored settings, or {} if not set}}
+    """
+    if STORAGE_BACKEND == "sqlite":
+        import sqlite_store
+        settings = {}
+        for path in _sqlite_files():
+            settings.update(sqlite_store.read_settings(path, sections))
+        return settings
     
-    return progress
+    settings = {}
+    for path in _learner_files():
+        data = storage.read_data(path, _default_data)
+        learner_id = DEFAULT_USER if path == DATA_FILE else data.get("learner_id")
+        if not learner_id:
+            continue
+        open_store = _stores.peek((STORAGE_BACKEND, path, learner_id))
+        if open_store is not None:
+            data = open_store.load()
+        settings[learner_id] = {section: data.get(section) or {} for section in sections}
+    return settings
+
+def get_cohort_matrix(metric="completed"):
+    """Read every learner's progress from the store into a dense learners x days matrix.
+    
+    Args:
+        metric: "completed" (1 for completed days) or "minutes" (time spent)
+        
+    Returns:
+        A progress_model.CohortMatrix
+    """
+    if metric not in ("completed", "minutes"):
+        raise ValueError(f"Unknown cohort metric: {metric}")
+    days_count = curr.get_days_count()
+    
+    if STORAGE_BACKEND == "sqlite":
+        import sqlite_store
+        learner_ids = []
+        blocks = []
+        for path in _sqlite_files():
+            user_ids, values = sqlite_store.read_cohort(path, days_count, metric)
+            learner_ids.extend(user_ids)
+            blocks.append(values)
+        values = np.concatenate(blocks) if blocks else np.zeros((0, days_count), dtype=np.float32)
+        return progress_model.CohortMatrix(learner_ids, values, metric)
+    
+    learner_ids = []
+    rows = []
+    for path in _learner_files():
+        # Read outside the LRU and without recovery, so a cohort scan does not disturb active sessions' stores
+        data = storage.read_data(path, _default_data)
+        columns = progress_model.ProgressColumns.from_data(data, days_count)
+        learner_ids.append(data.get("learner_id") or (DEFAULT_USER if path == DATA_FILE else os.path.basename(path)[:12]))
+        if metric == "completed":
+            rows.append(columns.completed_flags().astype(np.float32))
+        else:
+            rows.append(np.frombuffer(columns.minutes, dtype=np.int32).astype(np.float32))
+    values = np.vstack(rows) if rows else np.zeros((0, days_count), dtype=np.float32)
+    return progress_model.CohortMatrix(learner_ids, values, metric)
 
 def get_completion_percentage():
     """Calculate the percentage of curriculum completed."""
-    data = load_data()
-    completed_days = sum(1 for day in data["progress"].values() if day.get("completed", False))
-    return (completed_days / 21) * 100  # 21 days total
+    return (_aggregates().completed_count / curr.get_days_count()) * 100
 
 def get_weekly_progress():
     """Get progress data by week."""
-    data = load_data()
-    weekly_progress = [0, 0, 0]  # 3 weeks
-    
-    for day_num in range(1, 22):
-        day_str = str(day_num)
-        if day_str in data["progress"] and data["progress"][day_str]["completed"]:
-            # Determine which week this day belongs to
-            week_idx = (day_num - 1) // 7
-            if week_idx < 3:  # Just to be safe
-                weekly_progress[week_idx] += 1
-    
-    return weekly_progress
+    return list(_aggregates().weekly_completed)
 
 def get_time_spent_by_week():
     """Get time spent data by week in hours."""
+    return [minutes / 60 for minutes in _aggregates().weekly_minutes]
+
+def get_total_time_spent():
+    """Get the total time spent across all curriculum days in minutes."""
+    return _aggregates().total_minutes
+
+def verify_aggregates():
+    """Recompute the aggregates and streaks from scratch and compare them with the maintained ones.
+    
+    Returns:
+        A list of mismatch descriptions; empty if everything is consistent
+    """
     data = load_data()
-    weekly_time = [0, 0, 0]  # 3 weeks
+    mismatches = aggregates.get_aggregates(data, curr.get_week_bounds()).verify(data)
     
-    for day_num in range(1, 22):
-        day_str = str(day_num)
-        time_spent = data["time_spent"].get(day_str, 0)  # In minutes
-        
-        # Determine which week this day belongs to
-        week_idx = (day_num - 1) // 7
-        if week_idx < 3:  # Just to be safe
-            weekly_time[week_idx] += time_spent
-    
-    # Convert minutes to hours
-    weekly_time = [time / 60 for time in weekly_time]
-    return weekly_time
+    columns = progress_model.get_columns(data, curr.get_days_count())
+    history = streaks.get_streaks(data, columns)
+    expected = streaks.StreakHistory.from_columns(columns)
+    if history.intervals() != expected.intervals():
+        mismatches.append(f"streaks: maintained {history.intervals()}, recomputed {expected.intervals()}")
+    return mismatches
@@ -0,0 +1,189 @@
+"""
+Delivery ledger for the Python learning tracker's notifications.
+
+Every notification is identified by (date, learner, channel, kind). Before
+a notification is sent, the pipeline claims its key in the ledger, and
+only the process whose claim succeeds sends it. The outcome is recorded
+afterwards. Several replicas, or a scheduler restarted in the middle of a
+morning, can therefore never send the same reminder twice.
+
+The ledger is a SQLite database in WAL mode shared by every process. Its
+table is clustered on the key (WITHOUT ROWID, date first):
+- checking or claiming a key is one primary-key lookup, however much
+  history there is;
+- a batch of claims is one transaction;
+- compaction deletes whole past dates with a single range delete instead
+  of scanning.
+
+A claim left "sending" by a process that died mid-send can be taken over
+after CLAIM_TIMEOUT seconds, and failed deliveries can be claimed again.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+
+LEDGER_FILE = os.environ.get("TRACKER_LEDGER_FILE", "notification_ledger.db")
+
+# Days of deliveries kept before compaction drops them
+LEDGER_RETENTION_DAYS = 7
+
+# Seconds after which an unfinished claim may be taken over by another process
+CLAIM_TIMEOUT = 600
+
+# Wait this long for another process's write lock before failing
+BUSY_TIMEOUT_MS = 5000
+
+# Delivery states
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    date TEXT NOT NULL,
+    learner_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (date, learner_id, channel, kind)
+) WITHOUT ROWID;
+"""
+
+CLAIM = (
+    "INSERT OR IGNORE INTO deliveries (date, learner_id, channel, kind, status, updated_at) "
+    "VALUES (?, ?, ?, ?, 'sending', ?)"
+)
+TAKE_OVER = (
+    "UPDATE deliveries SET status = 'sending', attempts = attempts + 1, updated_at = ? "
+    "WHERE date = ? AND learner_id = ? AND channel = ? AND kind = ? "
+    "AND (status = 'failed' OR (status = 'sending' AND updated_at < ?))"
+)
+RECORD = (
+    "UPDATE deliveries SET status = ?, updated_at = ? "
+    "WHERE date = ? AND learner_id = ? AND channel = ? AND kind = ? AND status = 'sending'"
+)
+SELECT_STATUS = "SELECT status FROM deliveries WHERE date = ? AND learner_id = ? AND channel = ? AND kind = ?"
+COMPACT = "DELETE FROM deliveries WHERE date < ?"
+COUNT = "SELECT COUNT(*) FROM deliveries"
+
+
+def _row_key(key):
+    """Convert a Notification key (learner, channel, kind, ISO date) to the table's key order."""
+    learner_id, channel, kind, day = key
+    return day, learner_id, channel, kind
+
+
+class DeliveryLedger:
+    """Persistent record of notification deliveries, shared by every process using the same file."""
+
+    def __init__(self, path=LEDGER_FILE, claim_timeout=CLAIM_TIMEOUT, clock=time.time):
+        self.path = path
+        self.claim_timeout = claim_timeout
+        self._clock = clock
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, work):
+        """Run work(conn) in one write transaction, taking the lock up front."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def status(self, key):
+        """Return SENDING, SENT or FAILED for a notification key, or None if it was never claimed."""
+        row = self._connect().execute(SELECT_STATUS, _row_key(key)).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, key):
+        """Return True if the notification was delivered."""
+        return self.status(key) == SENT
+
+    def claim(self, keys):
+        """Claim notification keys for sending, all in one transaction.
+
+        A key can be claimed if it is new, its last delivery failed, or its
+        claim is older than claim_timeout.
+
+        Returns:
+            The claimed keys, in order; the rest are sent or being sent elsewhere
+        """
+        def work(conn):
+            now = self._clock()
+            stale = now - self.claim_timeout
+            claimed = []
+            for key in keys:
+                row_key = _row_key(key)
+                if conn.execute(CLAIM, row_key + (now,)).rowcount or \
+                        conn.execute(TAKE_OVER, (now,) + row_key + (stale,)).rowcount:
+                    claimed.append(key)
+            return claimed
+
+        return self._write(work) if keys else []
+
+    def record(self, outcomes):
+        """Record the outcome of claimed sends in one transaction.
+
+        Args:
+            outcomes: Iterable of (key, True if delivered)
+        """
+        outcomes = list(outcomes)
+        if not outcomes:
+            return
+
+        def work(conn):
+            now = self._clock()
+            conn.executemany(RECORD, [
+                (SENT if ok else FAILED, now) + _row_key(key) for key, ok in outcomes
+            ])
+
+        self._write(work)
+
+    def compact(self, today, retention_days=LEDGER_RETENTION_DAYS):
+        """Drop every delivery dated more than retention_days before today.
+
+        Returns:
+            The number of deliveries removed
+        """
+        cutoff = (today - timedelta(days=retention_days)).isoformat()
+        return self._write(lambda conn: conn.execute(COMPACT, (cutoff,)).rowcount)
+
+    def __len__(self):
+        return self._connect().execute(COUNT).fetchone()[0]
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """Return the process-wide ledger on LEDGER_FILE, opening it on first use."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = DeliveryLedger()
+        return _ledger
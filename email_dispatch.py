@@ -0,0 +1,507 @@
+"""
+Email delivery pipeline for the Python learning tracker.
+
+email_notifications.send_email only queues a message and returns, so a slow
+mail server never blocks a Streamlit rerun or the reminder scheduler. A
+background thread runs an asyncio loop with a pool of workers that take
+messages off a queue of messages ready to go:
+
+- at most EMAIL_PER_DOMAIN messages to one recipient domain are in flight
+  at a time; the rest wait in a queue per domain and only reach the
+  workers when a slot frees up, so one slow provider cannot take every
+  worker;
+- SMTP connections are pooled and reused across messages instead of
+  opening one per email;
+- transient failures (dropped connections, 4xx replies) are retried with
+  exponential backoff, while permanent ones (5xx replies) fail at once; a
+  message waiting to be retried holds neither a worker nor a domain slot.
+
+smtplib is blocking, so each send runs on a thread of the dispatcher's
+executor; the asyncio side only schedules, limits and retries.
+
+Where mail goes is chosen by TRACKER_EMAIL_TRANSPORT:
+    sink  (default) an in-process SMTP server that keeps and logs messages,
+          for development and tests
+    smtp  the server in TRACKER_SMTP_HOST / TRACKER_SMTP_PORT, with optional
+          TRACKER_SMTP_USERNAME / TRACKER_SMTP_PASSWORD and TRACKER_SMTP_STARTTLS=1
+
+The sink can also run on its own for another process to deliver to:
+    python email_dispatch.py --sink [--port 1025]
+"""
+import asyncio
+import atexit
+import collections
+import concurrent.futures
+import email
+import email.policy
+import logging
+import os
+import random
+import smtplib
+import threading
+from email.message import EmailMessage
+
+EMAIL_TRANSPORT = os.environ.get("TRACKER_EMAIL_TRANSPORT", "sink")
+SMTP_HOST = os.environ.get("TRACKER_SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("TRACKER_SMTP_PORT", "1025"))
+SMTP_USERNAME = os.environ.get("TRACKER_SMTP_USERNAME")
+SMTP_PASSWORD = os.environ.get("TRACKER_SMTP_PASSWORD")
+SMTP_STARTTLS = os.environ.get("TRACKER_SMTP_STARTTLS", "0") == "1"
+EMAIL_FROM = os.environ.get("TRACKER_EMAIL_FROM", "Python Learning Tracker <tracker@localhost>")
+
+# Concurrent sends overall, and per recipient domain
+EMAIL_WORKERS = int(os.environ.get("TRACKER_EMAIL_WORKERS", "16"))
+EMAIL_PER_DOMAIN = int(os.environ.get("TRACKER_EMAIL_PER_DOMAIN", "4"))
+
+# Attempts per message, and the delay before the first retry (doubled for each further one)
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_BACKOFF = 1.0
+
+# Seconds to wait for an SMTP server to answer
+SMTP_TIMEOUT = 30
+
+# Seconds queued messages may take to go out when the process exits
+EXIT_DRAIN_TIMEOUT = 5
+
+# Messages the sink keeps in memory
+SINK_MESSAGES = 1000
+
+
+class SmtpTransport:
+    """Sends messages over SMTP, reusing a pool of open connections."""
+
+    def __init__(self, host, port, username=None, password=None, starttls=False,
+                 pool_size=EMAIL_WORKERS, timeout=SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password or "")
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        _quit(conn)
+
+    def send(self, message):
+        """Send an EmailMessage, blocking until the server accepts it.
+
+        A pooled connection the server has since closed is replaced once
+        before the error is passed on.
+        """
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is not None:
+            try:
+                conn.send_message(message)
+                self._release(conn)
+                return
+            except smtplib.SMTPServerDisconnected:
+                _quit(conn)
+            except BaseException:
+                _quit(conn)
+                raise
+
+        conn = self._connect()
+        try:
+            conn.send_message(message)
+        except BaseException:
+            _quit(conn)
+            raise
+        self._release(conn)
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            _quit(conn)
+
+
+def _quit(conn):
+    try:
+        conn.quit()
+    except Exception:
+        conn.close()
+
+
+def is_transient(error):
+    """Return True if a failed send is worth retrying."""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return isinstance(error, (smtplib.SMTPServerDisconnected, OSError))
+
+
+class LocalSmtpSink:
+    """Minimal SMTP server that accepts every message and keeps the latest ones in memory.
+
+    Runs on its own thread and event loop; messages holds email.message.EmailMessage objects.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, keep=SINK_MESSAGES):
+        self.host = host
+        self.port = port
+        self.messages = collections.deque(maxlen=keep)
+        self.received = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Start listening; port 0 picks a free port, available as self.port afterwards."""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._session, self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="smtp-sink", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    async def _session(self, reader, writer):
+        def reply(line):
+            writer.write(line.encode("ascii") + b"\r\n")
+
+        reply("220 localhost Python Learning Tracker SMTP sink")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line[:4].upper()
+                if command == b"EHLO":
+                    reply("250-localhost")
+                    reply("250 8BITMIME")
+                elif command == b"DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    lines = []
+                    while True:
+                        line = await reader.readline()
+                        if not line or line in (b".\r\n", b".\n"):
+                            break
+                        # Undo SMTP dot-stuffing
+                        lines.append(line[1:] if line.startswith(b"..") else line)
+                    self._deliver(b"".join(lines))
+                    reply("250 OK: queued")
+                elif command == b"QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                elif command in (b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                    reply("250 OK")
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _deliver(self, data):
+        message = email.message_from_bytes(data, policy=email.policy.default)
+        self.messages.append(message)
+        self.received += 1
+        logging.info(f"EMAIL TO: {message['To']} SUBJECT: {message['Subject']}")
+
+
+class _Job:
+    __slots__ = ("to_email", "subject", "html", "domain", "future", "message", "attempt")
+
+    def __init__(self, to_email, subject, html, future):
+        self.to_email = to_email
+        self.subject = subject
+        self.html = html
+        self.domain = to_email.rpartition("@")[2].strip(" >").lower()
+        self.future = future
+        self.message = None  # Built on a send thread, so enqueueing stays cheap
+        self.attempt = 0
+
+
+class EmailDispatcher:
+    """Queue of outgoing emails delivered by asyncio workers on a background thread."""
+
+    def __init__(self, transport, workers=EMAIL_WORKERS, per_domain=EMAIL_PER_DOMAIN,
+                 max_attempts=EMAIL_MAX_ATTEMPTS, backoff=EMAIL_RETRY_BACKOFF, sender=EMAIL_FROM):
+        """
+        Args:
+            transport: Object whose blocking send(message) delivers one EmailMessage
+            workers: Messages in flight at once
+            per_domain: Messages in flight at once to one recipient domain
+            max_attempts: Attempts per message before it is given up
+            backoff: Seconds before the first retry; doubled for each further one
+            sender: The From address
+        """
+        self.transport = transport
+        self.workers = workers
+        self.per_domain = per_domain
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.sender = sender
+        self.stats = collections.Counter()
+        self._loop = None
+        self._queue = None  # Jobs admitted under their domain's limit, ready for a worker
+        self._waiting = collections.defaultdict(collections.deque)  # Domain -> jobs over its limit
+        self._active = collections.Counter()  # Domain -> jobs admitted and not yet finished
+        self._in_flight = set()
+        self._retries = {}  # Job -> timer handle for its next attempt
+        self._outstanding = 0
+        self._idle = None
+        self._tasks = []
+        self._executor = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker thread; calling it again does nothing."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            started = threading.Event()
+            self._executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="email-send")
+
+            def run():
+                self._loop = asyncio.new_event_loop()
+                self._queue = asyncio.Queue()
+                self._idle = asyncio.Event()
+                self._idle.set()
+                self._tasks = [self._loop.create_task(self._worker()) for _ in range(self.workers)]
+                started.set()
+                self._loop.run_forever()
+                self._loop.close()
+
+            self._thread = threading.Thread(target=run, name="email-dispatcher", daemon=True)
+            self._thread.start()
+            started.wait()
+        return self
+
+    def enqueue(self, to_email, subject, html):
+        """Queue an HTML email and return at once.
+
+        Returns:
+            A concurrent.futures.Future that resolves to True once the message
+            is delivered, or False if it was given up
+        """
+        future = concurrent.futures.Future()
+        job = _Job(to_email, subject, html, future)
+        self.start()
+        with self._lock:
+            self.stats["queued"] += 1
+            self._loop.call_soon_threadsafe(self._submit, job)
+        return future
+
+    def pending(self):
+        """Return the number of messages queued and not yet delivered or given up."""
+        return self.stats["queued"] - self.stats["sent"] - self.stats["failed"]
+
+    def drain(self, timeout=None):
+        """Wait until every queued message is delivered or given up.
+
+        Returns:
+            True if the queue drained within timeout
+        """
+        if self._loop is None:
+            return True
+        done = asyncio.run_coroutine_threadsafe(self._idle.wait(), self._loop)
+        try:
+            done.result(timeout)
+            return True
+        except concurrent.futures.TimeoutError:
+            return False
+
+    def stop(self, timeout=None):
+        """Deliver what is queued (waiting at most timeout seconds), then stop the workers."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self.drain(timeout)
+            asyncio.run_coroutine_threadsafe(self._cancel_workers(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._executor.shutdown(wait=False)
+            self._thread = None
+            self._loop = None
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            close()
+
+    def _send(self, job):
+        """Build the job's message (once) and send it; runs on an executor thread."""
+        if job.message is None:
+            message = EmailMessage()
+            message["From"] = self.sender
+            message["To"] = job.to_email
+            message["Subject"] = job.subject
+            message.set_content("This message is best viewed in an HTML-capable email client.")
+            message.add_alternative(job.html, subtype="html")
+            job.message = message
+        self.transport.send(job.message)
+
+    # The methods below run on the dispatcher's event loop
+
+    def _submit(self, job):
+        self._outstanding += 1
+        self._idle.clear()
+        job.attempt = 0
+        self._admit(job)
+
+    def _admit(self, job):
+        """Hand a job to the workers if its domain has a free slot, else queue it for that domain."""
+        self._retries.pop(job, None)
+        if self._active[job.domain] < self.per_domain:
+            self._active[job.domain] += 1
+            self._queue.put_nowait(job)
+        else:
+            self._waiting[job.domain].append(job)
+
+    def _release(self, job):
+        """Free the job's domain slot, admitting the next job waiting for that domain."""
+        waiting = self._waiting.get(job.domain)
+        if waiting:
+            self._queue.put_nowait(waiting.popleft())
+            if not waiting:
+                del self._waiting[job.domain]
+        else:
+            self._active[job.domain] -= 1
+            if not self._active[job.domain]:
+                del self._active[job.domain]
+
+    def _finish(self, job, delivered):
+        if job.future.done():
+            return
+        self.stats["sent" if delivered else "failed"] += 1
+        job.future.set_result(delivered)
+        self._outstanding -= 1
+        if not self._outstanding:
+            self._idle.set()
+
+    async def _cancel_workers(self):
+        # Everything in flight, queued or waiting to be retried is given up; take the
+        # in-flight jobs first, as cancelling their workers forgets them
+        jobs = list(self._in_flight) + list(self._retries)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while not self._queue.empty():
+            jobs.append(self._queue.get_nowait())
+        for waiting in self._waiting.values():
+            jobs.extend(waiting)
+        for handle in self._retries.values():
+            handle.cancel()
+        self._in_flight.clear()
+        self._retries.clear()
+        self._waiting.clear()
+        self._active.clear()
+        for job in jobs:
+            self._finish(job, False)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            self._in_flight.add(job)
+            try:
+                await self._deliver(job)
+            except Exception as e:
+                print(f"Error sending email: {e}")
+                self._release(job)
+                self._finish(job, False)
+            finally:
+                self._in_flight.discard(job)
+
+    async def _deliver(self, job):
+        """Make one attempt at a job that holds a domain slot."""
+        job.attempt += 1
+        try:
+            await self._loop.run_in_executor(self._executor, self._send, job)
+        except Exception as e:
+            self._release(job)
+            if job.attempt >= self.max_attempts or not is_transient(e):
+                print(f"Error sending email to {job.to_email} (attempt {job.attempt}): {e}")
+                self._finish(job, False)
+                return
+            self.stats["retried"] += 1
+            # Back off without holding a worker or the domain slot, with jitter so retries spread out
+            delay = self.backoff * 2 ** (job.attempt - 1) * random.uniform(1, 1.5)
+            self._retries[job] = self._loop.call_later(delay, self._admit, job)
+        else:
+            self._release(job)
+            self._finish(job, True)
+
+
+_dispatcher = None
+_sink = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_sink():
+    """Return the in-process SMTP sink, or None unless EMAIL_TRANSPORT is "sink"."""
+    return _sink
+
+
+def get_dispatcher():
+    """Return the process-wide dispatcher, creating it for EMAIL_TRANSPORT on first use."""
+    global _dispatcher, _sink
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            if EMAIL_TRANSPORT == "sink":
+                _sink = LocalSmtpSink().start()
+                transport = SmtpTransport(_sink.host, _sink.port)
+            elif EMAIL_TRANSPORT == "smtp":
+                transport = SmtpTransport(SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_STARTTLS)
+            else:
+                raise ValueError(f"Unknown email transport: {EMAIL_TRANSPORT}")
+            _dispatcher = EmailDispatcher(transport).start()
+            atexit.register(_dispatcher.stop, EXIT_DRAIN_TIMEOUT)
+        return _dispatcher
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the local SMTP sink")
+    parser.add_argument("--sink", action="store_true", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SMTP_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sink = LocalSmtpSink(args.host, args.port).start()
+    print(f"SMTP sink listening on {sink.host}:{sink.port}; press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        sink.stop()
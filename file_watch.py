@@ -0,0 +1,107 @@
+"""
+File change notifications for the Python learning tracker's stores.
+
+On Linux an inotify watcher tells stores when their files change, so reads
+can skip checking the files on disk until another process actually writes.
+Elsewhere get_watcher() returns None and stores fall back to checking file
+metadata on every read.
+"""
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import weakref
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event header: wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Watches directories with inotify and calls back when a watched file changes."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories = {}  # watch descriptor -> directory
+        self._watch_descriptors = {}  # directory -> watch descriptor
+        self._callbacks = {}  # (directory, file name) -> weak callbacks
+        self._lock = threading.Lock()
+
+        thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        thread.start()
+
+    def watch(self, path, callback):
+        """Call callback (a bound method, held weakly) whenever path changes.
+
+        Returns:
+            True if the watch was registered, False otherwise
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        with self._lock:
+            if directory not in self._watch_descriptors:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    print(f"Could not watch {directory}: {os.strerror(ctypes.get_errno())}")
+                    return False
+                self._watch_descriptors[directory] = wd
+                self._directories[wd] = directory
+            self._callbacks.setdefault((directory, name), []).append(weakref.WeakMethod(callback))
+        return True
+
+    def _run(self):
+        while True:
+            buffer = os.read(self._fd, 64 * 1024)
+            offset = 0
+            while offset < len(buffer):
+                wd, _, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                start = offset + _EVENT_HEADER.size
+                name = buffer[start:start + length].rstrip(b"\0").decode("utf-8", "replace")
+                offset = start + length
+                self._dispatch(self._directories.get(wd), name)
+
+    def _dispatch(self, directory, name):
+        with self._lock:
+            refs = self._callbacks.get((directory, name))
+            if not refs:
+                return
+            callbacks = [ref() for ref in refs]
+            # Drop callbacks whose stores have been garbage collected
+            refs[:] = [ref for ref, callback in zip(refs, callbacks) if callback is not None]
+
+        for callback in callbacks:
+            if callback is not None:
+                callback()
+
+
+_watcher = None
+_watcher_unavailable = False
+_watcher_lock = threading.Lock()
+
+
+def get_watcher():
+    """Return the shared file watcher, or None where inotify is unavailable."""
+    global _watcher, _watcher_unavailable
+
+    if not sys.platform.startswith("linux"):
+        return None
+    with _watcher_lock:
+        if _watcher is None and not _watcher_unavailable:
+            try:
+                _watcher = InotifyWatcher()
+            except (OSError, AttributeError) as e:
+                print(f"File watching unavailable: {e}")
+                _watcher_unavailable = True
+        return _watcher
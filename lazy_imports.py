@@ -0,0 +1,62 @@
+"""
+Lazy imports for the Python learning tracker.
+
+lazy_import("pandas") returns a stand-in module that performs the real
+import the first time one of its attributes is used. app.py uses it for
+heavy modules (pandas, plotly via visualizations, the notification
+senders) so a cold start only pays for what the opened page needs. The
+time each lazy import took is recorded for the startup benchmark.
+"""
+import importlib
+import sys
+import threading
+import time
+import types
+
+# Seconds spent importing each lazily imported module, in load order
+import_times = {}
+
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_lazy_target"]
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    import_times.setdefault(self.__name__, time.perf_counter() - start)
+                    self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name):
+    """Return module name, imported now if it already is, else on first use."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(name):
+    """Return True if module name has actually been imported."""
+    return name in sys.modules
@@ -0,0 +1,282 @@
+"""
+Background notification scheduler for the Python learning tracker.
+
+Reminders are no longer checked inside Streamlit reruns, where they were
+only sent if someone happened to load the page just after the reminder
+time. Instead the next reminder time of every learner on every enabled
+channel is kept in a min-heap, and a service thread sleeps until the
+earliest one is due, so delivery does not depend on page traffic and an
+idle process does no work between reminders.
+
+When reminders fall due, every entry due by then is taken off the heap at
+once and handed to the notification pipeline as one batch (see
+notifications.py), which collects, de-duplicates and delivers them. Each
+entry is then queued again for the next day. Settings saved in this
+process are picked up through reschedule(); a resync shortly after
+midnight picks up learners and settings changed by other processes, and
+compacts the delivery ledger.
+
+The app starts the scheduler as a thread in the Streamlit process. It can
+also run as its own process (set TRACKER_NOTIFICATION_SCHEDULER=external
+for the app so reminders are not sent twice):
+    python notification_scheduler.py
+A separate scheduler process only learns about settings saved in the app
+at its next resync (RESYNC_TIME), so a reminder time changed during the
+day takes effect from the following day.
+"""
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+
+import data_handler as dh
+import notifications
+
+# A reminder whose time passed at most this long ago when the scheduler starts is still sent
+REMINDER_GRACE = timedelta(minutes=5)
+
+# Time of day ("HH:MM") at which every learner's settings are re-read
+RESYNC_TIME = "00:05"
+
+# Heap entry standing for the daily resync instead of a (learner, channel)
+_RESYNC = None
+
+
+def next_fire_time(reminder_time, after):
+    """Return the first datetime strictly after `after` at reminder_time ("HH:MM")."""
+    hour, minute = map(int, reminder_time.split(":"))
+    fire = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if fire <= after:
+        fire += timedelta(days=1)
+    return fire
+
+
+class NotificationScheduler:
+    """Service thread that hands each learner's reminders to the pipeline when they fall due.
+
+    Entries are keyed by (learner ID, channel name). Like the storage
+    write-behind flusher, fire times are kept in a min-heap; an entry
+    superseded by a later reschedule of the same key is skipped when it
+    reaches the top.
+    """
+
+    def __init__(self, pipeline=None, channels=None, clock=datetime.now):
+        """
+        Args:
+            pipeline: The NotificationPipeline due reminders are handed to
+            channels: Channels to schedule, by name (defaults to every registered channel)
+            clock: Function returning the current local datetime
+        """
+        self.pipeline = pipeline or notifications.NotificationPipeline()
+        self.channels = notifications.CHANNELS if channels is None else channels
+        self._clock = clock
+        self._heap = []
+        self._next = {}  # (learner ID, channel) -> next fire time
+        self._fired = {}  # (learner ID, channel) -> last fire time, so a reschedule never repeats it
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def __len__(self):
+        """Return the number of (learner, channel) reminders scheduled."""
+        with self._cond:
+            return len(self._next) - (_RESYNC in self._next)
+
+    def next_fire_time(self, learner_id, channel_name):
+        """Return when a learner's next reminder on a channel is due, or None if none is scheduled."""
+        with self._cond:
+            return self._next.get((learner_id, channel_name))
+
+    def _push(self, fire, key):
+        self._next[key] = fire
+        heapq.heappush(self._heap, (fire, next(self._counter), key))
+        self._cond.notify()
+
+    def _fire_time(self, key, settings, after):
+        if not self.channels[key[1]].is_enabled(settings):
+            return None
+        if after is None:
+            with self._cond:
+                last_fired = self._fired.get(key)
+            after = self._clock() - REMINDER_GRACE
+            if last_fired is not None and last_fired > after:
+                after = last_fired
+        try:
+            return next_fire_time(settings["reminder_time"], after)
+        except (ValueError, AttributeError) as e:
+            print(f"Error scheduling {key[1]} reminders for {key[0]}: {e}")
+            return None
+
+    def reschedule(self, learner_id, channel_names=None, after=None, settings=None):
+        """Schedule a learner's next reminders from their current settings.
+
+        Call this after a learner's notification settings change. Settings
+        are read without going through the per-learner store cache, so the
+        daily burst of reschedules never evicts active sessions' stores.
+
+        Args:
+            learner_id: The learner
+            channel_names: Channels to reschedule (defaults to all of them)
+            after: Only schedule reminders after this datetime (defaults to now,
+                less REMINDER_GRACE, or the last reminder on the channel if later)
+            settings: {channel name: settings} to use instead of the stored ones,
+                e.g. settings just saved in a transaction that is not committed yet
+
+        Returns:
+            {channel name: next fire time, or None if that channel is turned off}
+        """
+        channel_names = list(self.channels) if channel_names is None else channel_names
+        settings = dict(settings or {})
+        missing = [name for name in channel_names if name not in settings]
+        if missing:
+            data = dh.read_learner_data(learner_id)
+            for name in missing:
+                channel = self.channels[name]
+                settings[name] = channel.with_defaults(data.get(channel.settings_section) or {})
+        return self._schedule(learner_id, {name: settings[name] for name in channel_names}, after)
+
+    def _schedule(self, learner_id, settings, after=None):
+        """Schedule a learner's next reminders from {channel name: settings}."""
+        scheduled = {}
+        for name in settings:
+            key = (learner_id, name)
+            fire = self._fire_time(key, settings[name], after)
+            with self._cond:
+                if fire is None:
+                    self._next.pop(key, None)
+                else:
+                    self._push(fire, key)
+            scheduled[name] = fire
+        return scheduled
+
+    def resync(self):
+        """Re-read every learner's settings, compact the delivery ledger and schedule the next resync."""
+        try:
+            self.pipeline.ledger.compact(self._clock().date())
+        except Exception as e:
+            print(f"Error compacting the delivery ledger: {e}")
+        # One pass over every learner's settings that does not go through the
+        # per-learner store cache, so it never evicts active sessions' stores
+        sections = {name: channel.settings_section for name, channel in self.channels.items()}
+        stored = dh.get_all_settings(set(sections.values()))
+        for learner_id, learner_sections in stored.items():
+            self._schedule(learner_id, {
+                name: self.channels[name].with_defaults(learner_sections[section])
+                for name, section in sections.items()
+            })
+        with self._cond:
+            # Learners that no longer exist drop out when their entry comes up
+            known = set(stored)
+            for key in [key for key in self._next if key is not _RESYNC and key[0] not in known]:
+                del self._next[key]
+            self._push(next_fire_time(RESYNC_TIME, self._clock()), _RESYNC)
+
+    def start(self):
+        """Start the service thread; it resyncs first, so this returns immediately."""
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="notification-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the service thread after any batch in progress."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+
+    def _pop_due(self):
+        """Wait until the earliest entry is due, then pop every entry due by now.
+
+        Returns:
+            A list of (fire time, key), or None once the scheduler is stopping
+        """
+        with self._cond:
+            while not self._stopping:
+                # Skip entries superseded by a reschedule
+                while self._heap and self._next.get(self._heap[0][2]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                now = self._clock()
+                timeout = (self._heap[0][0] - now).total_seconds()
+                if timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    fire, _, key = heapq.heappop(self._heap)
+                    if self._next.get(key) != fire:
+                        continue
+                    del self._next[key]
+                    if key is not _RESYNC:
+                        self._fired[key] = fire
+                    due.append((fire, key))
+                return due
+        return None
+
+    def _run(self):
+        try:
+            self.resync()
+        except Exception as e:
+            print(f"Error loading notification settings: {e}")
+
+        while True:
+            due = self._pop_due()
+            if due is None:
+                return
+
+            reminders = [(fire, key) for fire, key in due if key is not _RESYNC]
+            if reminders:
+                try:
+                    self.pipeline.process([(key[0], key[1], fire.date()) for fire, key in reminders])
+                except Exception as e:
+                    print(f"Error sending notifications: {e}")
+                for fire, (learner_id, channel_name) in reminders:
+                    try:
+                        self.reschedule(learner_id, [channel_name], after=fire)
+                    except Exception as e:
+                        print(f"Error scheduling reminders for {learner_id}: {e}")
+
+            for fire, key in due:
+                if key is _RESYNC:
+                    try:
+                        self.resync()
+                    except Exception as e:
+                        print(f"Error loading notification settings: {e}")
+                        with self._cond:
+                            self._push(next_fire_time(RESYNC_TIME, fire), _RESYNC)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler():
+    """Return the process-wide scheduler, starting it on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = NotificationScheduler().start()
+        return _scheduler
+
+
+def get_scheduler():
+    """Return the process-wide scheduler, or None if it has not been started."""
+    return _scheduler
+
+
+if __name__ == "__main__":
+    print("Notification scheduler running; press Ctrl+C to stop.")
+    scheduler = start_scheduler()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        scheduler.stop()
@@ -0,0 +1,433 @@
+"""
+Notification pipeline for the Python learning tracker.
+
+Each way of reaching a learner (email, SMS, webhook, a local file) is a
+channel plugin that only knows how to render and deliver a batch of
+notifications. Everything else is shared by all channels:
+
+    scheduling      notification_scheduler fires each (learner, channel)
+                    at the reminder time in that channel's settings
+    collection      collect() works out which notifications are due: the
+                    daily reminder, and a missed-day notice if the day
+                    scheduled yesterday was not completed
+    de-duplication  each notification is claimed in the delivery ledger
+                    by learner, channel, kind and date, and only sent if
+                    the claim succeeds; the outcome is recorded after
+    batching        due notifications are grouped per channel and handed
+                    to the channel's send_many in one call
+    metrics         sent, failed and duplicate counts per channel and kind
+
+Every channel keeps its settings in the learner's data under its own
+section ("email_settings", "sms_settings", ...) with the fields of
+DEFAULT_SETTINGS plus the channel's address field. To add a channel,
+subclass Channel, implement send_many and pass an instance to
+register_channel().
+
+Learners' data is read with dh.read_learner_data, never through the
+per-learner store cache, so a burst of reminders does not evict the
+stores of active sessions.
+
+Run notification_scheduler.py with TRACKER_NOTIFICATION_FILE set and the
+file channel enabled to watch deliveries without any external service.
+"""
+import abc
+import collections
+import concurrent.futures
+import ipaddress
+import json
+import os
+import socket
+import threading
+import urllib.parse
+from datetime import timedelta
+
+import data_handler as dh
+import delivery_ledger
+import utils
+
+# Notification kinds
+DAILY_REMINDER = "daily_reminder"
+MISSED_DAY = "missed_day"
+
+# Settings shared by every channel; each channel adds its address field
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "reminder_time": "09:00",
+    "missed_day_notification": True,
+    "daily_reminder": True
+}
+
+# Concurrent requests made by the webhook channel
+WEBHOOK_WORKERS = 8
+WEBHOOK_TIMEOUT = 10
+
+# Seconds a batch of emails may take to go out; any still unsent then count as failed
+EMAIL_BATCH_TIMEOUT = 300
+
+# Hosts webhooks may be sent to, comma-separated (e.g. "hooks.slack.com,discord.com");
+# when empty any host is allowed as long as it resolves to public addresses only
+WEBHOOK_ALLOWED_HOSTS = frozenset(
+    host.strip().lower() for host in os.environ.get("TRACKER_WEBHOOK_HOSTS", "").split(",") if host.strip()
+)
+
+NOTIFICATION_FILE = os.environ.get("TRACKER_NOTIFICATION_FILE", "notifications.jsonl")
+
+
+class Notification:
+    """One message due to one learner on one channel."""
+
+    __slots__ = ("learner_id", "channel", "kind", "date", "address", "day_info")
+
+    def __init__(self, learner_id, channel, kind, date, address, day_info):
+        self.learner_id = learner_id
+        self.channel = channel
+        self.kind = kind
+        self.date = date
+        self.address = address
+        self.day_info = day_info
+
+    @property
+    def key(self):
+        """Identity used for de-duplication: (learner, channel, kind, ISO date)."""
+        return self.learner_id, self.channel, self.kind, self.date.isoformat()
+
+    def text(self):
+        """Return the plain-text message, shared by channels without their own template."""
+        topic = self.day_info["topic"]
+        if self.kind == MISSED_DAY:
+            return f"You missed your Python practice yesterday! Today's topic: {topic}. Don't break your streak!"
+        return f"Remember to practice Python today! Your scheduled topic: {topic}"
+
+
+class Channel(abc.ABC):
+    """A way of delivering notifications; subclasses implement send_many."""
+
+    name = None
+    settings_section = None
+    address_field = None
+
+    def default_settings(self):
+        return dict(DEFAULT_SETTINGS, **{self.address_field: ""})
+
+    def with_defaults(self, stored):
+        """Return a learner's stored settings section with this channel's defaults filled in."""
+        return dict(self.default_settings(), **stored)
+
+    def get_settings(self):
+        """Return the current learner's settings for this channel, defaults filled in."""
+        return self.with_defaults(dh.get_settings(self.settings_section))
+
+    def address(self, settings):
+        """Return where this channel reaches the learner, from their settings."""
+        return settings[self.address_field]
+
+    def is_enabled(self, settings):
+        return bool(settings["enabled"] and self.address(settings))
+
+    @abc.abstractmethod
+    def send_many(self, notifications):
+        """Deliver a batch of notifications.
+
+        Returns:
+            A list of True/False results in the order of notifications
+        """
+
+
+class EmailChannel(Channel):
+    """HTML email, queued on the email dispatcher."""
+
+    name = "email"
+    settings_section = "email_settings"
+    address_field = "email"
+
+    def render(self, notification):
+        """Return (subject, HTML body) for a notification."""
+        day_info = notification.day_info
+        if notification.kind == MISSED_DAY:
+            return "Python Learning - Missed Practice Day", f"""
+    <html>
+    <body>
+    <h2>Python Learning Tracker - Missed Day Alert</h2>
+    <p>Hello Python learner!</p>
+    <p>We noticed you missed your Python practice yesterday. Don't worry - it happens to everyone!</p>
+    <div style="background-color: #fff0f0; padding: 15px; border-left: 5px solid #dc3545; margin: 10px 0;">
+        <h3>Today's topic: Day {day_info['day']}: {day_info['topic']}</h3>
+        <p>Why not catch up today? Remember, consistency is key to learning programming!</p>
+    </div>
+    <p>Don't break your learning streak - a little practice every day is better than a long session once a week.</p>
+    <p>Happy coding!</p>
+    </body>
+    </html>
+    """
+        return "Python Learning Reminder", f"""
+    <html>
+    <body>
+    <h2>Python Learning Tracker - Daily Reminder</h2>
+    <p>Hello Python learner!</p>
+    <p>This is a friendly reminder about today's learning topic:</p>
+    <div style="background-color: #f0f8ff; padding: 15px; border-left: 5px solid #3366cc; margin: 10px 0;">
+        <h3>Day {day_info['day']}: {day_info['topic']}</h3>
+        <p><strong>Practice:</strong> {day_info['practice']}</p>
+        <p><strong>Scheduled for:</strong> {day_info['formatted_date']}</p>
+    </div>
+    <p>Don't forget to mark your progress in the Python Learning Tracker!</p>
+    <p>Happy coding!</p>
+    </body>
+    </html>
+    """
+
+    def send_many(self, notifications):
+        import email_dispatch
+
+        dispatcher = email_dispatch.get_dispatcher()
+        futures = [dispatcher.enqueue(n.address, *self.render(n)) for n in notifications]
+        # The whole batch is in flight at once; wait for the outcomes, but not forever
+        concurrent.futures.wait(futures, timeout=EMAIL_BATCH_TIMEOUT)
+        return [future.done() and future.result() for future in futures]
+
+
+class SmsChannel(Channel):
+    """Text message through the rate-limited Twilio sender."""
+
+    name = "sms"
+    settings_section = "sms_settings"
+    address_field = "phone_number"
+
+    def send_many(self, notifications):
+        import sms_notifications
+
+        return sms_notifications.send_many([(n.address, n.text()) for n in notifications])
+
+
+def check_webhook_url(url):
+    """Make sure a learner-supplied webhook URL cannot reach the server's own network.
+
+    Raises:
+        ValueError: Unless url is https, on an allowed host, and that host
+            resolves to public addresses only
+    """
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme != "https" or not host:
+        raise ValueError("Webhook URLs must be https:// URLs")
+    if WEBHOOK_ALLOWED_HOSTS and host not in WEBHOOK_ALLOWED_HOSTS:
+        raise ValueError(f"Webhooks to {host} are not allowed")
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or 443, type=socket.SOCK_STREAM)}
+    except socket.gaierror as e:
+        raise ValueError(f"Cannot resolve {host}: {e}")
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise ValueError(f"Webhook host {host} resolves to non-public address {address}")
+
+
+class WebhookChannel(Channel):
+    """JSON POST to a URL chosen by the learner (e.g. a chat integration)."""
+
+    name = "webhook"
+    settings_section = "webhook_settings"
+    address_field = "url"
+
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _post(self, notification):
+        payload = {
+            "learner_id": notification.learner_id,
+            "kind": notification.kind,
+            "date": notification.date.isoformat(),
+            "day": notification.day_info["day"],
+            "topic": notification.day_info["topic"],
+            "text": notification.text()
+        }
+        try:
+            check_webhook_url(notification.address)
+            # Redirects are not followed, since they could point anywhere
+            response = self._session.post(notification.address, json=payload, timeout=WEBHOOK_TIMEOUT,
+                                          allow_redirects=False)
+            if response.status_code < 300:
+                return True
+            print(f"Error posting notification to {notification.address}: {response.status_code}")
+        except (OSError, ValueError) as e:
+            print(f"Error posting notification to {notification.address}: {e}")
+        return False
+
+    def send_many(self, notifications):
+        with self._lock:
+            if self._session is None:
+                # Imported here so loading this module does not pay for the HTTP stack
+                import requests
+                self._session = requests.Session()
+        with concurrent.futures.ThreadPoolExecutor(WEBHOOK_WORKERS) as executor:
+            return list(executor.map(self._post, notifications))
+
+
+class FileChannel(Channel):
+    """Appends notifications as JSON lines to NOTIFICATION_FILE, for development and auditing."""
+
+    name = "file"
+    settings_section = "file_settings"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def default_settings(self):
+        return dict(DEFAULT_SETTINGS)
+
+    def address(self, settings):
+        # The file is set for the deployment, never by a learner
+        return NOTIFICATION_FILE
+
+    def send_many(self, notifications):
+        lines_by_path = collections.defaultdict(list)
+        for n in notifications:
+            lines_by_path[n.address].append(json.dumps({
+                "learner_id": n.learner_id, "kind": n.kind, "date": n.date.isoformat(), "text": n.text()
+            }) + "\n")
+
+        failed = set()
+        with self._lock:
+            for path, lines in lines_by_path.items():
+                try:
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.writelines(lines)
+                except OSError as e:
+                    print(f"Error writing notifications to {path}: {e}")
+                    failed.add(path)
+        return [n.address not in failed for n in notifications]
+
+
+# Registered channels by name
+CHANNELS = {}
+
+
+def register_channel(channel):
+    """Make a channel available to the pipeline and the scheduler.
+
+    Raises:
+        ValueError: If the channel has no name or settings section
+    """
+    if not channel.name or not channel.settings_section:
+        raise ValueError(f"{type(channel).__name__} needs a name and a settings_section")
+    CHANNELS[channel.name] = channel
+    return channel
+
+
+def get_channel(name):
+    return CHANNELS[name]
+
+
+for _channel in (EmailChannel(), SmsChannel(), WebhookChannel(), FileChannel()):
+    register_channel(_channel)
+
+
+def missed_day(progress, learner_schedule, today):
+    """Return the day scheduled the day before today if it was not completed, else None."""
+    day_number = learner_schedule.day_on(today - timedelta(days=1))
+    if day_number is not None and not progress.is_completed(day_number):
+        return day_number
+    return None
+
+
+def collect(learner_id, channel, today, data=None):
+    """Return the notifications a learner is due on a channel on a date.
+
+    Args:
+        data: The learner's data, if already read (see dh.read_learner_data)
+    """
+    data = dh.read_learner_data(learner_id) if data is None else data
+    settings = channel.with_defaults(data.get(channel.settings_section) or {})
+    if not channel.is_enabled(settings):
+        return []
+
+    progress = dh.progress_snapshot_of(data)
+    learner_schedule = dh.schedule_of(data)
+    day_info = utils.get_day_info(utils.get_current_day(progress), learner_schedule)
+    if not day_info:
+        return []
+
+    kinds = []
+    if settings["missed_day_notification"] and missed_day(progress, learner_schedule, today) is not None:
+        kinds.append(MISSED_DAY)
+    if settings["daily_reminder"]:
+        kinds.append(DAILY_REMINDER)
+
+    address = channel.address(settings)
+    return [Notification(learner_id, channel.name, kind, today, address, day_info) for kind in kinds]
+
+
+class NotificationPipeline:
+    """Collects, de-duplicates, batches and delivers due notifications, counting outcomes."""
+
+    def __init__(self, channels=None, ledger=None):
+        """
+        Args:
+            channels: Channels by name (defaults to every registered channel)
+            ledger: The DeliveryLedger sends are claimed in (defaults to the shared one)
+        """
+        self.channels = CHANNELS if channels is None else channels
+        self.ledger = delivery_ledger.get_ledger() if ledger is None else ledger
+        self.metrics = collections.Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, notification, outcome):
+        with self._lock:
+            self.metrics[(notification.channel, notification.kind, outcome)] += 1
+
+    def process(self, due):
+        """Send everything due.
+
+        Args:
+            due: Iterable of (learner ID, channel name, date) whose reminder time has come
+
+        Returns:
+            The notifications that were delivered
+        """
+        collected = []
+        learner_data = {}  # Each learner is read once, however many channels are due
+        for learner_id, channel_name, today in due:
+            try:
+                if learner_id not in learner_data:
+                    learner_data[learner_id] = dh.read_learner_data(learner_id)
+                collected.extend(collect(learner_id, self.channels[channel_name], today, learner_data[learner_id]))
+            except Exception as e:
+                print(f"Error collecting notifications for {learner_id}: {e}")
+
+        # Only what this process manages to claim is sent; the rest is sent or in flight elsewhere
+        claimed = set(self.ledger.claim([notification.key for notification in collected]))
+        batches = collections.defaultdict(list)
+        for notification in collected:
+            if notification.key in claimed:
+                batches[notification.channel].append(notification)
+            else:
+                self._count(notification, "duplicate")
+
+        delivered = []
+        if not batches:
+            return delivered
+        # Channels deliver side by side, so a slow one does not hold up the others
+        with concurrent.futures.ThreadPoolExecutor(len(batches)) as executor:
+            results = executor.map(self._send_batch, batches.items())
+        outcomes = []
+        for (channel_name, batch), batch_results in zip(batches.items(), results):
+            for notification, ok in zip(batch, batch_results):
+                outcomes.append((notification.key, ok))
+                if ok:
+                    delivered.append(notification)
+                self._count(notification, "sent" if ok else "failed")
+        self.ledger.record(outcomes)
+        return delivered
+
+    def _send_batch(self, item):
+        channel_name, batch = item
+        try:
+            return self.channels[channel_name].send_many(batch)
+        except Exception as e:
+            print(f"Error sending {channel_name} notifications: {e}")
+            return [False] * len(batch)
+
+    def get_metrics(self):
+        """Return {(channel, kind, outcome): count} for everything processed so far."""
+        with self._lock:
+            return dict(self.metrics)
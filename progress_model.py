@@ -0,0 +1,217 @@
+"""
+Compact columnar model of a learner's per-day progress.
+
+Instead of the string-keyed dicts stored in JSON, progress is held as a
+completion bitset (bit d-1 set when day d is completed), an int32 array of
+completion dates as days since 1970-01-01, and an int32 array of minutes
+spent. Finding the current day and counting a week's completions become a
+handful of integer bit operations, and a learner's progress takes a few
+hundred bytes.
+"""
+import hashlib
+from array import array
+from datetime import date
+
+import numpy as np
+
+from storage import FrozenDict
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Marks a day without a (parseable) completion date
+NO_DATE = -2 ** 31
+
+
+def to_epoch_day(value):
+    """Convert a date or "YYYY-MM-DD" string to days since 1970-01-01 (NO_DATE if invalid)."""
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value)
+        except ValueError:
+            return NO_DATE
+    if not isinstance(value, date):
+        return NO_DATE
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def from_epoch_day(epoch_day):
+    """Convert days since 1970-01-01 back to a date (None for NO_DATE)."""
+    if epoch_day == NO_DATE:
+        return None
+    return date.fromordinal(epoch_day + EPOCH_ORDINAL)
+
+
+class ProgressColumns:
+    """Per-day progress of one learner as a bitset and two int32 arrays."""
+
+    __slots__ = ("days_count", "completed", "completion_days", "minutes")
+
+    def __init__(self, days_count, completed=0, completion_days=None, minutes=None):
+        self.days_count = days_count
+        self.completed = completed
+        self.completion_days = completion_days if completion_days is not None else array("i", [NO_DATE]) * days_count
+        self.minutes = minutes if minutes is not None else array("i", [0]) * days_count
+
+    @classmethod
+    def from_data(cls, data, days_count):
+        """Build the columns from the JSON data structure."""
+        columns = cls(days_count)
+        progress = data.get("progress", {})
+        time_spent = data.get("time_spent", {})
+
+        for day_num in range(1, days_count + 1):
+            day_str = str(day_num)
+            entry = progress.get(day_str)
+            if entry and entry.get("completed", False):
+                columns.completed |= 1 << (day_num - 1)
+                columns.completion_days[day_num - 1] = to_epoch_day(entry.get("date_completed"))
+            columns.minutes[day_num - 1] = int(time_spent.get(day_str, 0))
+        return columns
+
+    def to_data(self):
+        """Dump the columns back to the "progress" and "time_spent" JSON sections."""
+        progress = {}
+        time_spent = {}
+        for day_num in range(1, self.days_count + 1):
+            if self.is_completed(day_num):
+                completion_date = from_epoch_day(self.completion_days[day_num - 1])
+                progress[str(day_num)] = {
+                    "completed": True,
+                    "date_completed": completion_date.isoformat() if completion_date else None
+                }
+            if self.minutes[day_num - 1]:
+                time_spent[str(day_num)] = self.minutes[day_num - 1]
+        return {"progress": progress, "time_spent": time_spent}
+
+    def is_completed(self, day_number):
+        """Return True if the given day is completed."""
+        return 1 <= day_number <= self.days_count and bool(self.completed >> (day_number - 1) & 1)
+
+    def completion_date(self, day_number):
+        """Return the completion date of a day as a "YYYY-MM-DD" string, or None."""
+        if not self.is_completed(day_number):
+            return None
+        completion_date = from_epoch_day(self.completion_days[day_number - 1])
+        return completion_date.isoformat() if completion_date else None
+
+    def completed_flags(self):
+        """Return the completion bitset unpacked into a NumPy bool array (index d-1 for day d)."""
+        packed = np.frombuffer(self.completed.to_bytes((self.days_count + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder="little")[:self.days_count].astype(bool)
+
+    def completed_count(self):
+        """Return the number of completed days."""
+        return self.completed.bit_count()
+
+    def first_incomplete_day(self):
+        """Return the first day not yet completed, or None if all are complete."""
+        remaining = ~self.completed & ((1 << self.days_count) - 1)
+        if not remaining:
+            return None
+        return (remaining & -remaining).bit_length()
+
+    def days_completed_between(self, first_day, last_day):
+        """Return the number of completed days from first_day to last_day inclusive (e.g. a week)."""
+        mask = (1 << (last_day - first_day + 1)) - 1
+        return (self.completed >> (first_day - 1) & mask).bit_count()
+
+
+def get_columns(snapshot, days_count):
+    """Return the columns for a data snapshot, building them once per snapshot."""
+    columns = snapshot.derived.get("columns")
+    if columns is None or columns.days_count != days_count:
+        columns = ProgressColumns.from_data(snapshot, days_count)
+        snapshot.derived["columns"] = columns
+    return columns
+
+
+def _fingerprint(today, columns, aggregates):
+    """Return a short digest of everything the progress figures are drawn from."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((today, columns.days_count, columns.completed, aggregates.completed_count,
+                        aggregates.week_bounds)).encode())
+    digest.update(columns.completion_days.tobytes())
+    digest.update(columns.minutes.tobytes())
+    return digest.hexdigest()
+
+
+class ProgressSnapshot:
+    """Read-only view of a learner's progress with every derived figure a render needs.
+
+    Built once per data snapshot (and day), then passed to the utils and
+    visualizations functions so a rerun loads and scans the data only once.
+    fingerprint identifies the progress content, e.g. for caching figures.
+    """
+
+    __slots__ = ("version", "today", "days_count", "week_bounds", "days", "current_day",
+                 "streak", "longest_streak", "streaks", "completed_count", "fingerprint",
+                 "columns", "completion_percentage", "weekly_completed", "weekly_minutes",
+                 "total_minutes")
+
+    def __init__(self, version, today, columns, aggregates, streaks):
+        self.version = version
+        self.today = today
+        self.days_count = columns.days_count
+        self.week_bounds = aggregates.week_bounds
+        self.days = tuple(FrozenDict({
+            "day": day_num,
+            "completed": columns.is_completed(day_num),
+            "completion_date": columns.completion_date(day_num),
+            "time_spent_minutes": columns.minutes[day_num - 1]  # In minutes
+        }) for day_num in range(1, columns.days_count + 1))
+        self.current_day = columns.first_incomplete_day() or columns.days_count
+        self.streak = streaks.current(today)
+        self.longest_streak = streaks.longest()
+        self.streaks = streaks
+        self.completed_count = aggregates.completed_count
+        self.completion_percentage = (aggregates.completed_count / columns.days_count) * 100
+        self.weekly_completed = aggregates.weekly_completed
+        self.weekly_minutes = aggregates.weekly_minutes
+        self.total_minutes = aggregates.total_minutes
+        self.fingerprint = _fingerprint(today, columns, aggregates)
+        self.columns = columns
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"ProgressSnapshot is read-only; cannot set {name}")
+        super().__setattr__(name, value)
+
+    def day(self, day_number):
+        """Return the progress entry of a day, or None if it is outside the curriculum."""
+        if 1 <= day_number <= self.days_count:
+            return self.days[day_number - 1]
+        return None
+
+    def is_completed(self, day_number):
+        """Return True if the given day is completed."""
+        entry = self.day(day_number)
+        return bool(entry and entry["completed"])
+
+
+class CohortMatrix:
+    """Progress of many learners as a dense learners x days matrix.
+
+    values[i, d - 1] is learner_ids[i]'s value for day d: 1.0/0.0 for the
+    "completed" metric, minutes spent for "minutes".
+    """
+
+    __slots__ = ("learner_ids", "values", "metric", "fingerprint")
+
+    def __init__(self, learner_ids, values, metric):
+        self.learner_ids = tuple(learner_ids)
+        self.values = values
+        self.values.flags.writeable = False
+        self.metric = metric
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((metric, values.shape)).encode())
+        digest.update("\0".join(self.learner_ids).encode())
+        digest.update(values.tobytes())
+        self.fingerprint = digest.hexdigest()
+
+    @property
+    def days_count(self):
+        return self.values.shape[1]
+
+    def __len__(self):
+        return len(self.learner_ids)
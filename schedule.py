@@ -0,0 +1,192 @@
+"""
+Learning schedule for the Python learning tracker.
+
+Each learner's schedule settings are stored with their data: a start date,
+weekly rest days and pauses (date ranges with no study). From these the
+scheduled date and display string of every curriculum day are computed
+together as arrays with NumPy's business-day functions, and cached per
+settings so sessions share them.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+
+# Weekdays as used by date.weekday(): Monday is 0
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Number of computed schedules kept in memory
+SCHEDULE_CACHE_SIZE = 256
+
+DATE_FORMAT = "%A, %B %d, %Y"
+
+
+def default_settings(start_date=None):
+    """Return schedule settings starting on start_date (tomorrow if not given)."""
+    start_date = start_date or date.today() + timedelta(days=1)
+    return {
+        "start_date": start_date.isoformat(),
+        "rest_days": [],
+        "pauses": []
+    }
+
+
+def validate_settings(settings):
+    """Check schedule settings before they are saved.
+
+    Raises:
+        ValueError: If the settings cannot produce a schedule
+    """
+    date.fromisoformat(settings["start_date"])
+    rest_days = settings.get("rest_days", [])
+    if any(day not in range(7) for day in rest_days):
+        raise ValueError(f"Rest days must be weekday numbers 0-6, got {rest_days}")
+    if len(set(rest_days)) == 7:
+        raise ValueError("At least one weekday must be a study day")
+    for pause in settings.get("pauses", []):
+        if date.fromisoformat(pause["end"]) < date.fromisoformat(pause["start"]):
+            raise ValueError(f"Pause ends before it starts: {pause}")
+
+
+class Schedule:
+    """Scheduled dates of every curriculum day, computed once.
+
+    dates is a read-only datetime64[D] array where dates[d - 1] is day d's date,
+    and formatted holds the matching display strings.
+    """
+
+    __slots__ = ("start_date", "weekmask", "holidays", "dates", "formatted")
+
+    def __init__(self, start_date, weekmask, holidays, dates, formatted=None):
+        self.start_date = start_date
+        self.weekmask = weekmask
+        self.holidays = holidays
+        self.dates = dates
+        self.dates.flags.writeable = False
+        if formatted is None:
+            formatted = tuple(day_date.strftime(DATE_FORMAT) for day_date in dates.tolist())
+        self.formatted = formatted
+
+    @classmethod
+    def build(cls, start_date, weekmask, holidays, days_count):
+        """Compute the dates of days_count study days from start_date, skipping rest days and holidays."""
+        dates = np.busday_offset(
+            np.datetime64(start_date, "D"), np.arange(days_count),
+            roll="forward", weekmask=weekmask, holidays=holidays
+        )
+        return cls(start_date, weekmask, holidays, dates)
+
+    @property
+    def days_count(self):
+        return int(self.dates.size)
+
+    def date(self, day_number):
+        """Return the scheduled date of a day, or None if it is outside the curriculum."""
+        if 1 <= day_number <= self.days_count:
+            return self.dates[day_number - 1].item()
+        return None
+
+    def formatted_date(self, day_number):
+        """Return the scheduled date of a day as a display string, or "N/A"."""
+        if 1 <= day_number <= self.days_count:
+            return self.formatted[day_number - 1]
+        return "N/A"
+
+    def day_on(self, on_date):
+        """Return the day scheduled on a date, or None if no day falls on it."""
+        target = np.datetime64(on_date, "D")
+        i = int(np.searchsorted(self.dates, target))
+        if i < self.days_count and self.dates[i] == target:
+            return i + 1
+        return None
+
+    def shifted(self, from_day, new_date, holidays):
+        """Return the schedule with from_day and every later day moved to start at new_date.
+
+        Earlier days keep their dates and strings; only the remaining days are
+        recomputed, with one vectorized business-day offset.
+
+        Args:
+            from_day: The first day to move
+            new_date: The earliest date from_day may be scheduled on
+            holidays: The paused dates of the new schedule
+        """
+        remaining = np.busday_offset(
+            np.datetime64(new_date, "D"), np.arange(self.days_count - from_day + 1),
+            roll="forward", weekmask=self.weekmask, holidays=holidays
+        )
+        dates = np.concatenate((self.dates[:from_day - 1], remaining))
+        formatted = self.formatted[:from_day - 1] + tuple(
+            day_date.strftime(DATE_FORMAT) for day_date in remaining.tolist()
+        )
+        return Schedule(self.start_date, self.weekmask, holidays, dates, formatted)
+
+
+def _cache_key(settings, days_count):
+    rest_days = set(settings.get("rest_days", []))
+    weekmask = "".join("0" if day in rest_days else "1" for day in range(7))
+    pauses = tuple((pause["start"], pause["end"]) for pause in settings.get("pauses", []))
+    return settings["start_date"], weekmask, pauses, days_count
+
+
+def _holidays(pauses):
+    """Expand pause date ranges into the sorted array of paused dates."""
+    if not pauses:
+        return np.empty(0, dtype="datetime64[D]")
+    return np.unique(np.concatenate([
+        np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1) for start, end in pauses
+    ]))
+
+
+_schedules = OrderedDict()
+_schedules_lock = threading.Lock()
+
+
+def _remember(key, schedule):
+    with _schedules_lock:
+        _schedules[key] = schedule
+        _schedules.move_to_end(key)
+        while len(_schedules) > SCHEDULE_CACHE_SIZE:
+            _schedules.popitem(last=False)
+
+
+def get_schedule(settings, days_count):
+    """Return the Schedule for a learner's schedule settings, computing it once per settings."""
+    key = _cache_key(settings, days_count)
+    with _schedules_lock:
+        schedule = _schedules.get(key)
+        if schedule is not None:
+            _schedules.move_to_end(key)
+            return schedule
+
+    start_date, weekmask, pauses, _ = key
+    schedule = Schedule.build(date.fromisoformat(start_date), weekmask, _holidays(pauses), days_count)
+    _remember(key, schedule)
+    return schedule
+
+
+def reschedule(settings, days_count, from_day, new_date):
+    """Move from_day and every later day so from_day is scheduled on new_date (or the next study day).
+
+    The gap is stored as a pause, so the settings keep describing the whole
+    schedule; the new schedule itself is derived by shifting only the
+    remaining days of the current one.
+
+    Returns:
+        (new settings, new Schedule), or (settings, current Schedule) if
+        from_day is already scheduled on or after new_date
+    """
+    current = get_schedule(settings, days_count)
+    old_date = current.date(from_day)
+    if old_date is None or new_date <= old_date:
+        return settings, current
+
+    pauses = list(settings.get("pauses", []))
+    pauses.append({"start": old_date.isoformat(), "end": (new_date - timedelta(days=1)).isoformat()})
+    new_settings = dict(settings, pauses=pauses)
+
+    key = _cache_key(new_settings, days_count)
+    shifted = current.shifted(from_day, new_date, _holidays(key[2]))
+    _remember(key, shifted)
+    return new_settings, shifted
@@ -1,28 +1,171 @@
 """
 Module to handle SMS notifications for the Python learning tracker.
+
+Messages go through Twilio's Messages REST endpoint using one long-lived,
+keep-alive HTTP session instead of a new client per message. A token
+bucket keeps sends under the account's per-second cap (TWILIO_MAX_PER_SECOND),
+and send_many fans a batch out over a pool of threads sharing that limit,
+so a morning burst of 10,000 reminders takes minutes at 100 messages/s.
+Reminder content and scheduling live in the notification pipeline
+(notifications.SmsChannel).
+
+TWILIO_API_BASE_URL points the sender at another endpoint, such as the
+local stand-in used for testing:
+    python sms_notifications.py --stand-in [--port 8765]
 """
+import concurrent.futures
+import json
 import os
-from datetime import datetime, timedelta
-from twilio.rest import Client
-import streamlit as st
+import threading
+import time
+
+TWILIO_API_BASE_URL = os.environ.get("TWILIO_API_BASE_URL", "https://api.twilio.com")
+
+# Messages per second the account may send; Twilio queues (and eventually drops) anything faster
+TWILIO_MAX_PER_SECOND = float(os.environ.get("TWILIO_MAX_PER_SECOND", "100"))
+
+# Concurrent requests used by send_many, which is also the connection pool size
+TWILIO_WORKERS = int(os.environ.get("TWILIO_WORKERS", "32"))
 
-# Global settings
-DEFAULT_REMINDER_TIME = "09:00"  # 9:00 AM
-DEFAULT_REMINDER_MESSAGE = "Remember to practice Python today! Your scheduled topic: {topic}"
+# Attempts per message when Twilio answers 429 or 5xx, and the first retry delay in seconds
+SMS_MAX_ATTEMPTS = 4
+SMS_RETRY_BACKOFF = 1.0
 
+# Seconds to wait for Twilio to answer
+SMS_TIMEOUT = 10
 
-def setup_twilio_client():
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a token is available.
+
+    Tokens refill at rate per second up to capacity. Each caller reserves its
+    token under the lock and sleeps outside it, so waiting callers are served
+    in arrival order without holding each other up.
     """
-    Set up and return the Twilio client with credentials.
-    Returns None if credentials are missing.
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until it is available; returns the seconds waited."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class TwilioSender:
+    """Long-lived Twilio client: pooled keep-alive connections and a shared rate limit."""
+
+    def __init__(self, account_sid, auth_token, from_number, base_url=TWILIO_API_BASE_URL,
+                 max_per_second=TWILIO_MAX_PER_SECOND, workers=TWILIO_WORKERS,
+                 max_attempts=SMS_MAX_ATTEMPTS, backoff=SMS_RETRY_BACKOFF, timeout=SMS_TIMEOUT,
+                 sleep=time.sleep):
+        # Imported here so loading this module does not pay for the HTTP stack
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.from_number = from_number
+        self.url = f"{base_url.rstrip('/')}/2010-04-01/Accounts/{account_sid}/Messages.json"
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(max_per_second, sleep=sleep)
+        self._sleep = sleep
+
+        self._session = requests.Session()
+        self._session.auth = (account_sid, auth_token)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def send(self, phone_number, message):
+        """Send one SMS, waiting for the rate limit and retrying 429/5xx answers.
+
+        Returns:
+            True if Twilio accepted the message, False otherwise
+        """
+        data = {"To": phone_number, "From": self.from_number, "Body": message}
+        for attempt in range(1, self.max_attempts + 1):
+            self.bucket.acquire()
+            retry_after = None
+            try:
+                response = self._session.post(self.url, data=data, timeout=self.timeout)
+                if response.status_code < 300:
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    print(f"Error sending SMS to {phone_number}: {response.status_code} {response.text[:200]}")
+                    return False
+                error = f"{response.status_code} {response.text[:200]}"
+                retry_after = response.headers.get("Retry-After")
+            except OSError as e:  # requests' connection errors and timeouts
+                error = e
+
+            if attempt == self.max_attempts:
+                print(f"Error sending SMS to {phone_number} (attempt {attempt}): {error}")
+                return False
+            delay = self.backoff * 2 ** (attempt - 1)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            self._sleep(delay)
+        return False
+
+    def send_many(self, messages):
+        """Send a batch of SMS concurrently under the shared rate limit.
+
+        Args:
+            messages: Iterable of (phone number, message) pairs
+
+        Returns:
+            A list of True/False results in the order of messages
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="sms-send")
+        return list(self._executor.map(lambda item: self.send(*item), messages))
+
+    def close(self):
+        """Close the pooled connections and the batch threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        self._session.close()
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender():
+    """Return the process-wide TwilioSender, or None if Twilio is not configured.
+
+    Reads TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN and TWILIO_PHONE_NUMBER once.
     """
-    account_sid = os.environ.get("TWILIO_ACCOUNT_SID")
-    auth_token = os.environ.get("TWILIO_AUTH_TOKEN")
-    
-    if not account_sid or not auth_token:
-        return None
-    
-    return Client(account_sid, auth_token)
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            account_sid = os.environ.get("TWILIO_ACCOUNT_SID")
+            auth_token = os.environ.get("TWILIO_AUTH_TOKEN")
+            twilio_phone = os.environ.get("TWILIO_PHONE_NUMBER")
+            if not account_sid or not auth_token or not twilio_phone:
+                return None
+            _sender = TwilioSender(account_sid, auth_token, twilio_phone)
+        return _sender
 
 
 def send_sms(phone_number, message):
@@ -36,115 +179,102 @@ def send_sms(phone_number, message):
     Returns:
         True if successful, False otherwise
     """
-    client = setup_twilio_client()
-    twilio_phone = os.environ.get("TWILIO_PHONE_NUMBER")
-    
-    if not client or not twilio_phone:
-        st.error("Twilio not configured. Please add TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, and TWILIO_PHONE_NUMBER to environment variables.")
-        return False
-    
-    try:
-        client.messages.create(
-            body=message,
-            from_=twilio_phone,
-            to=phone_number
-        )
-        return True
-    except Exception as e:
-        st.error(f"Failed to send SMS: {str(e)}")
+    sender = get_sender()
+    if sender is None:
+        print("Error sending SMS: Twilio not configured. Please add TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, and TWILIO_PHONE_NUMBER to environment variables.")
         return False
+    return sender.send(phone_number, message)
 
 
-def send_reminder(phone_number, day_info):
+def send_many(messages):
     """
-    Send a reminder SMS about today's Python learning topic.
+    Send a batch of SMS, e.g. a morning reminder burst, as fast as the rate limit allows.
     
     Args:
-        phone_number: The recipient's phone number
-        day_info: Information about the day's topic
+        messages: Iterable of (phone number, message) pairs
         
     Returns:
-        True if successful, False otherwise
+        A list of True/False results in the order of messages
     """
-    # Prepare the message
-    message = DEFAULT_REMINDER_MESSAGE.format(topic=day_info['topic'])
-    
-    # Send the SMS
-    return send_sms(phone_number, message)
+    sender = get_sender()
+    if sender is None:
+        print("Error sending SMS: Twilio not configured.")
+        return [False for _ in messages]
+    return sender.send_many(messages)
 
 
-def send_missed_day_notification(phone_number, day_info):
-    """
-    Send a notification when a day of learning is missed.
-    
-    Args:
-        phone_number: The recipient's phone number
-        day_info: Information about the missed day
-        
-    Returns:
-        True if successful, False otherwise
+class LocalTwilioStandIn:
+    """Local HTTP server answering like Twilio's Messages endpoint, for testing.
+
+    Accepts every POST to .../Messages.json with 201 and records the form
+    fields; with fail_every=n every n-th request is answered 429 instead.
     """
-    message = f"You missed your Python practice yesterday! Today's topic: {day_info['topic']}. Don't break your streak!"
-    return send_sms(phone_number, message)
 
+    def __init__(self, host="127.0.0.1", port=0, fail_every=0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs
 
-def check_and_send_daily_reminder(phone_number, reminder_time, day_info):
-    """
-    Check if it's time to send a daily reminder and send if needed.
-    
-    Args:
-        phone_number: The recipient's phone number
-        reminder_time: The time to send the reminder (format: "HH:MM")
-        day_info: Information about the day's topic
-        
-    Returns:
-        True if reminder was sent, False otherwise
-    """
-    now = datetime.now()
-    
-    # Parse reminder time
-    try:
-        hour, minute = map(int, reminder_time.split(':'))
-        reminder_datetime = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        
-        # Check if it's time to send the reminder (within the last 5 minutes)
-        time_diff = (now - reminder_datetime).total_seconds()
-        if 0 <= time_diff < 300:  # Within 5 minutes after reminder time
-            return send_reminder(phone_number, day_info)
-    except (ValueError, AttributeError):
-        pass
-    
-    return False
+        stand_in = self
+        self.messages = []
+        self.requests = 0
+        self.connections = 0
+        self.fail_every = fail_every
+        self._lock = threading.Lock()
 
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
 
-def check_for_missed_days(phone_number, progress_data, current_day_info):
-    """
-    Check if any days were missed and send notifications.
-    
-    Args:
-        phone_number: The recipient's phone number
-        progress_data: The progress data for all days
-        current_day_info: Information about the current day
-        
-    Returns:
-        True if notification was sent, False otherwise
-    """
-    now = datetime.now()
-    yesterday = (now - timedelta(days=1)).date()
-    
-    # Find yesterday's day in the curriculum
-    yesterday_idx = None
-    for i, day_data in enumerate(progress_data):
-        day_scheduled_date = day_data.get('scheduled_date')
-        if day_scheduled_date and day_scheduled_date.date() == yesterday:
-            yesterday_idx = i
-            break
-    
-    if yesterday_idx is not None:
-        # Check if yesterday was completed
-        yesterday_completed = progress_data[yesterday_idx].get('completed', False)
-        if not yesterday_completed:
-            # Send notification about missed day
-            return send_missed_day_notification(phone_number, current_day_info)
-    
-    return False
\ No newline at end of file
+            def setup(self):
+                super().setup()
+                with stand_in._lock:
+                    stand_in.connections += 1
+
+            def do_POST(self):
+                fields = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    throttled = stand_in.fail_every and stand_in.requests % stand_in.fail_every == 0
+                    if not throttled:
+                        stand_in.messages.append({key: values[0] for key, values in fields.items()})
+                status = 429 if throttled else 201
+                body = json.dumps({"status": "queued" if status == 201 else "throttled"}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if throttled:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="twilio-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stand-in for Twilio's Messages endpoint")
+    parser.add_argument("--stand-in", action="store_true", required=True)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    stand_in = LocalTwilioStandIn(port=args.port).start()
+    print(f"Twilio stand-in listening on {stand_in.base_url}; set TWILIO_API_BASE_URL to use it. Press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stand_in.stop()
@@ -0,0 +1,427 @@
+"""
+SQLite storage backend for the Python learning tracker.
+
+Each section of the tracker data gets its own table keyed by user and day,
+so point reads such as a single day's note touch one row instead of loading
+the whole document. The database runs in WAL mode, which lets several
+processes read while one writes. It understands the same mutation records
+as the journaled JSON store, so data_handler can use either backend.
+
+Like the JSON store, reads return immutable snapshots. Each user row
+carries a version that every write bumps inside its transaction, so an
+expected_version check holds across processes as well as threads.
+"""
+import json
+import sqlite3
+import threading
+
+import numpy as np
+
+import storage
+
+# Wait this long for another process's write lock before failing
+BUSY_TIMEOUT_MS = 5000
+
+# Sections stored one row per (user, day)
+DAY_SECTIONS = ("progress", "notes", "uploads", "time_spent", "resources_used")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS progress (
+    user_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    date_completed TEXT,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS notes (
+    user_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    note TEXT NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    user_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    filename TEXT,
+    upload_time TEXT,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS time_spent (
+    user_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    minutes INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS resources_used (
+    user_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    resource TEXT NOT NULL,
+    PRIMARY KEY (user_id, day, resource)
+);
+CREATE TABLE IF NOT EXISTS settings (
+    user_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (user_id, section)
+);
+CREATE INDEX IF NOT EXISTS idx_progress_day ON progress (day);
+CREATE INDEX IF NOT EXISTS idx_notes_day ON notes (day);
+CREATE INDEX IF NOT EXISTS idx_uploads_day ON uploads (day);
+CREATE INDEX IF NOT EXISTS idx_time_spent_day ON time_spent (day);
+CREATE INDEX IF NOT EXISTS idx_resources_used_day ON resources_used (day);
+"""
+
+# Statements are written once with placeholders so sqlite3's statement cache reuses them
+SELECT_ROWS = {
+    "progress": "SELECT day, completed, date_completed FROM progress WHERE user_id = ?",
+    "notes": "SELECT day, note FROM notes WHERE user_id = ?",
+    "uploads": "SELECT day, filename, upload_time FROM uploads WHERE user_id = ?",
+    "time_spent": "SELECT day, minutes FROM time_spent WHERE user_id = ?",
+    "resources_used": "SELECT day, resource FROM resources_used WHERE user_id = ? ORDER BY rowid",
+}
+SELECT_DAY = {
+    "progress": "SELECT day, completed, date_completed FROM progress WHERE user_id = ? AND day = ?",
+    "notes": "SELECT day, note FROM notes WHERE user_id = ? AND day = ?",
+    "uploads": "SELECT day, filename, upload_time FROM uploads WHERE user_id = ? AND day = ?",
+    "time_spent": "SELECT day, minutes FROM time_spent WHERE user_id = ? AND day = ?",
+    "resources_used": "SELECT day, resource FROM resources_used WHERE user_id = ? AND day = ? ORDER BY rowid",
+}
+UPSERT_DAY = {
+    "progress": "INSERT OR REPLACE INTO progress (user_id, day, completed, date_completed) VALUES (?, ?, ?, ?)",
+    "notes": "INSERT OR REPLACE INTO notes (user_id, day, note) VALUES (?, ?, ?)",
+    "uploads": "INSERT OR REPLACE INTO uploads (user_id, day, filename, upload_time) VALUES (?, ?, ?, ?)",
+    "time_spent": "INSERT OR REPLACE INTO time_spent (user_id, day, minutes) VALUES (?, ?, ?)",
+    "resources_used": "INSERT OR IGNORE INTO resources_used (user_id, day, resource) VALUES (?, ?, ?)",
+}
+DELETE_DAY = {
+    section: f"DELETE FROM {section} WHERE user_id = ? AND day = ?" for section in DAY_SECTIONS
+}
+DELETE_USER = {
+    section: f"DELETE FROM {section} WHERE user_id = ?" for section in DAY_SECTIONS + ("settings",)
+}
+DELETE_RESOURCE = "DELETE FROM resources_used WHERE user_id = ? AND day = ? AND resource = ?"
+SELECT_SETTINGS = "SELECT section, value FROM settings WHERE user_id = ?"
+SELECT_SECTION = "SELECT value FROM settings WHERE user_id = ? AND section = ?"
+UPSERT_SECTION = "INSERT OR REPLACE INTO settings (user_id, section, value) VALUES (?, ?, ?)"
+DELETE_SECTION = "DELETE FROM settings WHERE user_id = ? AND section = ?"
+INSERT_USER = "INSERT OR IGNORE INTO users (user_id) VALUES (?)"
+SELECT_USER = "SELECT version FROM users WHERE user_id = ?"
+BUMP_VERSION = "UPDATE users SET version = version + 1 WHERE user_id = ?"
+SELECT_USERS = "SELECT user_id FROM users ORDER BY user_id"
+SELECT_ALL_SETTINGS = "SELECT user_id, section, value FROM settings"
+SELECT_COHORT = {
+    "completed": "SELECT user_id, day, 1 FROM progress WHERE completed = 1 AND day BETWEEN 1 AND ?",
+    "minutes": "SELECT user_id, day, minutes FROM time_spent WHERE day BETWEEN 1 AND ?",
+}
+
+
+def _row_value(section, row):
+    """Convert a table row back to the value stored in the JSON document."""
+    if section == "progress":
+        return {"completed": bool(row[1]), "date_completed": row[2]}
+    if section == "uploads":
+        return {"filename": row[1], "upload_time": row[2]}
+    return row[1]
+
+
+def _row_params(section, user_id, day, value):
+    """Convert a JSON document value to the parameters of an upsert."""
+    if section == "progress":
+        return (user_id, day, int(bool(value.get("completed", False))), value.get("date_completed"))
+    if section == "uploads":
+        return (user_id, day, value.get("filename"), value.get("upload_time"))
+    return (user_id, day, value)
+
+
+# Connections are shared by every store on the same database, one per thread
+_thread_state = threading.local()
+_write_locks = {}
+_write_locks_lock = threading.Lock()
+
+
+def _connect(path):
+    """Return this thread's connection to path, opening it on first use."""
+    connections = getattr(_thread_state, "connections", None)
+    if connections is None:
+        connections = _thread_state.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        connections[path] = conn
+    return conn
+
+
+def _write_lock(path):
+    """Return the in-process lock serializing writers to path, creating the schema once."""
+    with _write_locks_lock:
+        lock = _write_locks.get(path)
+        if lock is None:
+            with _connect(path) as conn:
+                conn.executescript(SCHEMA)
+                # Databases created before writes were versioned lack the column
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+                if "version" not in columns:
+                    conn.execute("ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            lock = _write_locks[path] = threading.Lock()
+        return lock
+
+
+class SqliteStore:
+    """Tracker data for one user held in a SQLite database."""
+
+    def __init__(self, path, default_factory, user_id="default"):
+        self.path = path
+        self.user_id = user_id
+        self._default_factory = default_factory
+        # The assembled document is cached per thread
+        self._local = threading.local()
+        self._write_lock = _write_lock(path)
+
+    def _connection(self):
+        return _connect(self.path)
+
+    def exists(self):
+        """Return True if this user has any stored data."""
+        return self._connection().execute(SELECT_USER, (self.user_id,)).fetchone() is not None
+
+    def is_dirty(self):
+        """Writes are committed immediately, so nothing is ever pending."""
+        return False
+
+    @property
+    def version(self):
+        """The version of this user's data as last read by this thread."""
+        return self.load().version
+
+    def load(self):
+        """Return an immutable snapshot of this user's document, assembled from the tables."""
+        conn = self._connection()
+        # data_version changes whenever another connection commits
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        cache = getattr(self._local, "cache", None)
+        if cache is not None and self._local.data_version == data_version:
+            return cache
+
+        # Read every table from one consistent view of the database
+        with conn:
+            conn.execute("BEGIN")
+            data = self._default_factory()
+            row = conn.execute(SELECT_USER, (self.user_id,)).fetchone()
+            if row is not None:
+                for section in DAY_SECTIONS:
+                    data[section] = self._read_section(conn, section)
+                for section, value in conn.execute(SELECT_SETTINGS, (self.user_id,)):
+                    data[section] = json.loads(value)
+        snapshot = storage.make_snapshot(data, row[0] if row else 0)
+
+        self._local.cache = snapshot
+        self._local.data_version = data_version
+        return snapshot
+
+    def reload(self):
+        """Drop the cached document and rebuild it from the database."""
+        self._local.cache = None
+        return self.load()
+
+    def _read_section(self, conn, section, day=None):
+        if day is None:
+            rows = conn.execute(SELECT_ROWS[section], (self.user_id,))
+        else:
+            rows = conn.execute(SELECT_DAY[section], (self.user_id, day))
+
+        result = {}
+        for row in rows:
+            key = str(row[0])
+            if section == "resources_used":
+                result.setdefault(key, []).append(row[1])
+            else:
+                result[key] = _row_value(section, row)
+        return result
+
+    def get(self, section, key=None, default=None):
+        """Read one day of a section (or a whole settings section) without loading everything."""
+        conn = self._connection()
+        if section in DAY_SECTIONS:
+            if key is None:
+                return storage.freeze(self._read_section(conn, section))
+            value = self._read_section(conn, section, int(key)).get(str(key))
+        else:
+            row = conn.execute(SELECT_SECTION, (self.user_id, section)).fetchone()
+            if row is None:
+                value = self._default_factory().get(section)
+            else:
+                value = json.loads(row[0])
+            if value is not None and key is not None:
+                value = value.get(str(key))
+        return default if value is None else storage.freeze(value)
+
+    def _begin_write(self, conn, expected_version):
+        """Start a write transaction, checking and bumping this user's version."""
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(SELECT_USER, (self.user_id,)).fetchone()
+        current = row[0] if row else 0
+        if expected_version is not None and expected_version != current:
+            raise storage.ConflictError(
+                f"Data changed since version {expected_version} (now {current}); reload and retry"
+            )
+        conn.execute(INSERT_USER, (self.user_id,))
+        conn.execute(BUMP_VERSION, (self.user_id,))
+
+    def apply(self, records, expected_version=None, intended=None):
+        """Apply mutation records in a single transaction.
+
+        Args:
+            records: Records built by storage.make_record
+            expected_version: If given, the version the data must still be at
+            intended: The writer's data with the records applied, if they were
+                made against an older copy; splices that no longer fit become
+                sets of the text there
+
+        Raises:
+            ConflictError: If expected_version is given and is not the current version
+        """
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                self._begin_write(conn, expected_version)
+                for record in records:
+                    self._apply_record(conn, record, intended)
+            self._local.cache = None
+        return self.load()
+
+    def _apply_record(self, conn, record, intended=None):
+        op = record["op"]
+        path = record["path"]
+        section = path[0]
+
+        if section in DAY_SECTIONS and len(path) == 2:
+            day = int(path[1])
+            value = record.get("value")
+            if op == storage.OP_SET:
+                if section == "resources_used":
+                    conn.execute(DELETE_DAY[section], (self.user_id, day))
+                    for resource in value:
+                        conn.execute(UPSERT_DAY[section], (self.user_id, day, resource))
+                else:
+                    conn.execute(UPSERT_DAY[section], _row_params(section, self.user_id, day, value))
+            elif op == storage.OP_DELETE:
+                conn.execute(DELETE_DAY[section], (self.user_id, day))
+            elif op == storage.OP_ADD and section == "resources_used":
+                conn.execute(UPSERT_DAY[section], (self.user_id, day, value))
+            elif op == storage.OP_REMOVE and section == "resources_used":
+                conn.execute(DELETE_RESOURCE, (self.user_id, day, value))
+            elif op == storage.OP_SPLICE and section == "notes":
+                row = conn.execute(SELECT_DAY[section], (self.user_id, day)).fetchone()
+                wrapper = {section: {path[1]: row[1] if row else ""}}
+                if intended is not None and not storage.splice_applies(wrapper[section][path[1]], value):
+                    record = storage.make_record(storage.OP_SET, path, intended.get(section, {}).get(path[1], ""))
+                storage.apply_record(wrapper, record)
+                conn.execute(UPSERT_DAY[section], (self.user_id, day, wrapper[section][path[1]]))
+            else:
+                raise ValueError(f"Unsupported operation {op} on {section}")
+            return
+
+        # Settings and any other section are stored as one JSON value per section
+        row = conn.execute(SELECT_SECTION, (self.user_id, section)).fetchone()
+        wrapper = {section: json.loads(row[0])} if row else {}
+        storage.apply_record(wrapper, record)
+        if section in wrapper:
+            conn.execute(UPSERT_SECTION, (self.user_id, section, json.dumps(wrapper[section])))
+        else:
+            conn.execute(DELETE_SECTION, (self.user_id, section))
+
+    def replace(self, data, expected_version=None):
+        """Replace all of this user's data in a single transaction.
+
+        Raises:
+            ConflictError: If expected_version is given and is not the current version
+        """
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                self._begin_write(conn, expected_version)
+                for statement in DELETE_USER.values():
+                    conn.execute(statement, (self.user_id,))
+
+                for section, value in data.items():
+                    if section in DAY_SECTIONS:
+                        for key, day_value in value.items():
+                            self._apply_record(conn, storage.make_record(
+                                storage.OP_SET, [section, key], day_value
+                            ))
+                    else:
+                        conn.execute(UPSERT_SECTION, (self.user_id, section, json.dumps(value)))
+            self._local.cache = None
+        return self.load()
+
+    def flush(self):
+        """Writes are committed immediately; nothing to flush."""
+
+    def sync(self):
+        """Checkpoint the WAL into the main database file."""
+        self._connection().execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self):
+        """Release the cached document; connections stay open for other users of the shard."""
+        self._local = threading.local()
+
+
+def read_user_ids(path):
+    """Return the ID of every user in a database, in order."""
+    _write_lock(path)  # Make sure the schema exists
+    return [row[0] for row in _connect(path).execute(SELECT_USERS)]
+
+
+def read_settings(path, sections):
+    """Read settings sections for every user in a database.
+
+    Returns:
+        {user ID: {section: settings, or {} if not set}} in user ID order
+    """
+    _write_lock(path)  # Make sure the schema exists
+    conn = _connect(path)
+    with conn:
+        conn.execute("BEGIN")
+        user_ids = [row[0] for row in conn.execute(SELECT_USERS)]
+        rows = conn.execute(SELECT_ALL_SETTINGS).fetchall()
+
+    settings = {user_id: {section: {} for section in sections} for user_id in user_ids}
+    for user_id, section, value in rows:
+        if section in sections and user_id in settings:
+            settings[user_id][section] = json.loads(value)
+    return settings
+
+
+def read_cohort(path, days_count, metric):
+    """Read one metric for every user in a database as a users x days matrix.
+
+    Args:
+        path: The database file
+        days_count: Number of curriculum days (matrix columns)
+        metric: "completed" or "minutes"
+
+    Returns:
+        (user IDs, float32 matrix) with rows in user ID order
+    """
+    _write_lock(path)  # Make sure the schema exists
+    conn = _connect(path)
+    # Read users and values from one consistent view of the database
+    with conn:
+        conn.execute("BEGIN")
+        user_ids = [row[0] for row in conn.execute(SELECT_USERS)]
+        rows = conn.execute(SELECT_COHORT[metric], (days_count,)).fetchall()
+
+    values = np.zeros((len(user_ids), days_count), dtype=np.float32)
+    if rows:
+        index = {user_id: i for i, user_id in enumerate(user_ids)}
+        users, days, amounts = zip(*rows)
+        values[[index[user_id] for user_id in users], np.asarray(days) - 1] = amounts
+    return user_ids, values
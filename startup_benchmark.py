@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark for the Python learning tracker.
+
+Imports everything app.py imports at startup in a fresh interpreter with
+`python -X importtime`, reports the time each import took and exits with
+an error if cold start regressed: if a module meant to be lazy (pandas,
+plotly, the notification senders) is imported at startup, or if the
+tracker's own startup imports take longer than the budget.
+
+Usage:
+    python startup_benchmark.py [--runs 5] [--budget-ms 300] [--output startup_times.json]
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Modules that must only be imported by the pages that need them
+LAZY_MODULES = ("pandas", "plotly", "visualizations", "email_notifications", "sms_notifications")
+
+# Imports outside the tracker's control, reported but not counted against the budget
+EXTERNAL_MODULES = ("streamlit",)
+
+# Budget for the tracker's own startup imports, in milliseconds
+DEFAULT_BUDGET_MS = float(os.environ.get("TRACKER_STARTUP_BUDGET_MS", "300"))
+
+
+def startup_imports(app_file=APP_FILE):
+    """Return the modules app.py imports at module level, in order."""
+    with open(app_file, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), app_file)
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def measure(modules):
+    """Import modules in a fresh interpreter.
+
+    Returns:
+        (cumulative microseconds per requested module, set of every imported module)
+    """
+    code = "; ".join(f"import {module}" for module in modules) or "pass"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(APP_FILE), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the startup modules failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        imported.add(name.strip())
+        # Top-level imports are the ones without indentation
+        if name.strip() in modules and not name[1:].startswith(" "):
+            times[name.strip()] = int(cumulative)
+    return times, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure (the fastest is kept)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="maximum time for the tracker's own startup imports")
+    parser.add_argument("--output", help="write the per-module times to this JSON file")
+    args = parser.parse_args(argv)
+
+    modules = startup_imports()
+    # Modules the external imports load on their own are not the tracker's doing
+    _, external_imported = measure([m for m in modules if m in EXTERNAL_MODULES])
+    best = {}
+    imported = set()
+    for _ in range(args.runs):
+        times, imported = measure(modules)
+        for module, microseconds in times.items():
+            best[module] = min(microseconds, best.get(module, microseconds))
+
+    print(f"{'module':<24} {'ms':>8}")
+    for module in modules:
+        print(f"{module:<24} {best.get(module, 0) / 1000:>8.1f}")
+    own_ms = sum(us for module, us in best.items() if module not in EXTERNAL_MODULES) / 1000
+    print(f"{'tracker total':<24} {own_ms:>8.1f}  (budget {args.budget_ms:.0f})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"modules_ms": {m: us / 1000 for m, us in best.items()}, "tracker_total_ms": own_ms}, f, indent=4)
+
+    failures = []
+    eager = sorted(m for m in imported - external_imported if m.split(".")[0] in LAZY_MODULES)
+    if eager:
+        failures.append(f"Lazy modules imported at startup: {', '.join(eager[:10])}")
+    if own_ms > args.budget_ms:
+        failures.append(f"Startup imports took {own_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"Error: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
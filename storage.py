@@ -0,0 +1,884 @@
+"""
+Storage engine for the Python learning tracker.
+
+Progress data lives in a JSON snapshot plus an append-only journal of small
+mutation records. Reads replay the journal on top of the snapshot, and a
+background compactor folds the journal back into a fresh snapshot once it
+grows past a threshold, so a single checkbox click costs one short append
+instead of a full-file rewrite.
+
+Writes are write-behind: mutations update memory immediately and are
+coalesced into one journal append by a shared flusher thread once their
+deadline passes. Everything still dirty is flushed at process exit, and
+callers that need durability right away can use flush() or sync().
+
+Snapshots are crash-safe: each one is written to a temporary file, fsynced
+and renamed over the previous one, and carries a generation number and a
+checksum of its contents. The previous generation is kept alongside, so
+recovery only ever has to inspect two files. Journal records are tagged
+with the generation they apply to, so a crash between writing a snapshot
+and truncating the journal never replays stale records.
+
+The in-memory copy stays valid until the files change on disk: each read
+compares the inode, mtime and size of the snapshot and journal with what
+was last loaded, and only the new tail of the journal is read when another
+process has appended to it. Each store keeps the state on disk as its base
+and its unflushed records on top, so picking up another process's changes
+rebuilds the base and replays the unflushed records exactly once. With a file watcher attached, even that check
+is skipped until the watcher reports a change. Writers in different
+processes are serialized with an advisory lock file.
+
+Readers are handed immutable snapshots (FrozenDict all the way down), so
+they never need a lock and never see a half-applied write. Writers are
+serialized per store and build the next snapshot copy-on-write, copying
+only the containers a mutation touches. Every snapshot carries a version,
+and writes may pass expected_version to fail with ConflictError instead of
+overwriting a change made by another session since they last read.
+"""
+import atexit
+import contextlib
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; cross-process locking is skipped
+    fcntl = None
+
+# Journal and previous-generation snapshot live next to the snapshot
+JOURNAL_SUFFIX = ".journal"
+PREVIOUS_SUFFIX = ".prev"
+CORRUPT_SUFFIX = ".corrupt"
+LOCK_SUFFIX = ".lock"
+
+# Fold the journal into the snapshot once it grows past this many bytes
+COMPACT_THRESHOLD_BYTES = 64 * 1024
+
+# Default seconds dirty state may stay in memory before it is flushed
+FLUSH_DELAY = 2
+
+# Most per-learner stores kept open in memory at once
+MAX_OPEN_STORES = 1024
+
+# Mutation operations understood by apply_record
+OP_SET = "set"
+OP_DELETE = "delete"
+OP_ADD = "add"
+OP_REMOVE = "remove"
+OP_SPLICE = "splice"
+
+
+class ConflictError(Exception):
+    """Raised when a write expected a version of the data that is no longer current."""
+
+
+class FrozenDict(dict):
+    """A dict that refuses in-place modification.
+
+    Copies made with dict(), .copy() or copy.deepcopy() are ordinary mutable dicts.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Tracker data is read-only; use the data_handler functions to change it")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class DataSnapshot(FrozenDict):
+    """An immutable tracker document together with the store version it was read at.
+
+    `derived` memoizes values computed from the snapshot (e.g. aggregates);
+    since the document never changes, they never need invalidating.
+    """
+
+    __slots__ = ("version", "derived")
+
+
+def freeze(value):
+    """Return an immutable version of a JSON-like value; frozen parts are reused as-is."""
+    if isinstance(value, (FrozenDict, tuple)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Return a mutable deep copy of a (possibly frozen) JSON-like value."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def make_snapshot(data, version):
+    """Freeze a tracker document into a DataSnapshot at the given version."""
+    snapshot = DataSnapshot((key, freeze(value)) for key, value in data.items())
+    snapshot.version = version
+    snapshot.derived = {}
+    return snapshot
+
+
+def make_record(op, path, value=None):
+    """Build a journal record for a mutation at the given key path."""
+    record = {"op": op, "path": [str(key) for key in path]}
+    if op != OP_DELETE:
+        record["value"] = value
+    return record
+
+
+def _text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def text_delta(old, new):
+    """Return the splice [start, end, text, length, digest] that turns string old into new.
+
+    Only the span between the common prefix and the common suffix is kept,
+    so a small edit to a long text makes a small journal record. The length
+    and digest of old pin the splice to the text it was made against.
+    """
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end_old, end_new = len(old), len(new)
+    while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+    return [start, end_old, new[start:end_new], len(old), _text_digest(old)]
+
+
+def splice_applies(text, splice):
+    """Return True if a splice was made against text (splices without length and digest always apply)."""
+    if len(splice) < 5:
+        return True
+    return len(text) == splice[3] and _text_digest(text) == splice[4]
+
+
+def _lookup(data, path, default=""):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return default
+        data = data[key]
+    return data
+
+
+def rebase_splices(data, records, intended):
+    """Return records with every splice that no longer fits its text replaced by a set.
+
+    Args:
+        data: The data the records are about to be applied to
+        records: Records made against an older version of the data
+        intended: The writer's data with the records applied; a replaced
+            splice sets its path to the value there, so the writer's text
+            wins instead of being garbled or lost
+    """
+    if not any(record["op"] == OP_SPLICE for record in records):
+        return records
+
+    rebased = []
+    for record in records:
+        if record["op"] == OP_SPLICE and not splice_applies(_lookup(data, record["path"]), record["value"]):
+            record = make_record(OP_SET, record["path"], _lookup(intended, record["path"]))
+        rebased.append(record)
+        data = apply_records(data, [record], 0)
+    return rebased
+
+
+def apply_record(data, record):
+    """Apply a single journal record to a data dict in place.
+
+    Args:
+        data: The tracker data dict
+        record: A record built by make_record
+
+    Returns:
+        The same data dict
+    """
+    op = record["op"]
+    path = record["path"]
+
+    target = data
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    last = path[-1]
+
+    if op == OP_SET:
+        target[last] = record["value"]
+    elif op == OP_DELETE:
+        target.pop(last, None)
+    elif op == OP_ADD:
+        items = target.setdefault(last, [])
+        if record["value"] not in items:
+            items.append(record["value"])
+    elif op == OP_REMOVE:
+        items = target.get(last)
+        if items and record["value"] in items:
+            items.remove(record["value"])
+    elif op == OP_SPLICE:
+        # A splice made against different text would garble it; it is skipped instead
+        old = target.get(last, "")
+        if splice_applies(old, record["value"]):
+            start, end, text = record["value"][:3]
+            target[last] = old[:start] + text + old[end:]
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+
+    return data
+
+
+def apply_records(data, records, version):
+    """Return a new snapshot of data with records applied.
+
+    Only the containers along each record's path are copied; everything
+    else is shared with the previous snapshot.
+    """
+    root = dict(data)
+    copied = {id(root)}
+
+    def writable(container, key, empty):
+        child = container.get(key)
+        if child is None or id(child) not in copied:
+            child = empty() if child is None else empty(child)
+            container[key] = child
+            copied.add(id(child))
+        return child
+
+    for record in records:
+        path = record["path"]
+        target = root
+        for key in path[:-1]:
+            target = writable(target, key, dict)
+        if record["op"] in (OP_ADD, OP_REMOVE) and path[-1] in target:
+            writable(target, path[-1], list)
+        apply_record(root, record)
+
+    return make_snapshot(root, version)
+
+
+def read_journal(journal_path, offset=0):
+    """Read the complete records of a journal file starting at a byte offset.
+
+    A torn final line (e.g. from a crash mid-append) is ignored.
+
+    Returns:
+        A (records, end_offset) tuple, where end_offset follows the last complete record
+    """
+    records = []
+    try:
+        with open(journal_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+                offset += len(line)
+    except FileNotFoundError:
+        pass
+    return records, offset
+
+
+def _stat_signature(path):
+    """Return (inode, mtime, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Hold an exclusive advisory lock shared by every process using path."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + LOCK_SUFFIX, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _checksum(data):
+    """Return a checksum of the canonical JSON encoding of data."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _fsync_dir(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_snapshot(path):
+    """Read and verify a snapshot file.
+
+    Files written before snapshots carried an envelope are accepted as
+    generation 0.
+
+    Returns:
+        A (data, generation) tuple, or None if the file is missing or invalid
+    """
+    try:
+        with open(path, 'r') as f:
+            envelope = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading snapshot {path}: {e}")
+        return None
+
+    if not isinstance(envelope, dict):
+        return None
+    if "checksum" not in envelope or "generation" not in envelope:
+        return envelope, 0
+
+    data = envelope.get("data")
+    if not isinstance(data, dict) or _checksum(data) != envelope["checksum"]:
+        print(f"Checksum mismatch in snapshot {path}")
+        return None
+    return data, envelope["generation"]
+
+
+def write_snapshot(path, data, generation):
+    """Atomically write a snapshot, keeping the current one as the previous generation.
+
+    The new snapshot goes to a temporary file which is fsynced and renamed
+    over path, so path always holds a complete snapshot.
+    """
+    envelope = {"generation": generation, "checksum": _checksum(data), "data": data}
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(envelope, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Keep the current snapshot as the previous generation
+        if os.path.exists(path):
+            prev_tmp = tmp_path + PREVIOUS_SUFFIX
+            try:
+                os.link(path, prev_tmp)
+            except OSError:
+                shutil.copyfile(path, prev_tmp)
+            os.replace(prev_tmp, path + PREVIOUS_SUFFIX)
+
+        os.replace(tmp_path, path)
+        _fsync_dir(path)
+    finally:
+        for leftover in (tmp_path, tmp_path + PREVIOUS_SUFFIX):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def _newest(current, previous):
+    candidates = [c for c in (current, previous) if c is not None]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: c[1])
+
+
+def recover_snapshot(path):
+    """Return the newest valid (data, generation) among the current and previous snapshots.
+
+    An unreadable current snapshot is moved aside rather than overwritten,
+    so a learner's progress is never silently reset.
+    """
+    current = read_snapshot(path)
+    previous = read_snapshot(path + PREVIOUS_SUFFIX)
+
+    if current is None and os.path.exists(path):
+        print(f"Snapshot {path} is damaged; keeping it as {path + CORRUPT_SUFFIX}")
+        os.replace(path, path + CORRUPT_SUFFIX)
+
+    return _newest(current, previous)
+
+
+def read_data(path, default_factory, attempts=3):
+    """Read a store's data without opening the store.
+
+    Unlike JournalStore, nothing on disk is repaired, renamed or locked, so
+    scans over many learners never interfere with the stores that own the
+    files; damaged snapshots are left for those stores to recover.
+
+    Returns:
+        A DataSnapshot at version 0
+    """
+    for _ in range(attempts):
+        snapshot_sig = _stat_signature(path)
+        recovered = _newest(read_snapshot(path), read_snapshot(path + PREVIOUS_SUFFIX))
+        data, generation = recovered if recovered is not None else (default_factory(), 0)
+        records, _ = read_journal(path + JOURNAL_SUFFIX)
+        # A compaction in between may have truncated records the snapshot read does not contain
+        if _stat_signature(path) == snapshot_sig:
+            break
+    for record in records:
+        if record.get("gen", 0) >= generation:
+            apply_record(data, record)
+    return make_snapshot(data, 0)
+
+
+class JournalStore:
+    """A JSON snapshot plus an append-only journal of mutations."""
+
+    def __init__(self, path, default_factory, flush_delay=FLUSH_DELAY, watcher=None):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.flush_delay = flush_delay
+        self._default_factory = default_factory
+        self._data = None
+        # Everything on disk as of the last read; _data is this plus _pending
+        self._base = None
+        self.version = 0
+        self._generation = 0
+        self._compaction_pending = False
+        # What is on disk as of the in-memory copy
+        self._snapshot_sig = None
+        self._journal_sig = None
+        self._journal_offset = 0
+        # Write-behind state: journal records and/or a whole snapshot not yet on disk
+        self._pending = []
+        self._snapshot_dirty = False
+        self._lock = threading.RLock()
+        # With a watcher, files are only re-checked after it reports a change
+        self._watched = False
+        self._stale = True
+        if watcher is not None:
+            self._watched = watcher.watch(self.path, self.invalidate) and watcher.watch(
+                self.journal_path, self.invalidate
+            )
+        _open_stores.add(self)
+
+    def exists(self):
+        """Return True if the store has data on disk or waiting to be flushed."""
+        return (
+            self.is_dirty()
+            or os.path.exists(self.path)
+            or os.path.exists(self.journal_path)
+        )
+
+    def is_dirty(self):
+        """Return True if there are changes not yet written to disk."""
+        return bool(self._pending) or self._snapshot_dirty
+
+    def invalidate(self):
+        """Mark the in-memory copy as possibly out of date with the files on disk."""
+        self._stale = True
+
+    def load(self):
+        """Return the current snapshot, picking up any changes made on disk since the last read.
+
+        Reads take no lock unless the files have changed on disk.
+        """
+        data = self._data
+        if data is not None:
+            if self._snapshot_dirty or (self._watched and not self._stale):
+                return data
+            if not self._watched and self._disk_unchanged():
+                return data
+
+        with self._lock:
+            if self._data is None:
+                self._data = self._replay()
+            else:
+                self._refresh()
+            return self._data
+
+    def get(self, section, key=None, default=None):
+        """Read one entry of a section, or the whole section if key is None."""
+        value = self.load().get(section)
+        if value is None:
+            return default
+        return value if key is None else value.get(str(key), default)
+
+    def reload(self):
+        """Flush pending changes, then drop the in-memory copy and replay from disk."""
+        with self._lock:
+            self.flush()
+            self._data = self._replay()
+            return self._data
+
+    def _disk_unchanged(self):
+        return (
+            _stat_signature(self.path) == self._snapshot_sig
+            and _stat_signature(self.journal_path) == self._journal_sig
+        )
+
+    def _next_version(self):
+        self.version += 1
+        return self.version
+
+    def _check_version(self, expected_version):
+        if expected_version is not None and expected_version != self.version:
+            raise ConflictError(
+                f"Data changed since version {expected_version} (now {self.version}); reload and retry"
+            )
+
+    def _replay(self):
+        """Read the snapshot and the whole journal into a new base."""
+        self._stale = False
+        self._snapshot_sig = _stat_signature(self.path)
+        self._journal_sig = _stat_signature(self.journal_path)
+
+        recovered = recover_snapshot(self.path)
+        if recovered is None:
+            data, self._generation = self._default_factory(), 0
+        else:
+            data, self._generation = recovered
+
+        records, self._journal_offset = read_journal(self.journal_path)
+        for record in self._unfolded(records):
+            apply_record(data, record)
+        self._base = make_snapshot(data, self._next_version())
+        return self._base
+
+    def _unfolded(self, records):
+        # Records older than the snapshot are already folded into it
+        return [record for record in records if record.get("gen", 0) >= self._generation]
+
+    def _refresh(self):
+        """Bring the in-memory copy up to date with changes other processes made on disk."""
+        self._stale = False
+        # A pending full snapshot overwrites whatever is on disk anyway
+        if self._snapshot_dirty:
+            return
+        intended = self._data
+
+        snapshot_sig = _stat_signature(self.path)
+        journal_sig = _stat_signature(self.journal_path)
+        if snapshot_sig == self._snapshot_sig and journal_sig == self._journal_sig:
+            return
+
+        appended_only = (
+            snapshot_sig == self._snapshot_sig
+            and journal_sig is not None
+            and self._journal_sig is not None
+            and journal_sig[0] == self._journal_sig[0]
+            and journal_sig[2] >= self._journal_offset
+        )
+        if appended_only:
+            records, self._journal_offset = read_journal(self.journal_path, self._journal_offset)
+            self._journal_sig = journal_sig
+            self._base = apply_records(self._base, self._unfolded(records), self._next_version())
+        else:
+            self._replay()
+
+        # Our unflushed changes will land after everything now on disk; they
+        # are applied to the new base once, never on top of the old copy
+        if self._pending:
+            self._pending = rebase_splices(self._base, self._pending, intended)
+            self._data = apply_records(self._base, self._pending, self._next_version())
+        else:
+            self._data = self._base
+
+    def apply(self, records, expected_version=None, intended=None):
+        """Apply mutation records and queue them for the journal.
+
+        Args:
+            records: Records built by make_record
+            expected_version: If given, the version the data must still be at
+            intended: The writer's data with the records applied, if they were
+                made against an older copy; splices that no longer fit become
+                sets of the text there (see rebase_splices)
+
+        Raises:
+            ConflictError: If expected_version is given and is not the current version
+        """
+        with self._lock:
+            data = self.load()
+            self._check_version(expected_version)
+            if intended is not None:
+                records = rebase_splices(data, records, intended)
+            self._data = apply_records(data, records, self._next_version())
+
+            # A pending snapshot already contains these changes
+            if not self._snapshot_dirty:
+                self._pending.extend(records)
+            _flusher.schedule(self, time.monotonic() + self.flush_delay)
+            return self._data
+
+    def replace(self, data, expected_version=None):
+        """Replace the whole document; a fresh snapshot is written on the next flush.
+
+        Raises:
+            ConflictError: If expected_version is given and is not the current version
+        """
+        with self._lock:
+            self.load()
+            self._check_version(expected_version)
+            self._data = make_snapshot(data, self._next_version())
+            self._pending = []
+            self._snapshot_dirty = True
+            _flusher.schedule(self, time.monotonic() + self.flush_delay)
+            return self._data
+
+    def flush(self):
+        """Write all pending changes to disk."""
+        with self._lock:
+            if self._snapshot_dirty:
+                self.compact()
+                return
+
+            if not self._pending:
+                return
+
+            with _file_lock(self.path):
+                # Catch up with other processes first, so records carry the current
+                # generation and land directly after everything this store has read
+                if not self._disk_unchanged():
+                    self._refresh()
+
+                payload = "".join(
+                    json.dumps(dict(r, gen=self._generation), separators=(",", ":")) + "\n"
+                    for r in self._pending
+                ).encode("utf-8")
+                with open(self.journal_path, 'ab') as f:
+                    start = f.seek(0, os.SEEK_END)
+                    f.write(payload)
+                self._pending = []
+
+                # Our records are now part of the disk state; skip re-reading them
+                # unless someone appended first (only possible without fcntl)
+                if start == self._journal_offset:
+                    self._base = self._data
+                    self._journal_offset += len(payload)
+                    self._journal_sig = _stat_signature(self.journal_path)
+
+            if self._journal_offset >= COMPACT_THRESHOLD_BYTES:
+                request_compaction(self)
+
+    def sync(self):
+        """Flush pending changes and force them to stable storage."""
+        with self._lock:
+            self.flush()
+            for path in (self.journal_path, self.path):
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    continue
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def close(self):
+        """Flush pending changes and release the in-memory copy."""
+        with self._lock:
+            self.flush()
+            self._data = self._base = None
+
+    def compact(self):
+        """Fold the journal into a new snapshot and truncate the journal."""
+        with self._lock, _file_lock(self.path):
+            self._compaction_pending = False
+            # Include anything other processes appended since our last read
+            if self._data is None:
+                self._data = self._replay()
+            else:
+                self._refresh()
+            data = self._data
+
+            write_snapshot(self.path, data, self._generation + 1)
+            self._generation += 1
+            # Truncate only after the snapshot holds every journaled change
+            with open(self.journal_path, 'w'):
+                pass
+            self._base = data
+            self._pending = []
+            self._snapshot_dirty = False
+            self._snapshot_sig = _stat_signature(self.path)
+            self._journal_sig = _stat_signature(self.journal_path)
+            self._journal_offset = 0
+
+
+class StoreCache:
+    """Bounded LRU of open stores keyed by learner.
+
+    Stores are created on demand by factory(key). When more than max_open
+    are open, the least recently used ones are closed, which flushes their
+    dirty state and releases their memory.
+    """
+
+    def __init__(self, factory, max_open=MAX_OPEN_STORES):
+        self._factory = factory
+        self.max_open = max_open
+        self._stores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the open store for key, opening it if needed."""
+        evicted = []
+        with self._lock:
+            store = self._stores.get(key)
+            if store is not None:
+                self._stores.move_to_end(key)
+                return store
+
+            store = self._factory(key)
+            self._stores[key] = store
+            while len(self._stores) > self.max_open:
+                evicted.append(self._stores.popitem(last=False)[1])
+
+        for old_store in evicted:
+            try:
+                old_store.close()
+            except Exception as e:
+                print(f"Error closing store: {e}")
+        return store
+
+    def peek(self, key):
+        """Return the open store for key without opening or promoting it."""
+        with self._lock:
+            return self._stores.get(key)
+
+    def __len__(self):
+        return len(self._stores)
+
+    def close_all(self):
+        """Close every open store."""
+        with self._lock:
+            stores = list(self._stores.values())
+            self._stores.clear()
+        for store in stores:
+            store.close()
+
+
+class _Flusher:
+    """Shared write-behind thread that flushes stores when their deadline passes.
+
+    Deadlines are kept in a min-heap, so an idle process sleeps on the
+    condition variable instead of polling.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, store, deadline):
+        """Flush store no later than deadline; an earlier deadline is kept."""
+        with self._cond:
+            current = self._deadlines.get(store)
+            if current is not None and current <= deadline:
+                return
+            self._deadlines[store] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._counter), store))
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="write-behind-flusher", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, _, store = self._heap[0]
+                    # Skip entries superseded by an earlier deadline
+                    if self._deadlines.get(store) != deadline:
+                        heapq.heappop(self._heap)
+                        continue
+                    timeout = deadline - time.monotonic()
+                    if timeout > 0:
+                        self._cond.wait(timeout)
+                        continue
+                    heapq.heappop(self._heap)
+                    del self._deadlines[store]
+                    break
+
+            try:
+                store.flush()
+            except Exception as e:
+                print(f"Error flushing data: {e}")
+                self.schedule(store, time.monotonic() + store.flush_delay)
+
+
+_flusher = _Flusher()
+_open_stores = weakref.WeakSet()
+
+
+def flush_all():
+    """Flush every open store; registered to run at process exit."""
+    for store in list(_open_stores):
+        try:
+            store.flush()
+        except Exception as e:
+            print(f"Error flushing data: {e}")
+
+
+atexit.register(flush_all)
+
+
+# Background compactor shared by all stores
+_compaction_queue = queue.Queue()
+_compactor_thread = None
+_compactor_lock = threading.Lock()
+
+
+def _compactor_loop():
+    while True:
+        store = _compaction_queue.get()
+        try:
+            store.compact()
+        except Exception as e:
+            print(f"Error compacting journal: {e}")
+
+
+def request_compaction(store):
+    """Schedule a store for compaction on the background compactor thread."""
+    global _compactor_thread
+
+    if store._compaction_pending:
+        return
+    store._compaction_pending = True
+
+    with _compactor_lock:
+        if _compactor_thread is None:
+            _compactor_thread = threading.Thread(
+                target=_compactor_loop, name="journal-compactor", daemon=True
+            )
+            _compactor_thread.start()
+    _compaction_queue.put(store)
@@ -0,0 +1,147 @@
+"""
+Learning streak engine for the Python learning tracker.
+
+Completion dates are kept as sorted runs of consecutive epoch days (days
+since 1970-01-01), built with NumPy diff/run-length encoding. Current
+streak, longest streak and every streak interval come straight from the
+runs, and completing a day updates them with a binary search instead of a
+rescan, so long histories stay cheap.
+"""
+import numpy as np
+
+import progress_model
+
+
+class StreakHistory:
+    """Immutable set of streaks; each streak is a run of consecutive completion days.
+
+    starts[i] and ends[i] are the first and last epoch day of run i (inclusive),
+    sorted ascending and never touching or overlapping.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts, ends):
+        self.starts = starts
+        self.ends = ends
+        self.starts.flags.writeable = False
+        self.ends.flags.writeable = False
+
+    @classmethod
+    def from_epoch_days(cls, epoch_days):
+        """Build the history from epoch days in any order, duplicates allowed."""
+        days = np.unique(np.asarray(epoch_days, dtype=np.int32))
+        if days.size == 0:
+            return cls(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32))
+
+        # A new run starts wherever the gap to the previous day is more than one
+        breaks = np.flatnonzero(np.diff(days) != 1)
+        starts = days[np.concatenate(([0], breaks + 1))]
+        ends = days[np.concatenate((breaks, [days.size - 1]))]
+        return cls(starts, ends)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build the history from the completion dates in a ProgressColumns."""
+        epoch_days = [
+            columns.completion_days[day_num - 1]
+            for day_num in range(1, columns.days_count + 1)
+            if columns.is_completed(day_num) and columns.completion_days[day_num - 1] != progress_model.NO_DATE
+        ]
+        return cls.from_epoch_days(epoch_days)
+
+    def __len__(self):
+        return int(self.starts.size)
+
+    def __contains__(self, epoch_day):
+        i = int(np.searchsorted(self.starts, epoch_day, side="right")) - 1
+        return i >= 0 and epoch_day <= self.ends[i]
+
+    def with_day(self, epoch_day):
+        """Return the history with one more completion day, found by binary search.
+
+        Extending a run is a copy of the run boundaries; only a new isolated day
+        or a day joining two runs changes the number of runs.
+        """
+        if epoch_day in self:
+            return self
+
+        i = int(np.searchsorted(self.starts, epoch_day))  # First run starting after epoch_day
+        joins_previous = i > 0 and self.ends[i - 1] == epoch_day - 1
+        joins_next = i < self.starts.size and self.starts[i] == epoch_day + 1
+
+        if joins_previous and joins_next:
+            # The day bridges two runs: merge them
+            starts = np.delete(self.starts, i)
+            ends = np.delete(self.ends, i - 1)
+        elif joins_previous:
+            starts = self.starts
+            ends = self.ends.copy()
+            ends[i - 1] = epoch_day
+        elif joins_next:
+            starts = self.starts.copy()
+            starts[i] = epoch_day
+            ends = self.ends
+        else:
+            starts = np.insert(self.starts, i, epoch_day)
+            ends = np.insert(self.ends, i, epoch_day)
+        return StreakHistory(starts, ends)
+
+    def current(self, today):
+        """Return the current streak as of today (a date).
+
+        Today counts if completed; the streak then continues back through
+        consecutive completed days starting yesterday.
+        """
+        today = progress_model.to_epoch_day(today)
+        i = int(np.searchsorted(self.starts, today, side="right")) - 1
+        if i < 0 or self.ends[i] < today - 1:
+            return 0
+        return int(min(self.ends[i], today) - self.starts[i] + 1)
+
+    def longest(self):
+        """Return the length of the longest streak, or 0 without any completions."""
+        if self.starts.size == 0:
+            return 0
+        return int((self.ends - self.starts).max() + 1)
+
+    def intervals(self):
+        """Return every streak as (first date, last date, length in days), oldest first."""
+        return [
+            (progress_model.from_epoch_day(int(start)), progress_model.from_epoch_day(int(end)), int(end - start + 1))
+            for start, end in zip(self.starts, self.ends)
+        ]
+
+
+def get_streaks(snapshot, columns):
+    """Return the streak history for a data snapshot, building it once per snapshot."""
+    history = snapshot.derived.get("streaks")
+    if history is None:
+        history = StreakHistory.from_columns(columns)
+        snapshot.derived["streaks"] = history
+    return history
+
+
+def carry_forward(before, after, records, update=None):
+    """Derive the streak history of after from that of before without rescanning.
+
+    Mirrors aggregates.carry_forward: only valid when after is exactly one write
+    on top of before; otherwise after's history is rebuilt on first use.
+
+    Args:
+        before: The snapshot the write was based on
+        after: The snapshot produced by the write
+        records: The mutation records of the write
+        update: Function (history, before) -> new history (or None to rebuild),
+            for writes that touch the progress section
+    """
+    history = before.derived.get("streaks")
+    if history is None or after.version != before.version + 1 or "streaks" in after.derived:
+        return
+
+    if update is not None:
+        history = update(history, before)
+        if history is not None:
+            after.derived["streaks"] = history
+    elif not any(record["path"][0] == "progress" for record in records):
+        after.derived["streaks"] = history
@@ -0,0 +1,25 @@
+"""Shared fixtures: tracker data in a temporary directory."""
+import pytest
+
+import data_handler as dh
+import storage
+
+
+@pytest.fixture
+def tracker_data(tmp_path, monkeypatch):
+    """Point data_handler at empty JSON stores under tmp_path, with room for 4 open stores."""
+    monkeypatch.setattr(dh, "STORAGE_BACKEND", "json")
+    monkeypatch.setattr(dh, "DATA_FILE", str(tmp_path / "progress.json"))
+    monkeypatch.setattr(dh, "DATA_DIR", str(tmp_path / "learner_data"))
+    monkeypatch.setattr(dh, "_stores", storage.StoreCache(dh._open_store, max_open=4))
+    yield tmp_path
+    dh._stores.close_all()
+
+
+def add_learner(learner_id, **sections):
+    """Create a learner on disk with the given settings sections, leaving no store open."""
+    with dh.as_learner(learner_id):
+        dh.initialize_data()
+        for section, settings in sections.items():
+            dh.save_settings(section, settings)
+    dh._stores.close_all()
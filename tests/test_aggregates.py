@@ -0,0 +1,80 @@
+"""Tests for the materialized progress aggregates."""
+import aggregates
+import curriculum as curr
+import data_handler as dh
+import storage
+
+# Three uneven weeks: days 1-2, 3-5 and 6-9
+WEEK_BOUNDS = ((1, 2), (3, 5), (6, 9))
+
+
+def make_data(progress=None, time_spent=None):
+    return storage.make_snapshot({"progress": progress or {}, "time_spent": time_spent or {}}, 1)
+
+
+def test_from_data_sums_by_week():
+    data = make_data(
+        progress={"1": {"completed": True}, "4": {"completed": True}, "5": {"completed": False}},
+        time_spent={"2": 30, "3": 15, "9": 45}
+    )
+    agg = aggregates.ProgressAggregates.from_data(data, WEEK_BOUNDS)
+
+    assert agg.days_count == 9
+    assert agg.completed_count == 2
+    assert agg.weekly_completed == (1, 1, 0)
+    assert agg.weekly_minutes == (30, 15, 45)
+    assert agg.total_minutes == 90
+
+
+def test_updates_match_a_rescan():
+    agg = aggregates.ProgressAggregates.from_data(make_data(), WEEK_BOUNDS)
+    agg = agg.with_completion(5, False, True).with_completion(6, False, True).with_completion(5, True, False)
+    agg = agg.with_minutes(9, 0, 60).with_minutes(9, 60, 20)
+
+    data = make_data(progress={"6": {"completed": True}}, time_spent={"9": 20})
+    assert agg.verify(data) == []
+    assert agg.weekly_completed == (0, 0, 1)
+    assert agg.total_minutes == 20
+
+
+def test_unchanged_updates_return_the_same_object():
+    agg = aggregates.ProgressAggregates.from_data(make_data(), WEEK_BOUNDS)
+
+    assert agg.with_completion(1, True, True) is agg
+    assert agg.with_minutes(1, 10, 10) is agg
+    # Days outside the curriculum do not count towards any week
+    assert agg.with_minutes(42, 0, 10) is agg
+
+
+def test_setters_carry_aggregates_forward(tracker_data):
+    with dh.as_learner("learner"):
+        dh.initialize_data()
+        dh.get_completion_percentage()  # Computes the aggregates once
+
+        dh.mark_day_complete(1)
+        dh.mark_day_complete(8)
+        dh.update_time_spent(1, 1, 30)
+        dh.save_note(1, "carried through writes to other sections")
+
+        # Each write derived its aggregates from the previous ones instead of rescanning
+        assert "aggregates" in dh.load_data().derived
+        assert dh.verify_aggregates() == []
+        assert dh.get_total_time_spent() == 90
+        assert sum(dh.get_weekly_progress()) == 2
+        assert dh.get_completion_percentage() == 2 / curr.get_days_count() * 100
+
+        dh.mark_day_complete(8, completed=False)
+        assert dh.verify_aggregates() == []
+        assert sum(dh.get_weekly_progress()) == 1
+
+
+def test_aggregates_are_recomputed_after_a_transaction(tracker_data):
+    with dh.as_learner("learner"):
+        dh.initialize_data()
+        dh.get_completion_percentage()
+        with dh.transaction():
+            dh.mark_day_complete(2)
+            dh.update_time_spent(2, 0, 45)
+
+        assert dh.verify_aggregates() == []
+        assert dh.get_total_time_spent() == 45
@@ -0,0 +1,52 @@
+"""Tests for debounced note drafts."""
+import pytest
+
+import autosave
+import data_handler as dh
+
+
+def test_draft_is_kept_until_its_transaction_commits(tracker_data):
+    drafts = autosave.DraftBuffer({}, dh.save_note, committed=dh.after_commit)
+    with dh.as_learner("learner"):
+        dh.initialize_data()
+        drafts.edit(1, "my note", "")
+
+        with pytest.raises(RuntimeError):
+            with dh.transaction():
+                assert drafts.flush() == [1]
+                raise RuntimeError("page failed")
+        # The discarded save is not lost
+        assert 1 in drafts
+        assert dh.get_note(1) == ""
+
+        with dh.transaction():
+            drafts.flush()
+            assert 1 in drafts
+        assert 1 not in drafts
+        assert dh.get_note(1) == "my note"
+
+
+def test_draft_edited_after_saving_is_kept(tracker_data):
+    drafts = autosave.DraftBuffer({}, dh.save_note, committed=dh.after_commit)
+    with dh.as_learner("learner"):
+        dh.initialize_data()
+        drafts.edit(1, "first", "")
+        with dh.transaction():
+            drafts.flush()
+            drafts.edit(1, "second", "first")
+
+        assert drafts.get(1, dh.get_note(1)) == "second"
+
+
+def test_idle_drafts_are_saved():
+    now = [0.0]
+    saved = {}
+    drafts = autosave.DraftBuffer({}, saved.__setitem__, idle_seconds=3, clock=lambda: now[0])
+    drafts.edit(1, "one", "")
+    now[0] = 2
+    drafts.edit(2, "two", "")
+
+    now[0] = 3
+    assert drafts.flush_idle() == [1]
+    assert saved == {1: "one"}
+    assert list(drafts) == [2]
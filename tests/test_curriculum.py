@@ -0,0 +1,28 @@
+"""Tests for the curriculum loader and its cache."""
+import os
+
+import curriculum
+
+
+def test_cache_round_trip(tmp_path):
+    cache_dir = tmp_path / "cache"
+    compiled = curriculum.load_curriculum(curriculum.CURRICULUM_FILE, cache_dir=str(cache_dir))
+    cached_files = os.listdir(cache_dir)
+    assert [name.endswith(".marshal") for name in cached_files] == [True]
+
+    cached = curriculum.load_curriculum(curriculum.CURRICULUM_FILE, cache_dir=str(cache_dir))
+    # Records compare by identity; their reprs list every field
+    assert repr(cached.weeks) == repr(compiled.weeks)
+    assert cached.title == compiled.title
+    assert cached.week_bounds == compiled.week_bounds
+
+
+def test_cache_in_shared_directory_is_ignored(tmp_path):
+    cache_dir = tmp_path / "cache"
+    curriculum.load_curriculum(curriculum.CURRICULUM_FILE, cache_dir=str(cache_dir))
+    cache_dir.chmod(0o777)
+    (cache_path,) = cache_dir.iterdir()
+    cache_path.write_bytes(b"not a cache")
+
+    loaded = curriculum.load_curriculum(curriculum.CURRICULUM_FILE, cache_dir=str(cache_dir))
+    assert loaded.day(1).day == 1
@@ -0,0 +1,48 @@
+"""Tests for the notification delivery ledger."""
+from datetime import date
+
+import delivery_ledger
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def key(learner_id="alice", day="2026-10-18"):
+    return learner_id, "email", "daily_reminder", day
+
+
+def test_claim_is_granted_once(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    first, second = delivery_ledger.DeliveryLedger(path), delivery_ledger.DeliveryLedger(path)
+
+    assert first.claim([key("alice"), key("bob")]) == [key("alice"), key("bob")]
+    assert second.claim([key("alice"), key("bob"), key("carol")]) == [key("carol")]
+    first.record([(key("alice"), True)])
+    assert key("alice") in second
+    assert second.claim([key("alice")]) == []
+
+
+def test_failed_and_stale_claims_are_taken_over(tmp_path):
+    clock = Clock()
+    ledger = delivery_ledger.DeliveryLedger(str(tmp_path / "ledger.db"), claim_timeout=600, clock=clock)
+
+    assert ledger.claim([key("alice"), key("bob")]) == [key("alice"), key("bob")]
+    ledger.record([(key("alice"), False)])
+    assert ledger.claim([key("alice"), key("bob")]) == [key("alice")]
+
+    clock.now += 601
+    assert ledger.claim([key("bob")]) == [key("bob")]
+    assert ledger.status(key("bob")) == delivery_ledger.SENDING
+
+
+def test_compact_drops_old_dates(tmp_path):
+    ledger = delivery_ledger.DeliveryLedger(str(tmp_path / "ledger.db"))
+    ledger.claim([key(day="2026-10-01"), key(day="2026-10-17")])
+
+    assert ledger.compact(date(2026, 10, 18), retention_days=7) == 1
+    assert len(ledger) == 1
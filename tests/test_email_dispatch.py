@@ -0,0 +1,120 @@
+"""Tests for the asynchronous email dispatcher."""
+import smtplib
+import threading
+
+import pytest
+
+import email_dispatch
+
+
+class FakeTransport:
+    """Records sent messages; messages to a blocked domain wait until it is released."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+        self.attempts = 0
+        self.blocked = {}
+        self._lock = threading.Lock()
+
+    def block(self, domain):
+        self.blocked[domain] = threading.Event()
+
+    def release(self):
+        for event in self.blocked.values():
+            event.set()
+
+    def send(self, message):
+        domain = message["To"].rpartition("@")[2]
+        if domain in self.blocked:
+            self.blocked[domain].wait()
+        with self._lock:
+            self.attempts += 1
+            if self.errors:
+                raise self.errors.pop(0)
+            self.sent.append(message["To"])
+
+
+@pytest.fixture
+def dispatcher():
+    made = []
+
+    def make(transport, **options):
+        options.setdefault("backoff", 0.01)
+        made.append(email_dispatch.EmailDispatcher(transport, **options).start())
+        return made[-1]
+
+    yield make
+    for d in made:
+        d.transport.release()
+        d.stop(timeout=1)
+
+
+def test_messages_are_delivered(dispatcher):
+    transport = FakeTransport()
+    d = dispatcher(transport)
+    futures = [d.enqueue(f"learner{i}@example.org", "Subject", "<p>Hi</p>") for i in range(10)]
+
+    assert [f.result(timeout=5) for f in futures] == [True] * 10
+    assert d.drain(timeout=5)
+    assert len(transport.sent) == 10
+    assert d.pending() == 0
+
+
+def test_slow_domain_does_not_hold_every_worker(dispatcher):
+    transport = FakeTransport()
+    transport.block("slow.example")
+    d = dispatcher(transport, workers=2, per_domain=1)
+    slow = [d.enqueue(f"learner{i}@slow.example", "Subject", "<p>Hi</p>") for i in range(3)]
+    fast = d.enqueue("learner@fast.example", "Subject", "<p>Hi</p>")
+
+    assert fast.result(timeout=5) is True
+    assert not any(f.done() for f in slow)
+
+    transport.release()
+    assert [f.result(timeout=5) for f in slow] == [True] * 3
+
+
+def test_transient_errors_are_retried(dispatcher):
+    transport = FakeTransport([smtplib.SMTPResponseException(451, b"try later")])
+    d = dispatcher(transport)
+
+    assert d.enqueue("learner@example.org", "Subject", "<p>Hi</p>").result(timeout=5) is True
+    assert transport.attempts == 2
+    assert d.stats["retried"] == 1
+
+
+def test_permanent_errors_are_not_retried(dispatcher):
+    transport = FakeTransport([smtplib.SMTPResponseException(550, b"no such user")])
+    d = dispatcher(transport)
+
+    assert d.enqueue("learner@example.org", "Subject", "<p>Hi</p>").result(timeout=5) is False
+    assert transport.attempts == 1
+    assert d.stats["failed"] == 1
+
+
+def test_stop_resolves_unsent_messages(dispatcher):
+    transport = FakeTransport()
+    transport.block("slow.example")
+    d = dispatcher(transport, workers=2, per_domain=1)
+    futures = [d.enqueue(f"learner{i}@slow.example", "Subject", "<p>Hi</p>") for i in range(3)]
+
+    d.stop(timeout=0.1)
+
+    # In flight and still waiting for the domain alike are given up, not left hanging
+    assert [f.result(timeout=1) for f in futures] == [False] * 3
+    assert d.pending() == 0
+
+
+def test_sink_receives_messages():
+    sink = email_dispatch.LocalSmtpSink().start()
+    d = email_dispatch.EmailDispatcher(email_dispatch.SmtpTransport(sink.host, sink.port)).start()
+    try:
+        futures = [d.enqueue(f"learner{i}@example.org", "Subject", "<p>Hi</p>") for i in range(3)]
+        assert [f.result(timeout=5) for f in futures] == [True] * 3
+    finally:
+        d.stop(timeout=5)
+        sink.stop()
+
+    assert sink.received == 3
+    assert d.transport.connections_opened <= 3
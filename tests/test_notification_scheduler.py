@@ -0,0 +1,66 @@
+"""Tests for the background notification scheduler."""
+import threading
+from datetime import datetime
+
+import data_handler as dh
+import notification_scheduler
+from conftest import add_learner
+
+EMAIL_SETTINGS = {"enabled": True, "email": "learner@example.org", "reminder_time": "09:00"}
+
+
+class RecordingPipeline:
+    """Stands in for NotificationPipeline and records what fell due."""
+
+    def __init__(self):
+        self.batches = []
+        self.called = threading.Event()
+
+    def process(self, due):
+        self.batches.append(list(due))
+        self.called.set()
+        return []
+
+
+def test_next_fire_time_rolls_over_to_tomorrow():
+    after = datetime(2026, 10, 18, 9, 30)
+    assert notification_scheduler.next_fire_time("10:00", after) == datetime(2026, 10, 18, 10, 0)
+    assert notification_scheduler.next_fire_time("09:00", after) == datetime(2026, 10, 19, 9, 0)
+
+
+def test_due_reminders_are_handed_to_the_pipeline_and_rescheduled(tracker_data):
+    add_learner("alice", email_settings=EMAIL_SETTINGS)
+    add_learner("bob", email_settings=dict(EMAIL_SETTINGS, enabled=False))
+    pipeline = RecordingPipeline()
+    now = datetime(2026, 10, 18, 9, 1)
+    scheduler = notification_scheduler.NotificationScheduler(pipeline=pipeline, clock=lambda: now)
+
+    scheduler.start()
+    try:
+        assert pipeline.called.wait(5)
+    finally:
+        scheduler.stop()
+
+    assert pipeline.batches == [[("alice", "email", now.date())]]
+    assert scheduler.next_fire_time("alice", "email") == datetime(2026, 10, 19, 9, 0)
+    assert scheduler.next_fire_time("bob", "email") is None
+
+
+def test_scheduling_does_not_evict_session_stores(tracker_data):
+    for i in range(10):
+        add_learner(f"learner{i}", email_settings=EMAIL_SETTINGS)
+    scheduler = notification_scheduler.NotificationScheduler(
+        pipeline=RecordingPipeline(), clock=lambda: datetime(2026, 10, 18, 8, 0)
+    )
+
+    with dh.as_learner("active"), dh.transaction() as tx:
+        dh.save_note(1, "draft")
+        scheduler.resync()
+        for i in range(10):
+            scheduler.reschedule(f"learner{i}")
+        assert tx.store is dh._get_store()
+        assert len(dh._stores) == 1
+
+    assert len(scheduler) == 10
+    with dh.as_learner("active"):
+        assert dh.get_note(1) == "draft"
@@ -0,0 +1,110 @@
+"""Tests for the notification pipeline and its channels."""
+from datetime import date
+
+import pytest
+
+import data_handler as dh
+import delivery_ledger
+import notifications
+import schedule
+from conftest import add_learner
+
+START = date(2026, 10, 1)
+SETTINGS = {"enabled": True, "url": "https://hooks.example.org/x", "reminder_time": "09:00"}
+
+
+class RecordingChannel(notifications.Channel):
+    name = "recording"
+    settings_section = "recording_settings"
+    address_field = "url"
+
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.sent = []
+
+    def send_many(self, batch):
+        self.sent.extend(batch)
+        return [self.ok] * len(batch)
+
+
+@pytest.fixture
+def pipeline(tracker_data):
+    def make(channel):
+        ledger = delivery_ledger.DeliveryLedger(str(tracker_data / "ledger.db"))
+        return notifications.NotificationPipeline({channel.name: channel}, ledger)
+    return make
+
+
+def add_scheduled_learner(learner_id, **settings):
+    add_learner(learner_id, schedule=schedule.default_settings(START),
+                recording_settings=dict(SETTINGS, **settings))
+
+
+def test_collect_adds_missed_day_after_an_incomplete_day(tracker_data):
+    add_scheduled_learner("alice")
+    kinds = [n.kind for n in notifications.collect("alice", RecordingChannel(), date(2026, 10, 2))]
+    assert kinds == [notifications.MISSED_DAY, notifications.DAILY_REMINDER]
+
+    add_scheduled_learner("bob", daily_reminder=False)
+    assert notifications.collect("bob", RecordingChannel(), START) == []
+
+
+def test_pipeline_sends_once_and_counts_duplicates(pipeline):
+    add_scheduled_learner("alice")
+    channel = RecordingChannel()
+    due = [("alice", channel.name, START)]
+
+    first, second = pipeline(channel), pipeline(channel)
+    assert [n.kind for n in first.process(due)] == [notifications.DAILY_REMINDER]
+    assert second.process(due) == []
+    assert len(channel.sent) == 1
+    assert second.get_metrics() == {(channel.name, notifications.DAILY_REMINDER, "duplicate"): 1}
+
+
+def test_failed_deliveries_are_retried(pipeline):
+    add_scheduled_learner("alice")
+    failing, working = RecordingChannel(ok=False), RecordingChannel()
+    due = [("alice", "recording", START)]
+
+    assert pipeline(failing).process(due) == []
+    assert len(pipeline(working).process(due)) == 1
+
+
+def test_pipeline_does_not_evict_session_stores(pipeline):
+    for i in range(10):
+        add_scheduled_learner(f"learner{i}")
+    channel = RecordingChannel()
+
+    with dh.as_learner("active"), dh.transaction() as tx:
+        dh.save_note(1, "draft")
+        pipeline(channel).process([(f"learner{i}", channel.name, START) for i in range(10)])
+        assert tx.store is dh._get_store()
+        assert len(dh._stores) == 1
+    assert len(channel.sent) == 10
+
+
+def test_channels_must_implement_send_many():
+    class HalfWritten(notifications.Channel):
+        name = "half"
+        settings_section = "half_settings"
+
+    with pytest.raises(TypeError):
+        notifications.register_channel(HalfWritten())
+
+
+@pytest.mark.parametrize("url", [
+    "http://hooks.example.org/x",
+    "https://127.0.0.1/hook",
+    "https://169.254.169.254/latest/meta-data",
+    "https://localhost:8080/hook",
+    "https://[::1]/hook",
+])
+def test_webhooks_to_private_addresses_are_refused(url):
+    with pytest.raises(ValueError):
+        notifications.check_webhook_url(url)
+
+
+def test_webhook_allow_list(monkeypatch):
+    monkeypatch.setattr(notifications, "WEBHOOK_ALLOWED_HOSTS", frozenset({"hooks.slack.com"}))
+    with pytest.raises(ValueError):
+        notifications.check_webhook_url("https://8.8.8.8/hook")
@@ -0,0 +1,93 @@
+"""Tests for learner schedules: rest days, pauses and rescheduling."""
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+import data_handler as dh
+import schedule
+
+FRIDAY = date(2026, 10, 2)
+DAYS = 21
+
+
+def settings(start=FRIDAY, rest_days=(), pauses=()):
+    return {"start_date": start.isoformat(), "rest_days": list(rest_days), "pauses": list(pauses)}
+
+
+def test_days_are_consecutive_without_rest_days():
+    s = schedule.get_schedule(settings(), DAYS)
+
+    assert s.days_count == DAYS
+    assert s.date(1) == FRIDAY
+    assert s.date(DAYS) == FRIDAY + timedelta(days=DAYS - 1)
+    assert s.formatted_date(1) == "Friday, October 02, 2026"
+
+
+def test_rest_days_and_pauses_are_skipped():
+    s = schedule.get_schedule(settings(rest_days=[5, 6], pauses=[{"start": "2026-10-06", "end": "2026-10-07"}]), DAYS)
+
+    # Friday, then Monday after the weekend, then Thursday after the pause
+    assert [s.date(day) for day in (1, 2, 3)] == [FRIDAY, date(2026, 10, 5), date(2026, 10, 8)]
+    assert all(day_date.weekday() < 5 for day_date in s.dates.tolist())
+
+
+def test_start_on_a_rest_day_rolls_forward():
+    s = schedule.get_schedule(settings(start=date(2026, 10, 3), rest_days=[5, 6]), DAYS)
+
+    assert s.date(1) == date(2026, 10, 5)
+
+
+def test_lookups_outside_the_curriculum():
+    s = schedule.get_schedule(settings(rest_days=[6]), DAYS)
+
+    assert s.date(0) is None and s.date(DAYS + 1) is None
+    assert s.formatted_date(DAYS + 1) == "N/A"
+    assert s.day_on(date(2026, 10, 3)) == 2
+    assert s.day_on(date(2026, 10, 4)) is None  # A Sunday rest day
+    assert not s.dates.flags.writeable
+
+
+def test_schedules_are_shared_per_settings():
+    assert schedule.get_schedule(settings(), DAYS) is schedule.get_schedule(settings(), DAYS)
+
+
+def test_reschedule_matches_a_fresh_schedule():
+    current = settings(rest_days=[6])
+    new_settings, shifted = schedule.reschedule(current, DAYS, 5, date(2026, 10, 20))
+
+    assert shifted.date(4) == schedule.get_schedule(current, DAYS).date(4)
+    assert shifted.date(5) == date(2026, 10, 20)
+    fresh = schedule.Schedule.build(FRIDAY, "1111110", schedule._holidays(
+        [(pause["start"], pause["end"]) for pause in new_settings["pauses"]]), DAYS)
+    assert np.array_equal(shifted.dates, fresh.dates)
+    assert shifted.formatted == fresh.formatted
+    assert schedule.get_schedule(new_settings, DAYS) is shifted
+
+
+def test_reschedule_to_an_earlier_date_changes_nothing():
+    current = settings()
+    assert schedule.reschedule(current, DAYS, 5, FRIDAY) == (current, schedule.get_schedule(current, DAYS))
+
+
+@pytest.mark.parametrize("bad", [
+    settings(rest_days=range(7)),
+    settings(rest_days=[7]),
+    settings(pauses=[{"start": "2026-10-10", "end": "2026-10-09"}]),
+    {"start_date": "not a date"},
+])
+def test_invalid_settings_are_rejected(bad):
+    with pytest.raises(ValueError):
+        schedule.validate_settings(bad)
+
+
+def test_reschedule_from_stores_the_gap_as_a_pause(tracker_data):
+    with dh.as_learner("learner"):
+        dh.initialize_data()
+        dh.save_schedule_settings(settings())
+
+        dh.reschedule_from(3, date(2026, 10, 10))
+
+        assert list(dh.get_schedule_settings()["pauses"]) == [{"start": "2026-10-04", "end": "2026-10-09"}]
+        assert dh.get_schedule().date(3) == date(2026, 10, 10)
+        assert dh.get_schedule().date(2) == date(2026, 10, 3)
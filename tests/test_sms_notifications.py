@@ -0,0 +1,79 @@
+"""Tests for the rate-limited Twilio sender, against the local stand-in."""
+import pytest
+
+import sms_notifications
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def stand_in():
+    server = sms_notifications.LocalTwilioStandIn().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def sender(stand_in):
+    made = []
+
+    def make(**options):
+        made.append(sms_notifications.TwilioSender("AC123", "token", "+15550000000", base_url=stand_in.base_url,
+                                                   **options))
+        return made[-1]
+
+    yield make
+    for s in made:
+        s.close()
+
+
+def test_token_bucket_spaces_out_acquires():
+    clock = FakeClock()
+    bucket = sms_notifications.TokenBucket(10, capacity=2, clock=clock, sleep=clock.sleep)
+
+    # Two tokens up front, then one every 0.1 s
+    assert [bucket.acquire() for _ in range(4)] == pytest.approx([0, 0, 0.1, 0.1])
+    assert clock.now == pytest.approx(0.2)
+
+
+def test_send_many_delivers_every_message(stand_in, sender):
+    s = sender(workers=4, max_per_second=1000)
+    messages = [(f"+1555000{i:04d}", f"Reminder {i}") for i in range(20)]
+
+    assert s.send_many(messages) == [True] * 20
+    assert sorted(m["To"] for m in stand_in.messages) == sorted(number for number, _ in messages)
+    # Keep-alive connections are reused rather than opened per message
+    assert stand_in.connections <= 4
+
+
+def test_throttled_send_is_retried_with_injected_sleep(stand_in, sender):
+    stand_in.fail_every = 2
+    slept = []
+    s = sender(max_per_second=1000, backoff=5.0, sleep=slept.append)
+
+    assert s.send("+15550000001", "first") is True
+    assert s.send("+15550000002", "second") is True
+    assert stand_in.requests == 3
+    assert [m["Body"] for m in stand_in.messages] == ["first", "second"]
+    assert 5.0 in slept
+
+
+def test_gives_up_after_max_attempts(stand_in, sender):
+    stand_in.fail_every = 1
+    slept = []
+    s = sender(max_per_second=1000, max_attempts=3, backoff=1.0, sleep=slept.append)
+
+    assert s.send("+15550000001", "hello") is False
+    assert stand_in.requests == 3
+    assert [delay for delay in slept if delay >= 1] == [1.0, 2.0]
@@ -0,0 +1,159 @@
+"""Tests for the journal store: versions, crash recovery and concurrent writers."""
+import os
+
+import pytest
+
+import storage
+
+
+def default_data():
+    return {"notes": {"1": "abc"}}
+
+
+def open_store(tmp_path):
+    # A long flush delay keeps the write-behind flusher out of the way; tests flush explicitly
+    return storage.JournalStore(str(tmp_path / "data.json"), default_data, flush_delay=3600)
+
+
+def set_note(day, text):
+    return storage.make_record(storage.OP_SET, ["notes", day], text)
+
+
+def test_replay_ignores_torn_final_record(tmp_path):
+    store = open_store(tmp_path)
+    store.apply([set_note(2, "kept")])
+    store.flush()
+    with open(store.journal_path, "a") as f:
+        f.write('{"op":"set","path":["notes","3"],"val')
+
+    data = open_store(tmp_path).load()
+    assert data["notes"] == {"1": "abc", "2": "kept"}
+
+
+def test_damaged_snapshot_falls_back_to_previous_generation(tmp_path):
+    store = open_store(tmp_path)
+    store.replace({"notes": {"1": "first"}})
+    store.flush()
+    store.replace({"notes": {"1": "second"}})
+    store.flush()
+    with open(store.path, "w") as f:
+        f.write('{"generation": 2, "checksum": "sha256:0", "data": {"notes": {}}}')
+
+    assert open_store(tmp_path).load()["notes"] == {"1": "first"}
+    # The damaged file is kept aside rather than overwritten
+    assert (tmp_path / ("data.json" + storage.CORRUPT_SUFFIX)).exists()
+
+
+def test_refresh_picks_up_other_writers_and_keeps_pending_changes(tmp_path):
+    a, b = open_store(tmp_path), open_store(tmp_path)
+    a.apply([set_note(0, "journal exists")])
+    a.flush()
+    b.load()
+
+    a.apply([set_note(1, "pending in a")])
+    b.apply([set_note(2, "from b")])
+    b.flush()
+
+    assert a.load()["notes"] == {"0": "journal exists", "1": "pending in a", "2": "from b"}
+    a.flush()
+    # a caught up before appending, so it does not read its own records back
+    assert a._journal_offset == os.path.getsize(a.journal_path)
+    assert b.load()["notes"] == a.load()["notes"]
+
+
+def test_stale_expected_version_raises_conflict(tmp_path):
+    store = open_store(tmp_path)
+    version = store.load().version
+    store.apply([set_note(2, "first")], expected_version=version)
+
+    with pytest.raises(storage.ConflictError):
+        store.apply([set_note(2, "second")], expected_version=version)
+    with pytest.raises(storage.ConflictError):
+        store.replace({"notes": {}}, expected_version=version)
+    assert store.load()["notes"]["2"] == "first"
+
+
+def test_snapshots_are_read_only(tmp_path):
+    data = open_store(tmp_path).load()
+    with pytest.raises(TypeError):
+        data["notes"]["1"] = "changed"
+
+
+def test_read_data_never_repairs_files(tmp_path):
+    store = open_store(tmp_path)
+    store.replace({"notes": {"1": "first"}})
+    store.flush()
+    store.replace({"notes": {"1": "second"}})
+    store.flush()
+    store.apply([set_note(2, "journaled")])
+    store.flush()
+    with open(store.path, "w") as f:
+        f.write("{torn")
+
+    data = storage.read_data(store.path, default_data)
+    assert data["notes"] == {"1": "first", "2": "journaled"}
+    # The damaged snapshot is left in place for its store to recover
+    assert not (tmp_path / ("data.json" + storage.CORRUPT_SUFFIX)).exists()
+    with open(store.path) as f:
+        assert f.read() == "{torn"
+
+
+def test_refresh_applies_pending_splice_once(tmp_path):
+    a, b = open_store(tmp_path), open_store(tmp_path)
+    a.apply([set_note(0, "journal exists")])
+    a.flush()
+    b.load()
+
+    a.apply([storage.make_record(storage.OP_SPLICE, ["notes", "1"], storage.text_delta("abc", "abcHELLO"))])
+    b.apply([set_note(2, "from b")])
+    b.flush()
+
+    assert a.load()["notes"]["1"] == "abcHELLO"
+    a.flush()
+    assert a.load()["notes"]["1"] == "abcHELLO"
+    assert b.load()["notes"] == {"0": "journal exists", "1": "abcHELLO", "2": "from b"}
+    a.compact()
+    assert open_store(tmp_path).load()["notes"]["1"] == "abcHELLO"
+
+
+def test_pending_splice_on_changed_text_becomes_set(tmp_path):
+    a, b = open_store(tmp_path), open_store(tmp_path)
+    a.apply([set_note(0, "journal exists")])
+    a.flush()
+    b.load()
+
+    a.apply([storage.make_record(storage.OP_SPLICE, ["notes", "1"], storage.text_delta("abc", "abcHELLO"))])
+    b.apply([set_note(1, "rewritten by b")])
+    b.flush()
+    a.flush()
+
+    # a wrote last, so its text wins whole rather than spliced into b's
+    assert open_store(tmp_path).load()["notes"]["1"] == "abcHELLO"
+
+
+def test_splice_on_other_text_is_skipped():
+    splice = storage.text_delta("abd", "abdX")
+    data = storage.apply_record({"note": "abc"}, storage.make_record(storage.OP_SPLICE, ["note"], splice))
+    assert data["note"] == "abc"
+
+
+def test_transaction_splice_on_note_another_session_saved_becomes_set(tmp_path):
+    import data_handler as dh
+
+    original = "x" * 3000
+    a, b = open_store(tmp_path), open_store(tmp_path)
+    a.apply([set_note(1, original)])
+    a.flush()
+    b.load()
+
+    tx = dh.Transaction(a)
+    edited = original + " mine"
+    tx.apply([storage.make_record(storage.OP_SPLICE, ["notes", 1], storage.text_delta(original, edited))])
+    b.apply([set_note(1, original + " theirs")])
+    b.flush()
+    tx.commit()
+
+    # The splice no longer fits the stored text, so the transaction's text is written instead of dropped
+    assert a.load()["notes"]["1"] == edited
+    a.flush()
+    assert open_store(tmp_path).load()["notes"]["1"] == edited
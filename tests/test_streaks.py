@@ -0,0 +1,85 @@
+"""Tests for the learning streak engine."""
+import random
+from datetime import date, timedelta
+
+import numpy as np
+
+import data_handler as dh
+import progress_model
+import streaks
+
+TODAY = date(2026, 10, 18)
+
+
+def epoch(d):
+    return progress_model.to_epoch_day(d)
+
+
+def history_of(*days_ago):
+    return streaks.StreakHistory.from_epoch_days([epoch(TODAY - timedelta(days=n)) for n in days_ago])
+
+
+def test_runs_from_unsorted_days_with_duplicates():
+    history = history_of(0, 1, 1, 2, 5, 9, 8)
+
+    assert len(history) == 3
+    assert [length for _, _, length in history.intervals()] == [2, 1, 3]
+    assert history.longest() == 3
+
+
+def test_current_streak_counts_today_or_yesterday():
+    assert history_of(0, 1, 2).current(TODAY) == 3
+    # Not practising yet today does not break the streak
+    assert history_of(1, 2).current(TODAY) == 2
+    assert history_of(2, 3).current(TODAY) == 0
+    assert streaks.StreakHistory.from_epoch_days([]).current(TODAY) == 0
+    assert streaks.StreakHistory.from_epoch_days([]).longest() == 0
+
+
+def test_with_day_extends_joins_and_inserts_runs():
+    history = history_of(1, 2, 5)
+
+    assert history.with_day(epoch(TODAY - timedelta(days=1))) is history
+    assert history.with_day(epoch(TODAY)).intervals() == history_of(0, 1, 2, 5).intervals()
+    assert history.with_day(epoch(TODAY - timedelta(days=6))).intervals() == history_of(1, 2, 5, 6).intervals()
+    # Filling the gap between two runs merges them
+    bridged = history.with_day(epoch(TODAY - timedelta(days=3))).with_day(epoch(TODAY - timedelta(days=4)))
+    assert bridged.intervals() == history_of(1, 2, 3, 4, 5).intervals()
+    assert len(history.with_day(epoch(TODAY - timedelta(days=10)))) == 3
+
+
+def test_with_day_matches_a_rebuild():
+    rng = random.Random(7)
+    days = [rng.randrange(200) for _ in range(150)]
+    history = streaks.StreakHistory.from_epoch_days([])
+    for day in days:
+        history = history.with_day(day)
+
+    expected = streaks.StreakHistory.from_epoch_days(days)
+    assert np.array_equal(history.starts, expected.starts)
+    assert np.array_equal(history.ends, expected.ends)
+
+
+def test_history_is_read_only():
+    history = history_of(0, 1)
+
+    assert not history.starts.flags.writeable
+    assert not history.ends.flags.writeable
+
+
+def test_completing_days_carries_the_history_forward(tracker_data):
+    with dh.as_learner("learner"):
+        dh.initialize_data()
+        assert dh.get_progress_snapshot().streak == 0
+
+        dh.mark_day_complete(1)
+        dh.mark_day_complete(2)
+        assert "streaks" in dh.load_data().derived
+        assert dh.get_progress_snapshot().streak == 1
+        assert dh.verify_aggregates() == []
+
+        # Unmarking a day may remove a completion date, so the history is rebuilt
+        dh.mark_day_complete(1, completed=False)
+        dh.mark_day_complete(2, completed=False)
+        assert dh.get_progress_snapshot().streak == 0
+        assert dh.verify_aggregates() == []
@@ -2,10 +2,103 @@
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import pandas as pd
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
 
+import progress_model
+import schedule
+from progress_model import ProgressSnapshot
+
+# Number of figures kept in the process-wide figure cache
+FIGURE_CACHE_SIZE = 256
+
+# Week columns in the activity calendar (a full year)
+CALENDAR_WEEKS = 53
+
+# Above this many cells the cohort heatmap averages learners into row groups
+COHORT_CELL_BUDGET = 50_000
+
+class FigureCache:
+    """Bounded LRU of built figures shared by all sessions, with hit/miss counters."""
+    
+    def __init__(self, max_size=FIGURE_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_build(self, key, build):
+        """Return the cached figure for key, building (and caching) it on a miss."""
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return fig
+            self.misses += 1
+        
+        fig = build()
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_size:
+                self._figures.popitem(last=False)
+        return fig
+    
+    def stats(self):
+        """Return the cache's hits, misses and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._figures)}
+    
+    def clear(self):
+        """Drop every cached figure and reset the counters."""
+        with self._lock:
+            self._figures.clear()
+            self.hits = self.misses = 0
+
+_figure_cache = FigureCache()
+
+def _fingerprint(value):
+    """Return a cheap key for a figure's input: its own fingerprint (snapshots, cohorts) or a digest of plain data."""
+    fingerprint = getattr(value, "fingerprint", None)
+    if fingerprint is not None:
+        return fingerprint
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+def _cached_figure(create):
+    """Serve a figure function's results from the figure cache, keyed by a fingerprint of its input.
+    
+    Cached figures are shared between sessions and must not be modified.
+    """
+    @functools.wraps(create)
+    def wrapper(data, *args, **kwargs):
+        try:
+            key = (create.__name__, _fingerprint(data), _fingerprint([args, kwargs]))
+        except (TypeError, ValueError):
+            return create(data, *args, **kwargs)
+        return _figure_cache.get_or_build(key, lambda: create(data, *args, **kwargs))
+    return wrapper
+
+def figure_cache_stats():
+    """Return the figure cache's hits, misses and current size."""
+    return _figure_cache.stats()
+
+def _progress_days(progress):
+    """Return the per-day entries of a ProgressSnapshot (or of a get_all_progress_data() list)."""
+    if isinstance(progress, ProgressSnapshot):
+        return progress.days
+    return progress
+
+@_cached_figure
 def create_completion_gauge(percentage):
-    """Create a gauge chart showing completion percentage."""
+    """Create a gauge chart showing completion percentage (a number or a ProgressSnapshot)."""
+    if isinstance(percentage, ProgressSnapshot):
+        percentage = percentage.completion_percentage
     try:
         # Ensure percentage is a valid number
         percentage = float(percentage)
@@ -27,11 +120,16 @@ def create_completion_gauge(percentage):
                 ]
             }
         ))
+    except (TypeError, ValueError):
+        return go.Figure()  # Return empty figure if the percentage is invalid
     fig.update_layout(height=200, margin=dict(l=10, r=10, t=40, b=10))
     return fig
 
+@_cached_figure
 def create_weekly_progress_chart(weekly_progress):
-    """Create a bar chart showing weekly progress."""
+    """Create a bar chart showing weekly progress (a list of counts or a ProgressSnapshot)."""
+    if isinstance(weekly_progress, ProgressSnapshot):
+        weekly_progress = list(weekly_progress.weekly_completed)
     try:
         if not weekly_progress or not isinstance(weekly_progress, (list, tuple)):
             return go.Figure()  # Return empty figure if data is invalid
@@ -46,6 +144,8 @@ def create_weekly_progress_chart(weekly_progress):
                 textposition='auto'
             )
         ])
+    except (TypeError, ValueError):
+        return go.Figure()
     fig.update_layout(
         title="Weekly Progress",
         xaxis_title="Week",
@@ -54,10 +154,38 @@ def create_weekly_progress_chart(weekly_progress):
     )
     return fig
 
-def create_progress_heatmap(progress_data):
+@_cached_figure
+def create_weekly_time_chart(weekly_time):
+    """Create a bar chart showing hours spent per week (a list of hours or a ProgressSnapshot)."""
+    if isinstance(weekly_time, ProgressSnapshot):
+        weekly_time = [minutes / 60 for minutes in weekly_time.weekly_minutes]
+    if not weekly_time or not isinstance(weekly_time, (list, tuple)):
+        return go.Figure()
+    
+    weeks = [f"Week {i+1}" for i in range(len(weekly_time))]
+    fig = go.Figure(data=[
+        go.Bar(
+            x=weeks,
+            y=weekly_time,
+            marker_color='#4B89DC',
+            text=[f"{hours:.1f} h" for hours in weekly_time],
+            textposition='auto'
+        )
+    ])
+    fig.update_layout(
+        title="Time Spent Per Week",
+        xaxis_title="Week",
+        yaxis_title="Hours",
+        height=300
+    )
+    return fig
+
+@_cached_figure
+def create_progress_heatmap(progress):
     """Create a heatmap showing daily progress."""
     # Convert progress data to format needed for heatmap
-    days = list(range(1, 22))
+    progress_data = _progress_days(progress)
+    days = [d['day'] for d in progress_data]
     completion = [1 if d.get('completed', False) else 0 for d in progress_data]
     
     fig = px.imshow(
@@ -74,9 +202,11 @@ def create_progress_heatmap(progress_data):
     )
     return fig
 
-def create_time_spent_chart(progress_data):
+@_cached_figure
+def create_time_spent_chart(progress):
     """Create a line chart showing time spent per day."""
-    days = list(range(1, 22))
+    progress_data = _progress_days(progress)
+    days = [d['day'] for d in progress_data]
     times = [d.get('time_spent_minutes', 0) for d in progress_data]
     
     fig = go.Figure(data=go.Scatter(
@@ -93,25 +223,158 @@ def create_time_spent_chart(progress_data):
     )
     return fig
 
-def create_streak_calendar(progress_data):
-    """Create a calendar heatmap showing activity streaks."""
-    dates = []
-    values = []
-    for day in progress_data:
-        if day.get('completion_date'):
-            dates.append(day['completion_date'])
-            values.append(1)
-    
-    if dates:
-        df = pd.DataFrame({
-            'date': dates,
-            'value': values
-        })
-        fig = px.scatter(df, x='date', y='value', color='value')
-        fig.update_layout(
-            title="Activity Calendar",
-            height=200,
-            showlegend=False
-        )
-        return fig
-    return go.Figure()
+def _activity_by_date(progress):
+    """Return (epoch days, minutes) of every completed day with a completion date."""
+    if isinstance(progress, ProgressSnapshot):
+        columns = progress.columns
+        completed = columns.completed_flags()
+        epoch_days = np.frombuffer(columns.completion_days, dtype=np.int32)
+        minutes = np.frombuffer(columns.minutes, dtype=np.int32)
+        mask = completed & (epoch_days != progress_model.NO_DATE)
+        return epoch_days[mask], minutes[mask]
+    
+    # A get_all_progress_data() list
+    entries = [
+        (progress_model.to_epoch_day(day['completion_date']), day.get('time_spent_minutes', 0))
+        for day in progress if day.get('completed', False) and day.get('completion_date')
+    ]
+    entries = [(epoch_day, minutes) for epoch_day, minutes in entries if epoch_day != progress_model.NO_DATE]
+    if not entries:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+    epoch_days, minutes = np.array(entries, dtype=np.int32).T
+    return epoch_days, minutes
+
+def calendar_grid(epoch_days, minutes, end_date, weeks=CALENDAR_WEEKS):
+    """Bin activity into a weekday x week grid ending with the week of end_date.
+    
+    Args:
+        epoch_days: Completion dates as days since 1970-01-01 (repeats allowed)
+        minutes: Minutes spent for each entry of epoch_days
+        end_date: The last date shown
+        weeks: Number of week columns
+    
+    Returns:
+        (completions, minutes, dates): 7 x weeks arrays; row 0 is Monday. Cells
+        after end_date hold NaN, and dates holds each cell's datetime64[D]
+    """
+    end = progress_model.to_epoch_day(end_date)
+    first_monday = end - (end + 3) % 7 - 7 * (weeks - 1)  # 1970-01-01 was a Thursday
+    
+    offsets = np.asarray(epoch_days, dtype=np.int64) - first_monday
+    in_range = (offsets >= 0) & (offsets <= end - first_monday)
+    offsets = offsets[in_range]
+    
+    # Cell index in a row-major (weekday, week) grid
+    cells = (offsets % 7) * weeks + offsets // 7
+    completion_grid = np.bincount(cells, minlength=7 * weeks).astype(float).reshape(7, weeks)
+    minutes_grid = np.bincount(
+        cells, weights=np.asarray(minutes, dtype=float)[in_range], minlength=7 * weeks
+    ).astype(float).reshape(7, weeks)
+    
+    cell_days = first_monday + np.arange(weeks)[np.newaxis, :] * 7 + np.arange(7)[:, np.newaxis]
+    future = cell_days > end
+    completion_grid[future] = np.nan
+    minutes_grid[future] = np.nan
+    dates = np.datetime64("1970-01-01", "D") + cell_days
+    return completion_grid, minutes_grid, dates
+
+@_cached_figure
+def create_streak_calendar(progress, end_date=None, weeks=CALENDAR_WEEKS):
+    """Create a GitHub-style activity calendar: one cell per day for the last year, shaded by minutes studied.
+    
+    Args:
+        progress: A ProgressSnapshot (or a get_all_progress_data() list)
+        end_date: The last date shown; defaults to the snapshot's (or the system's) today
+        weeks: Number of week columns (53 shows a full year)
+    """
+    if end_date is None:
+        end_date = progress.today if isinstance(progress, ProgressSnapshot) else datetime.now().date()
+    
+    epoch_days, minutes = _activity_by_date(progress)
+    completions, minutes_grid, dates = calendar_grid(epoch_days, minutes, end_date, weeks)
+    
+    # Completed days without logged time still show as active
+    activity = np.where(completions > 0, np.maximum(minutes_grid, 1), completions)
+    date_labels = np.datetime_as_string(dates, unit="D")
+    
+    fig = go.Figure(go.Heatmap(
+        z=activity,
+        x=date_labels[0],  # Monday of each week
+        y=[name[:3] for name in schedule.WEEKDAY_NAMES],
+        customdata=np.dstack((date_labels, np.nan_to_num(completions).astype(int), np.nan_to_num(minutes_grid).astype(int))),
+        hovertemplate="%{customdata[0]}<br>Days completed: %{customdata[1]}<br>Minutes: %{customdata[2]}<extra></extra>",
+        colorscale=[[0, "#EBEDF0"], [0.0001, "#C6DBF7"], [1, "#2E5CB8"]],
+        xgap=2,
+        ygap=2,
+        showscale=False
+    ))
+    fig.update_layout(
+        title="Activity Calendar",
+        height=220,
+        yaxis=dict(autorange="reversed"),
+        xaxis=dict(showgrid=False, dtick="M1", tickformat="%b"),
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=40, r=10, t=40, b=30)
+    )
+    return fig
+
+def aggregate_rows(values, labels, cell_budget=COHORT_CELL_BUDGET):
+    """Average consecutive rows into groups so the matrix fits within cell_budget cells.
+    
+    Returns:
+        (values, labels), unchanged if the matrix already fits
+    """
+    rows, columns = values.shape
+    if rows * columns <= cell_budget or rows == 0:
+        return values, list(labels)
+    
+    group_size = -(-rows * columns // cell_budget)
+    groups = -(-rows // group_size)
+    padded = np.full((groups * group_size, columns), np.nan, dtype=np.float32)
+    padded[:rows] = values
+    grouped = np.nanmean(padded.reshape(groups, group_size, columns), axis=1)
+    
+    grouped_labels = [
+        f"{labels[start]} … {labels[min(start + group_size, rows) - 1]} ({min(group_size, rows - start)} learners)"
+        for start in range(0, rows, group_size)
+    ]
+    return grouped, grouped_labels
+
+@_cached_figure
+def create_cohort_heatmap(cohort, cell_budget=COHORT_CELL_BUDGET):
+    """Create a learners x days heatmap of a progress_model.CohortMatrix.
+    
+    Cohorts larger than cell_budget cells are drawn with learners averaged
+    into row groups, so the browser draws at most that many cells. Rows are
+    labelled by position, never by learner ID, since an ID is all it takes
+    to open that learner's data.
+    """
+    if len(cohort) == 0:
+        return go.Figure()
+    
+    row_labels = [f"Learner {row}" for row in range(1, len(cohort) + 1)]
+    values, labels = aggregate_rows(cohort.values, row_labels, cell_budget)
+    aggregated = len(labels) < len(cohort)
+    if cohort.metric == "completed":
+        color_title = "Share completed" if aggregated else "Completed"
+        colorscale = ["#FFE5E5", "#4B89DC"]
+    else:
+        color_title = "Avg. minutes" if aggregated else "Minutes"
+        colorscale = "Blues"
+    
+    fig = go.Figure(go.Heatmap(
+        z=values,
+        x=np.arange(1, cohort.days_count + 1),
+        y=labels,
+        colorscale=colorscale,
+        colorbar=dict(title=color_title),
+        hovertemplate="%{y}<br>Day %{x}: %{z:.2f}<extra></extra>",
+        zsmooth=False
+    ))
+    fig.update_layout(
+        title=f"Cohort Progress ({len(cohort)} learners)",
+        xaxis_title="Day",
+        yaxis=dict(showticklabels=len(labels) <= 50, autorange="reversed"),
+        height=min(200 + 20 * len(labels), 800)
+    )
+    return fig